@@ -0,0 +1 @@
+"""Hot-path benchmarks and synthetic data generators"""
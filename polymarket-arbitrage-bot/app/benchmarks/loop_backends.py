@@ -0,0 +1,189 @@
+"""
+Event loop backends compared against the local simulator
+    
+    python -m benchmarks.loop_backends                       # every installed backend
+    python -m benchmarks.loop_backends --backends asyncio uvloop --duration 20
+    python -m benchmarks.loop_backends --api http://127.0.0.1:8765   # a running simulator
+
+Starts the simulator in its own process (unless --api is given), then for
+each backend runs the same polling workload in a fresh process: the
+catalog is fetched through PolymarketAPI and `--concurrency` pollers keep
+requesting YES/NO quotes for `--duration` seconds. Reports ticks (market
+quotes) per second, HTTP request latency percentiles and client CPU time
+per tick. Backends are run in turns for `--repeats` rounds so drift on
+the host affects them alike; the median round is reported.
+
+With few cores the simulator competes with the client for CPU and caps
+ticks/s for every backend alike; cpu_us_per_tick then shows the
+difference the loop makes.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing as mp
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+APP_DIR = Path(__file__).resolve().parent.parent
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from src.core.market import PolymarketAPI  # noqa: E402
+from src.utils import event_loop  # noqa: E402
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def _poll(url: str, markets: int, concurrency: int, duration: float, max_batch: int) -> Dict:
+    api = PolymarketAPI(gamma_api=url, clob_api=url)
+    api.limiter.configure(0, 1)
+    api.configure_batching(max_batch, 0.002)
+    latencies: List[float] = []
+    request = api._request
+    
+    async def timed_request(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await request(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+    
+    api._request = timed_request
+    try:
+        catalog = await api.fetch_markets(limit=markets)
+        if not catalog:
+            raise RuntimeError(f"no markets from {url}")
+        latencies.clear()
+        
+        ticks = 0
+        deadline = time.perf_counter() + duration
+        
+        async def poller(offset: int):
+            nonlocal ticks
+            index = offset
+            while time.perf_counter() < deadline:
+                await api.get_market_quotes(catalog[index % len(catalog)])
+                ticks += 1
+                index += concurrency
+        
+        cpu, start = time.process_time(), time.perf_counter()
+        await asyncio.gather(*(poller(i) for i in range(concurrency)))
+        elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu
+    finally:
+        await api.close()
+    
+    return {
+        'ticks_per_sec': round(ticks / elapsed, 1),
+        'requests_per_sec': round(len(latencies) / elapsed, 1),
+        'latency_ms_p50': round(_percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        'latency_ms_p90': round(_percentile(latencies, 0.90) * 1000, 2) if latencies else None,
+        'latency_ms_p99': round(_percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+        'cpu_us_per_tick': round(cpu / ticks * 1e6, 1) if ticks else None,
+    }
+
+
+def measure(backend: str, url: str, markets: int, concurrency: int, duration: float,
+            max_batch: int) -> Dict:
+    """One round for one backend; runs in a fresh worker process"""
+    logging.getLogger("src.core.market").setLevel(logging.WARNING)
+    return event_loop.run(_poll(url, markets, concurrency, duration, max_batch), backend)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_simulator(*args: str, timeout: float = 30.0) -> Tuple[subprocess.Popen, str]:
+    """
+    Run `python -m simulator <args>` on a free local port
+    
+    Returns the process and its base URL once it accepts connections.
+    """
+    port = _free_port()
+    process = subprocess.Popen([sys.executable, "-m", "simulator", "--port", str(port), *args],
+                               cwd=APP_DIR, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError(f"simulator did not come up on port {port}")
+            time.sleep(0.1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Event loop backends against the simulator")
+    parser.add_argument("--backends", nargs="+", default=None,
+                        help=f"Backends to compare (default: installed of {', '.join(event_loop.BACKENDS)})")
+    parser.add_argument("--api", default=None, help="Use this running simulator instead of starting one")
+    parser.add_argument("--markets", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100, help="Pollers in flight")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per round")
+    parser.add_argument("--repeats", type=int, default=3, help="Rounds per backend")
+    parser.add_argument("--max-batch", type=int, default=1,
+                        help="Tokens per bulk /prices call (1 = one request per token)")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Simulator median latency")
+    args = parser.parse_args(argv)
+    
+    backends = args.backends or event_loop.available_backends()
+    missing = [b for b in backends if b not in event_loop.available_backends()]
+    if missing:
+        parser.error(f"not available here: {', '.join(missing)}")
+    
+    simulator = None
+    url = args.api
+    if url is None:
+        simulator, url = start_simulator(
+            "--markets", str(args.markets), "--latency-ms", str(args.latency_ms),
+            "--max-bulk", str(max(500, args.max_batch))
+        )
+    
+    rounds: Dict[str, List[Dict]] = {b: [] for b in backends}
+    context = mp.get_context("spawn")
+    try:
+        for round_index in range(args.repeats):
+            # Alternate the order so neither backend always runs first
+            order = backends if round_index % 2 == 0 else list(reversed(backends))
+            for backend in order:
+                with ProcessPoolExecutor(1, mp_context=context) as pool:
+                    result = pool.submit(measure, backend, url, args.markets, args.concurrency,
+                                         args.duration, args.max_batch).result()
+                rounds[backend].append(result)
+                print(f"round {round_index + 1} {backend:8} {result['ticks_per_sec']:>10,.1f} ticks/s  "
+                      f"p50 {result['latency_ms_p50']} ms  p99 {result['latency_ms_p99']} ms",
+                      file=sys.stderr)
+    finally:
+        if simulator:
+            simulator.terminate()
+            simulator.wait()
+    
+    report = {}
+    for backend, results in rounds.items():
+        median = sorted(results, key=lambda r: r['ticks_per_sec'])[(len(results) - 1) // 2]
+        report[backend] = dict(median, rounds=[r['ticks_per_sec'] for r in results])
+    fastest = max(report, key=lambda b: report[b]['ticks_per_sec'])
+    print(json.dumps({
+        'settings': {k: v for k, v in vars(args).items() if k != 'backends'},
+        'backends': report,
+        'fastest': fastest,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
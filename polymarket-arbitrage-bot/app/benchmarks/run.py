@@ -0,0 +1,344 @@
+"""
+Hot-path benchmark runner
+
+Usage (from the app directory):
+    
+    python -m benchmarks.run                      # full run, saves JSON
+    python -m benchmarks.run --quick              # smaller inputs
+    python -m benchmarks.run --only replay        # selected cases
+    python -m benchmarks.run --compare benchmarks/results/old.json
+
+Results are written to benchmarks/results/<timestamp>.json. With
+--compare, any case whose throughput dropped by more than --tolerance
+is reported and the exit code is 1.
+"""
+import argparse
+import atexit
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from . import synthetic
+
+APP_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from src.core.arbitrage import ArbitrageDetector  # noqa: E402
+from src.core.bus import FILLS, PRICES, MarketDataBus, PriceUpdate  # noqa: E402
+from src.core.demo_mode import DemoMode  # noqa: E402
+from src.core.downsample import MinMaxSeries  # noqa: E402
+from src.core.fixed_point import to_micros  # noqa: E402
+from src.core.history import PriceHistory  # noqa: E402
+from src.core.decoding import decode_book  # noqa: E402
+from src.core.market import decode_markets, parse_markets  # noqa: E402
+from src.core.orderbook import OrderBook  # noqa: E402
+from src.core.price_board import BOARD_SUPPORTED, PriceBoard  # noqa: E402
+
+# Each case is set up once and returns (run, ops): `run()` does `ops` units of work
+Case = Callable[[bool], Tuple[Callable[[], object], int]]
+CASES: Dict[str, Case] = {}
+
+
+def benchmark(name: str):
+    def register(func: Case) -> Case:
+        CASES[name] = func
+        return func
+    return register
+
+
+@benchmark("gamma_parse")
+def bench_gamma_parse(quick: bool):
+    """decode_markets on a raw gamma /markets body (ops = markets)"""
+    size = 500 if quick else 5000
+    body = synthetic.catalog_json(size)
+    return lambda: decode_markets(body), size
+
+
+@benchmark("gamma_parse_dict")
+def bench_gamma_parse_dict(quick: bool):
+    """json.loads + parse_markets, the untyped path (ops = markets)"""
+    size = 500 if quick else 5000
+    body = synthetic.catalog_json(size)
+    return lambda: parse_markets(json.loads(body)), size
+
+
+def _micro_ticks(num_markets: int, count: int) -> List[Tuple[int, int, int, int]]:
+    """Synthetic ticks as (microsecond timestamp, market index, YES, NO micro-dollars)"""
+    return [(int(ts * 1_000_000), idx, to_micros(yes), to_micros(no))
+            for ts, idx, yes, no in synthetic.generate_ticks(num_markets, count)]
+
+
+def _quotes(quick: bool) -> List[Tuple[str, str, int, int]]:
+    count = 20_000 if quick else 200_000
+    return [(str(idx), f"market {idx}", yes, no)
+            for _, idx, yes, no in _micro_ticks(1000, count)]
+
+
+@benchmark("detect_single")
+def bench_detect_single(quick: bool):
+    """ArbitrageDetector.check_micros called once per quote (ops = quotes)"""
+    detector = ArbitrageDetector()
+    quotes = _quotes(quick)
+    check = detector.check_micros
+    
+    def run():
+        return [opp for q in quotes if (opp := check(*q)) is not None]
+    return run, len(quotes)
+
+
+@benchmark("detect_batch")
+def bench_detect_batch(quick: bool):
+    """ArbitrageDetector.check_batch over the same quotes (ops = quotes)"""
+    detector = ArbitrageDetector()
+    quotes = _quotes(quick)
+    return lambda: detector.check_batch(quotes), len(quotes)
+
+
+def _board(num_markets: int) -> PriceBoard:
+    board = PriceBoard.create(capacity=num_markets)
+    atexit.register(board.close)
+    for idx in range(num_markets):
+        board.register(str(idx))
+    return board
+
+
+@benchmark("board_write")
+def bench_board_write(quick: bool):
+    """PriceBoard.write of one market row under its seqlock (ops = writes)"""
+    board = _board(1000)
+    ticks = _micro_ticks(1000, 20_000 if quick else 200_000)
+    
+    def run():
+        write = board.write
+        for ts, idx, yes, no in ticks:
+            write(idx, yes, yes, yes, no, no, no, ts)
+    return run, len(ticks)
+
+
+@benchmark("board_scan")
+def bench_board_scan(quick: bool):
+    """ArbitrageDetector.check_board over every row of a filled board (ops = rows)"""
+    num_markets = 10_000 if quick else 100_000
+    board = _board(num_markets)
+    for ts, idx, yes, no in _micro_ticks(num_markets, num_markets * 2):
+        board.write(idx, yes, yes, yes, no, no, no, ts)
+    detector = ArbitrageDetector()
+    return lambda: detector.check_board(board), num_markets
+
+
+@benchmark("history_record")
+def bench_history_record(quick: bool):
+    """PriceHistory.record plus a stats read per tick (ops = ticks)"""
+    ticks = list(synthetic.generate_ticks(1000, 20_000 if quick else 200_000))
+    ids = [str(i) for i in range(1000)]
+    
+    def run():
+        history = PriceHistory(capacity=256)
+        record = history.record
+        for ts, idx, yes, no in ticks:
+            record(ids[idx], ts, yes, no).stats()
+        return history
+    return run, len(ticks)
+
+
+@benchmark("bus_publish")
+def bench_bus_publish(quick: bool):
+    """MarketDataBus.publish of prices to a conflating and a lagging consumer (ops = ticks)"""
+    ticks = [(str(idx), PriceUpdate(str(idx), int(yes * 1e6), int(no * 1e6), ts))
+             for ts, idx, yes, no in synthetic.generate_ticks(1000, 20_000 if quick else 200_000)]
+    
+    def run():
+        bus = MarketDataBus(maxsize=512)
+        fast = bus.subscribe(PRICES, "fast")
+        bus.subscribe(PRICES, "stalled")  # never drained: conflates, then overflows
+        bus.subscribe(FILLS, "log")
+        publish = bus.publish
+        for i, (key, update) in enumerate(ticks):
+            publish(PRICES, key, update)
+            if i % 64 == 0:
+                fast.drain()
+        return bus
+    return run, len(ticks)
+
+
+@benchmark("chart_series")
+def bench_chart_series(quick: bool):
+    """MinMaxSeries.append of YES/NO/sum into ~1000 chart buckets (ops = ticks)"""
+    ticks = list(synthetic.generate_ticks(1, 20_000 if quick else 200_000))
+    
+    def run():
+        series = MinMaxSeries(3, 512)
+        append = series.append
+        for ts, _, yes, no in ticks:
+            append(ts, yes, no, yes + no)
+        return series
+    return run, len(ticks)
+
+
+@benchmark("book_snapshot")
+def bench_book_snapshot(quick: bool):
+    """OrderBook.from_snapshot on a 50-level CLOB payload (ops = snapshots)"""
+    count = 500 if quick else 5000
+    snapshot = synthetic.generate_book_snapshot(levels=50)
+    
+    def run():
+        for _ in range(count):
+            OrderBook.from_snapshot("token", snapshot)
+    return run, count
+
+
+@benchmark("book_decode")
+def bench_book_decode(quick: bool):
+    """decode_book from a raw 50-level CLOB /book body (ops = books)"""
+    count = 500 if quick else 5000
+    body = json.dumps(synthetic.generate_book_snapshot(levels=50)).encode()
+    
+    def run():
+        for _ in range(count):
+            decode_book(body, "token")
+    return run, count
+
+
+@benchmark("book_deltas")
+def bench_book_deltas(quick: bool):
+    """OrderBook.apply_delta plus top-of-book read (ops = deltas)"""
+    deltas = [(side, to_micros(price), to_micros(size))
+              for side, price, size in synthetic.generate_book_deltas(20_000 if quick else 200_000)]
+    snapshot = synthetic.generate_book_snapshot()
+    
+    def run():
+        book = OrderBook.from_snapshot("token", snapshot)
+        apply, best_bid, best_ask = book.apply_delta, book.best_bid, book.best_ask
+        for side, price, size in deltas:
+            apply(side, price, size)
+            best_bid()
+            best_ask()
+    return run, len(deltas)
+
+
+@benchmark("demo_execute")
+def bench_demo_execute(quick: bool):
+    """DemoMode.execute_micros throughput (ops = trades)"""
+    count = 5_000 if quick else 50_000
+    
+    def run():
+        demo = DemoMode()
+        for _ in range(count):
+            demo.execute_micros("synthetic market", 470_000, 490_000)
+    return run, count
+
+
+@benchmark("replay")
+def bench_replay(quick: bool):
+    """Tick stream -> detector -> demo execution (ops = ticks)"""
+    num_markets = 1000
+    ticks = _micro_ticks(num_markets, 20_000 if quick else 200_000)
+    names = [f"market {i}" for i in range(num_markets)]
+    ids = [str(i) for i in range(num_markets)]
+    
+    def run():
+        detector = ArbitrageDetector()
+        demo = DemoMode()
+        params = detector.params
+        check, execute = detector.check_micros, demo.execute_micros
+        for _, idx, yes, no in ticks:
+            opp = check(ids[idx], names[idx], yes, no)
+            if opp is not None:
+                execute(opp.market_name, opp.yes_micros, opp.no_micros, params.fee_ppm, params.gas_micros)
+        return demo
+    return run, len(ticks)
+
+
+def measure(name: str, quick: bool, repeat: int) -> Dict:
+    run, ops = CASES[name](quick)
+    run()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    median = statistics.median(timings)
+    return {
+        'ops': ops,
+        'repeat': repeat,
+        'median_s': median,
+        'best_s': min(timings),
+        'ops_per_sec': ops / median if median > 0 else float('inf'),
+    }
+
+
+def compare(results: Dict, baseline_path: Path, tolerance: float) -> List[str]:
+    """Names of cases whose throughput fell more than `tolerance` below baseline"""
+    baseline = json.loads(baseline_path.read_text())['results']
+    regressions = []
+    print(f"\nComparison with {baseline_path}:")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]['ops_per_sec']
+        change = result['ops_per_sec'] / old - 1 if old else 0.0
+        flag = ""
+        if change < -tolerance:
+            flag = "  <-- REGRESSION"
+            regressions.append(name)
+        print(f"  {name:<16} {old:>14,.0f} -> {result['ops_per_sec']:>14,.0f} ops/s "
+              f"({change:+.1%}){flag}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run hot-path benchmarks")
+    parser.add_argument("--quick", action="store_true", help="Use smaller inputs")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), help="Cases to run")
+    parser.add_argument("--out", type=Path, help="Result file (default: results/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="Baseline result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed throughput drop before flagging a regression")
+    parser.add_argument("--with-logging", action="store_true",
+                        help="Keep INFO logging enabled on the measured paths")
+    args = parser.parse_args(argv)
+    
+    if not args.with_logging:
+        for name in ("src.core.demo_mode", "src.core.market", "src.core.arbitrage"):
+            logging.getLogger(name).setLevel(logging.WARNING)
+    
+    # The price board only exists on x86 (see PriceBoard)
+    names = args.only or [name for name in CASES if BOARD_SUPPORTED or not name.startswith("board_")]
+    results = {}
+    for name in names:
+        result = measure(name, args.quick, args.repeat)
+        results[name] = result
+        print(f"{name:<16} {result['ops_per_sec']:>14,.0f} ops/s  "
+              f"(median {result['median_s'] * 1000:.1f} ms for {result['ops']:,} ops)")
+    
+    out = args.out or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'quick': args.quick,
+        },
+        'results': results,
+    }, indent=2))
+    print(f"\nSaved results to {out}")
+    
+    if args.compare:
+        return 1 if compare(results, args.compare, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
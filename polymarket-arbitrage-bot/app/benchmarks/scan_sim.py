@@ -0,0 +1,102 @@
+"""
+Scanner throughput against the local simulator
+    
+    python -m benchmarks.scan_sim --markets 10000 --concurrency 200
+    python -m benchmarks.scan_sim --rate-limit 500 --error-rate 0.02   # exercise backoff
+    python -m benchmarks.scan_sim --max-batch 1                        # no bulk calls
+
+Starts an in-process PolymarketSimulator, fetches the catalog through
+PolymarketAPI and polls YES/NO prices for every market, then reports
+markets scanned per second plus the 429/retry counts.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from simulator import EndpointProfile, PolymarketSimulator, SimulatorConfig  # noqa: E402
+from src.core.market import PolymarketAPI  # noqa: E402
+from src.utils.metrics import HTTP_REQUESTS, HTTP_RETRIES  # noqa: E402
+
+
+async def scan(args) -> dict:
+    sim = PolymarketSimulator(SimulatorConfig(
+        markets=args.markets,
+        rate_limit=args.rate_limit,
+        rate_burst=args.rate_burst,
+        endpoints={'default': EndpointProfile(latency_ms=args.latency_ms,
+                                              error_rate=args.error_rate)},
+    ))
+    url = await sim.start(port=0)
+    
+    api = PolymarketAPI(gamma_api=url, clob_api=url)
+    api.limiter.configure(args.client_rate, args.client_rate or 1)
+    api.configure_batching(args.max_batch, args.batch_window_ms / 1000)
+    try:
+        start = time.perf_counter()
+        markets = await api.fetch_markets(limit=args.markets)
+        catalog_s = time.perf_counter() - start
+        
+        semaphore = asyncio.Semaphore(args.concurrency)
+        
+        async def poll(market):
+            async with semaphore:
+                return await api.get_market_prices(market)
+        
+        requests_before = sum(int(c.value) for c in HTTP_REQUESTS._children.values())
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            await asyncio.gather(*(poll(m) for m in markets))
+        scan_s = time.perf_counter() - start
+        scan_requests = sum(int(c.value) for c in HTTP_REQUESTS._children.values()) - requests_before
+    finally:
+        await api.close()
+        await sim.stop()
+    
+    statuses = {}
+    for values, child in HTTP_REQUESTS._children.items():
+        statuses[str(values[1])] = statuses.get(str(values[1]), 0) + int(child.value)
+    scanned = len(markets) * args.rounds
+    return {
+        'markets': len(markets),
+        'catalog_seconds': round(catalog_s, 3),
+        'scan_seconds': round(scan_s, 3),
+        'markets_per_sec': round(scanned / scan_s, 1) if scan_s else None,
+        'scan_requests': scan_requests,
+        'requests_per_sec': round(scan_requests / scan_s, 1) if scan_s else None,
+        'client_statuses': statuses,
+        'client_retries': int(HTTP_RETRIES.value),
+        'server_stats': sim.stats,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scanner throughput against the simulator")
+    parser.add_argument("--markets", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=1, help="Full-catalog scans to run")
+    parser.add_argument("--concurrency", type=int, default=200, help="Requests in flight")
+    parser.add_argument("--max-batch", type=int, default=100,
+                        help="Tokens per bulk /prices call (1 = one request per token)")
+    parser.add_argument("--batch-window-ms", type=float, default=5.0)
+    parser.add_argument("--client-rate", type=float, default=0.0,
+                        help="Client-side requests/s limit (0 = unlimited)")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="Server-side requests/s before HTTP 429 (0 = off)")
+    parser.add_argument("--rate-burst", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+    
+    logging.getLogger("src.core.market").setLevel(logging.WARNING)
+    print(json.dumps(asyncio.run(scan(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Merge batching replayed over a synthetic opportunity stream
+    
+    python -m benchmarks.settlement_sim
+    python -m benchmarks.settlement_sim --batches 1 10 50 --max-age 120 --balance 100
+    python -m benchmarks.settlement_sim --amortized-detection   # detector prices gas per pair
+
+Replays one synthetic tick stream (see synthetic.generate_ticks) through
+the detector and DemoMode once per merge batch size, on the stream's own
+clock, and reports for each: trades executed and refused for lack of
+unlocked capital, the achievable trade rate, merges and settled pairs per
+second, the mean wait for a merge, capital turnover per hour, gas paid and
+the net edge per pair after fees and gas. Bigger batches spread the gas
+over more pairs but keep capital locked longer, which caps the trade rate
+once the balance runs out.
+"""
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+APP_DIR = Path(__file__).resolve().parent.parent
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from benchmarks import synthetic  # noqa: E402
+from src.core.arbitrage import ArbitrageDetector  # noqa: E402
+from src.core.demo_mode import DemoMode  # noqa: E402
+from src.core.fixed_point import to_micros  # noqa: E402
+
+
+def replay(ticks: List[Tuple[float, int, int, int]], batch_size: int, args: argparse.Namespace) -> Dict:
+    """One pass over `ticks` with merges batched `batch_size` pairs at a time"""
+    gas = args.gas / batch_size if args.amortized_detection else args.gas
+    detector = ArbitrageDetector(args.min_profit, args.fee, gas)
+    params = detector.params
+    demo = DemoMode(args.balance, trade_history=1, batch_size=batch_size, max_age=args.max_age)
+    gas_micros = to_micros(args.gas)
+    # Start the clock where the stream does, so rates cover the stream
+    demo.started_at = 0.0
+    
+    found = 0
+    for ts, idx, yes, no in ticks:
+        opp = detector.check_micros(str(idx), f"market {idx}", yes, no)
+        if opp is not None:
+            found += 1
+            demo.execute_micros(opp.market_name, yes, no, params.fee_ppm, gas_micros,
+                                condition_id=opp.market_id, now=ts)
+    end = ticks[-1][0] if ticks else 0.0
+    demo.settle(end)
+    stats = demo.get_stats(now=end)
+    
+    return {
+        'opportunities': found,
+        'trades': demo.num_trades,
+        'refused': stats['rejected_trades'],
+        'trades_per_hour': round(demo.num_trades / end * 3600, 1) if end else None,
+        'merges': stats['settlements'],
+        'pairs_per_merge': round(stats['pairs_per_settlement'], 2),
+        'settled_pairs_per_sec': round(stats['settled_pairs_per_sec'], 4),
+        'mean_merge_wait_s': round(stats['mean_settle_seconds'], 1),
+        'capital_turnover_per_hour': round(stats['turnover_per_hour'], 3),
+        'gas_paid': round(stats['gas_paid'], 4),
+        'net_edge_per_pair': round(stats['net_edge'], 5),
+        'profit': round(stats['total_profit'], 4),
+        'locked_at_end': round(stats['locked_capital'], 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge batching over a synthetic opportunity stream")
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 5, 20, 50],
+                        help="Merge batch sizes to compare")
+    parser.add_argument("--max-age", type=float, default=60.0,
+                        help="Seconds before a partial batch is merged anyway (0 = never)")
+    parser.add_argument("--balance", type=float, default=1000.0, help="Starting demo balance ($)")
+    parser.add_argument("--markets", type=int, default=1000)
+    parser.add_argument("--hours", type=float, default=1.0, help="Length of the stream (stream time)")
+    parser.add_argument("--rate", type=float, default=200.0, help="Ticks per second")
+    parser.add_argument("--arb-rate", type=float, default=0.01, help="Share of ticks below $1")
+    parser.add_argument("--min-profit", type=float, default=0.01)
+    parser.add_argument("--fee", type=float, default=0.02)
+    parser.add_argument("--gas", type=float, default=0.01, help="Gas per merge ($)")
+    parser.add_argument("--amortized-detection", action="store_true",
+                        help="Detector charges each pair gas / batch size instead of the full gas")
+    parser.add_argument("--seed", type=int, default=2)
+    args = parser.parse_args(argv)
+    
+    logging.getLogger("src.core.demo_mode").setLevel(logging.WARNING)
+    count = int(args.hours * 3600 * args.rate)
+    ticks = [(ts, idx, to_micros(yes), to_micros(no)) for ts, idx, yes, no in
+             synthetic.generate_ticks(args.markets, count, args.seed, args.arb_rate, args.rate)]
+    
+    report = {}
+    for batch_size in args.batches:
+        result = report[str(batch_size)] = replay(ticks, batch_size, args)
+        print(f"batch {batch_size:>4}: {result['trades']:>7,} trades ({result['refused']:,} refused)  "
+              f"turnover {result['capital_turnover_per_hour']:.2f}x/h  "
+              f"net edge ${result['net_edge_per_pair']:.4f}/pair", file=sys.stderr)
+    print(json.dumps({
+        'settings': {k: v for k, v in vars(args).items() if k != 'batches'},
+        'ticks': len(ticks),
+        'batches': report,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
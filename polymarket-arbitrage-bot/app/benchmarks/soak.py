@@ -0,0 +1,343 @@
+"""
+Soak test: hours of accelerated scanning with memory and handle budgets
+    
+    python -m benchmarks.soak                                 # 2 h headless run
+    python -m benchmarks.soak --duration 600 --warmup 60      # quick check
+    python -m benchmarks.soak --gui --duration 1800           # the desktop window, offscreen
+
+Starts the simulator with a fast tick rate and a high arbitrage rate,
+then runs the same pieces a scan worker runs (adaptive scanner,
+opportunity tracker, demo execution, market-data bus, price board,
+checkpoint encoding and periodic catalog refreshes) with short poll
+intervals, so hours of trading fit in the run. With --gui the desktop
+window is driven instead: refreshes, monitoring and auto-execution.
+
+Every --sample-interval seconds it records tracemalloc's traced size,
+RSS, open file descriptors and threads. The sample taken once --warmup
+has passed is the baseline; the run fails (exit code 1) as soon as
+growth over it exceeds a budget, or at the end if traced memory keeps
+rising faster than --max-slope MB/h. The report, with the allocation
+sites that grew most, goes to benchmarks/results/soak_<timestamp>.json.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+APP_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from benchmarks.loop_backends import start_simulator  # noqa: E402
+
+MB = 1024 * 1024
+
+
+@dataclass
+class Sample:
+    elapsed: float
+    traced_mb: Optional[float]
+    rss_mb: Optional[float]
+    fds: Optional[int]
+    threads: int
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size now (Linux), else the peak from getrusage"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def open_fds() -> Optional[int]:
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return None
+
+
+class MemoryWatch:
+    """Periodic samples checked against growth budgets after a warm-up"""
+    
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.trace = not args.no_tracemalloc
+        self.samples: List[Sample] = []
+        self.baseline: Optional[Sample] = None
+        self.failures: List[str] = []
+        self.started = time.monotonic()
+        self._snapshot = None
+        if self.trace:
+            tracemalloc.start(args.frames)
+    
+    def sample(self) -> Sample:
+        gc.collect()
+        rss = rss_bytes()
+        sample = Sample(
+            elapsed=round(time.monotonic() - self.started, 1),
+            traced_mb=round(tracemalloc.get_traced_memory()[0] / MB, 3) if self.trace else None,
+            rss_mb=round(rss / MB, 3) if rss is not None else None,
+            fds=open_fds(),
+            threads=threading.active_count()
+        )
+        self.samples.append(sample)
+        if self.baseline is None and sample.elapsed >= self.args.warmup:
+            self.baseline = sample
+            if self.trace:
+                self._snapshot = tracemalloc.take_snapshot()
+        elif self.baseline is not None:
+            self._check(sample)
+        print(f"[{sample.elapsed:>8.0f}s] traced {sample.traced_mb} MB  rss {sample.rss_mb} MB  "
+              f"fds {sample.fds}  threads {sample.threads}", file=sys.stderr, flush=True)
+        return sample
+    
+    def _check(self, sample: Sample):
+        base, args = self.baseline, self.args
+        budgets = (
+            ("traced memory", sample.traced_mb, base.traced_mb, args.max_growth, "MB"),
+            ("RSS", sample.rss_mb, base.rss_mb, args.max_rss_growth, "MB"),
+            ("open file descriptors", sample.fds, base.fds, args.max_fd_growth, ""),
+            ("threads", sample.threads, base.threads, args.max_thread_growth, ""),
+        )
+        for what, now, then, budget, unit in budgets:
+            if now is not None and then is not None and now - then > budget:
+                self.failures.append(f"{what} grew {now - then:.1f}{unit} over the baseline "
+                                     f"(budget {budget}{unit}) at {sample.elapsed:.0f}s")
+    
+    def slope(self) -> Optional[float]:
+        """Least-squares trend of traced memory since the baseline, in MB per hour"""
+        points = [(s.elapsed, s.traced_mb) for s in self.samples
+                  if self.baseline and s.elapsed >= self.baseline.elapsed and s.traced_mb is not None]
+        if len(points) < 3:
+            return None
+        mean_t = sum(t for t, _ in points) / len(points)
+        mean_m = sum(m for _, m in points) / len(points)
+        var = sum((t - mean_t) ** 2 for t, _ in points)
+        if var == 0:
+            return None
+        return sum((t - mean_t) * (m - mean_m) for t, m in points) / var * 3600
+    
+    def finish(self) -> Dict:
+        slope = self.slope()
+        window = self.samples[-1].elapsed - self.baseline.elapsed if self.baseline else 0.0
+        if slope is not None and window >= self.args.slope_window and slope > self.args.max_slope:
+            self.failures.append(f"traced memory keeps rising at {slope:.1f} MB/h "
+                                 f"(budget {self.args.max_slope} MB/h)")
+        growth = []
+        if self._snapshot is not None:
+            stats = tracemalloc.take_snapshot().compare_to(self._snapshot, "lineno")
+            growth = [{"where": str(stat.traceback), "kb": round(stat.size_diff / 1024, 1),
+                       "count": stat.count_diff}
+                      for stat in stats[:15] if stat.size_diff > 0]
+        return {
+            "passed": not self.failures,
+            "failures": self.failures,
+            "slope_mb_per_hour": round(slope, 3) if slope is not None else None,
+            "baseline": asdict(self.baseline) if self.baseline else None,
+            "final": asdict(self.samples[-1]) if self.samples else None,
+            "top_growth": growth,
+            "samples": [asdict(s) for s in self.samples],
+        }
+    
+    def should_stop(self) -> bool:
+        return bool(self.failures) or time.monotonic() - self.started >= self.args.duration
+
+
+async def run_headless(args: argparse.Namespace, url: str, watch: MemoryWatch) -> Dict:
+    """A scan worker's pipeline against the simulator until the watch says stop"""
+    from src.core import checkpoint
+    from src.core.arbitrage import ArbitrageDetector
+    from src.core.bus import FILLS, OPPORTUNITIES, PRICES, MarketDataBus
+    from src.core.demo_mode import DemoMode
+    from src.core.lifecycle import OpportunityTracker
+    from src.core.market import PolymarketAPI
+    from src.core.poll_scheduler import AdaptiveScanner
+    from src.core.price_board import BOARD_SUPPORTED, PriceBoard
+    
+    api = PolymarketAPI(gamma_api=url, clob_api=url)
+    api.limiter.configure(args.rate, max(1, int(args.rate)))
+    detector = ArbitrageDetector()
+    tracker = OpportunityTracker(detector)
+    tracker.configure(hysteresis=0.005, cooldown=1.0, min_change=0.001)
+    demo = DemoMode(trade_history=1000, batch_size=20, max_age=5.0)
+    bus = MarketDataBus(maxsize=1024)
+    board = PriceBoard.create(capacity=max(4096, args.markets * 2)) if BOARD_SUPPORTED else None
+    
+    fills = bus.subscribe(FILLS, "soak")
+    bus.subscribe(PRICES, "stalled")  # never read: must stay bounded
+    bus.subscribe(OPPORTUNITIES, "stalled")
+    
+    def execute(opp):
+        params = detector.params
+        trade = demo.execute_micros(opp.market_name, opp.yes_micros, opp.no_micros,
+                                    params.fee_ppm, params.gas_micros, opp.market_id)
+        if trade:
+            bus.publish(FILLS, opp.market_id, trade)
+    
+    markets = await api.fetch_markets(limit=args.markets)
+    scanner = AdaptiveScanner(api, detector, markets, concurrency=args.concurrency,
+                              on_opportunity=execute, board=board, tracker=tracker, bus=bus)
+    scanner.configure(args.min_interval, args.max_interval, 0.8)
+    task = asyncio.create_task(scanner.run())
+    
+    last_sample = last_refresh = last_checkpoint = time.monotonic()
+    watch.sample()
+    try:
+        while not watch.should_stop():
+            await asyncio.sleep(0.5)
+            fills.drain()
+            demo.settle()
+            now = time.monotonic()
+            if now - last_refresh >= args.refresh:
+                # New Market objects for the same catalog, as a refresh brings
+                scanner.set_markets(await api.fetch_markets(limit=args.markets))
+                last_refresh = now
+            if now - last_checkpoint >= 5.0:
+                checkpoint.encode(checkpoint.Checkpoint.capture(demo, scanner.markets, tracker.cooldowns()))
+                last_checkpoint = now
+            if now - last_sample >= args.sample_interval:
+                watch.sample()
+                last_sample = now
+            if task.done():
+                task.result()
+    finally:
+        scanner.stop()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await api.close()
+        if board:
+            board.close()
+    return {"trades": demo.num_trades, "trades_kept": len(demo.trades),
+            "pending_merges": len(demo.settlement), "bus": bus.stats()}
+
+
+def run_gui(args: argparse.Namespace, url: str, watch: MemoryWatch) -> Dict:
+    """The desktop window offscreen: catalog refreshes, monitoring and auto-execution"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    from src.gui.main_window import MainWindow
+    
+    app = QApplication.instance() or QApplication([])
+    window = MainWindow()
+    window.api.set_endpoints(url, url)
+    window.api.limiter.configure(args.rate, max(1, int(args.rate)))
+    window.next_poll_interval = lambda market: args.min_interval
+    window.opportunities.configure(hysteresis=0.005, cooldown=1.0, min_change=0.001)
+    
+    def every(seconds: float, func: Callable[[], None]) -> QTimer:
+        timer = QTimer(window)
+        timer.timeout.connect(func)
+        timer.start(int(seconds * 1000))
+        return timer
+    
+    def start():
+        if window.markets and not window.monitoring:
+            window.selected_market = window.markets[0]
+            window.start_monitoring()
+    
+    def tick():
+        watch.sample()
+        if watch.should_stop():
+            for timer in timers:
+                timer.stop()
+            window.close()
+            app.quit()
+    
+    timers = [every(args.refresh, window.fetch_markets), every(1.0, start),
+              every(args.sample_interval, tick)]
+    watch.sample()
+    app.exec()
+    return {"trades": window.demo_mode.num_trades, "trades_kept": len(window.demo_mode.trades),
+            "log_lines": window.log_output.document().blockCount()}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Soak test with memory and handle budgets")
+    parser.add_argument("--duration", type=float, default=2 * 3600, help="Seconds to run")
+    parser.add_argument("--warmup", type=float, default=300, help="Seconds before the baseline sample")
+    parser.add_argument("--sample-interval", type=float, default=30.0)
+    parser.add_argument("--gui", action="store_true", help="Drive the desktop window instead")
+    parser.add_argument("--api", default=None, help="Use this running simulator instead of starting one")
+    parser.add_argument("--markets", type=int, default=500)
+    parser.add_argument("--tick-rate", type=float, default=5000.0, help="Simulator price updates/s")
+    parser.add_argument("--arb-rate", type=float, default=0.2, help="Simulator arbitrage chance per update")
+    parser.add_argument("--rate", type=float, default=500.0, help="Client requests/s")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--min-interval", type=float, default=0.1, help="Fastest poll per market (s)")
+    parser.add_argument("--max-interval", type=float, default=2.0, help="Slowest poll per market (s)")
+    parser.add_argument("--refresh", type=float, default=60.0, help="Seconds between catalog refreshes")
+    parser.add_argument("--max-growth", type=float, default=25.0, help="Traced memory budget (MB)")
+    parser.add_argument("--max-rss-growth", type=float, default=75.0, help="RSS budget (MB)")
+    parser.add_argument("--max-fd-growth", type=int, default=8, help="Open file descriptor budget")
+    parser.add_argument("--max-thread-growth", type=int, default=2, help="Thread budget")
+    parser.add_argument("--max-slope", type=float, default=5.0,
+                        help="Traced memory trend budget (MB/h), checked at the end")
+    parser.add_argument("--slope-window", type=float, default=1800.0,
+                        help="Least seconds after the baseline for the trend check to apply")
+    parser.add_argument("--frames", type=int, default=1, help="tracemalloc traceback depth")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="Watch RSS and handles only (tracemalloc slows Python down)")
+    parser.add_argument("--out", type=Path, help="Report file (default: results/soak_<timestamp>.json)")
+    args = parser.parse_args(argv)
+    
+    for name in ("src.core.demo_mode", "src.core.market", "src.core.arbitrage", "src.gui.main_window"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    
+    simulator, url = None, args.api
+    if url is None:
+        simulator, url = start_simulator(
+            "--markets", str(args.markets), "--tick-rate", str(args.tick_rate),
+            "--arb-rate", str(args.arb_rate), "--arb-duration", "1.0", "--latency-ms", "5"
+        )
+    watch = MemoryWatch(args)
+    try:
+        if args.gui:
+            workload = run_gui(args, url, watch)
+        else:
+            from src.utils import event_loop
+            workload = event_loop.run(run_headless(args, url, watch))
+    finally:
+        if simulator:
+            simulator.terminate()
+            simulator.wait()
+    
+    report = watch.finish()
+    report["workload"] = workload
+    report["settings"] = {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()}
+    out = args.out or RESULTS_DIR / f"soak_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    
+    print(f"\n{'PASSED' if report['passed'] else 'FAILED'}: {len(watch.samples)} samples, "
+          f"slope {report['slope_mb_per_hour']} MB/h, workload {workload}")
+    for failure in report["failures"]:
+        print(f"  - {failure}")
+    print(f"Report: {out}")
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
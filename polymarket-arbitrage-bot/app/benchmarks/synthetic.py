@@ -0,0 +1,133 @@
+"""Deterministic synthetic market data
+
+Every generator takes a seed, so the same arguments always produce the
+same data and benchmark runs can be compared with each other.
+"""
+import json
+import random
+from typing import Dict, Iterator, List, Tuple
+
+TICK = 0.01
+
+# (timestamp, market index, yes price, no price)
+Tick = Tuple[float, int, float, float]
+# (side, price, size); size 0 removes the level
+BookDelta = Tuple[str, float, float]
+
+
+def _token_id(rng: random.Random) -> str:
+    # CLOB token IDs are 256-bit integers rendered in decimal
+    return str(rng.getrandbits(256))
+
+
+def _round_tick(price: float) -> float:
+    return round(min(0.99, max(0.01, price)) / TICK) * TICK
+
+
+def generate_catalog(size: int = 1000, seed: int = 1) -> List[Dict]:
+    """
+    Gamma /markets payload with `size` binary markets
+    
+    Items have the same shape as the live API, including the JSON-encoded
+    `clobTokenIds`, `outcomes` and `outcomePrices` strings and the
+    liquidity/volume fields.
+    """
+    rng = random.Random(seed)
+    catalog = []
+    for i in range(size):
+        yes = _round_tick(rng.uniform(0.03, 0.97))
+        liquidity = rng.lognormvariate(8, 2)
+        volume = liquidity * rng.uniform(0.5, 20)
+        spread = _round_tick(rng.choice((0.01, 0.01, 0.02, 0.03, 0.05)))
+        catalog.append({
+            'id': str(500000 + i),
+            'question': f"Synthetic market #{i}: will event {rng.randrange(10**6)} happen?",
+            'conditionId': '0x' + format(rng.getrandbits(256), '064x'),
+            'slug': f"synthetic-market-{i}",
+            'active': True,
+            'closed': False,
+            'archived': False,
+            'liquidity': f"{liquidity:.4f}",
+            'liquidityNum': liquidity,
+            'volume': f"{volume:.4f}",
+            'volumeNum': volume,
+            'spread': spread,
+            'bestBid': _round_tick(yes - spread / 2),
+            'bestAsk': _round_tick(yes + spread / 2),
+            'endDate': f"2027-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00Z",
+            'outcomes': json.dumps(["Yes", "No"]),
+            'outcomePrices': json.dumps([f"{yes:.2f}", f"{1 - yes:.2f}"]),
+            'clobTokenIds': json.dumps([_token_id(rng), _token_id(rng)]),
+        })
+    return catalog
+
+
+def catalog_json(size: int = 1000, seed: int = 1) -> bytes:
+    """Gamma /markets response body as raw bytes"""
+    return json.dumps(generate_catalog(size, seed)).encode()
+
+
+def generate_ticks(num_markets: int, count: int, seed: int = 2,
+                   arb_rate: float = 0.01, rate: float = 1000.0) -> Iterator[Tick]:
+    """
+    Stream of YES/NO price ticks across `num_markets` markets
+    
+    Activity is skewed so a few markets tick much more often than the rest.
+    YES prices follow a random walk; NO is priced so YES + NO sits a little
+    above $1, except in a fraction `arb_rate` of ticks where the sum dips
+    below $1 (an arbitrage window).
+    
+    Args:
+        num_markets: Number of markets (ticks refer to them by index)
+        count: Number of ticks to produce
+        seed: Random seed
+        arb_rate: Fraction of ticks that open an arbitrage window
+        rate: Average ticks per second, used for timestamps
+    """
+    rng = random.Random(seed)
+    mids = [rng.uniform(0.05, 0.95) for _ in range(num_markets)]
+    weights = [1.0 / (i + 1) ** 0.8 for i in range(num_markets)]
+    indices = rng.choices(range(num_markets), weights=weights, k=count)
+    ts = 0.0
+    for idx in indices:
+        ts += rng.expovariate(rate)
+        mid = min(0.97, max(0.03, mids[idx] + rng.gauss(0, 0.005)))
+        mids[idx] = mid
+        if rng.random() < arb_rate:
+            overround = -rng.uniform(0.03, 0.08)
+        else:
+            overround = rng.uniform(0.0, 0.04)
+        yes = round(mid, 4)
+        no = round(max(0.001, 1.0 - mid + overround), 4)
+        yield ts, idx, yes, no
+
+
+def generate_book_snapshot(mid: float = 0.5, levels: int = 20, seed: int = 3) -> Dict:
+    """CLOB /book payload with `levels` price levels per side (string fields)"""
+    rng = random.Random(seed)
+    best_bid = _round_tick(mid - TICK)
+    best_ask = _round_tick(best_bid + TICK)
+    bids, asks = [], []
+    for i in range(levels):
+        bid_price = round(best_bid - i * TICK, 2)
+        ask_price = round(best_ask + i * TICK, 2)
+        if bid_price > 0:
+            bids.append({'price': f"{bid_price:.2f}", 'size': f"{rng.uniform(5, 5000):.2f}"})
+        if ask_price < 1:
+            asks.append({'price': f"{ask_price:.2f}", 'size': f"{rng.uniform(5, 5000):.2f}"})
+    # The CLOB lists both sides from the worst price towards the touch
+    return {'bids': bids[::-1], 'asks': asks[::-1]}
+
+
+def generate_book_deltas(count: int, mid: float = 0.5, levels: int = 20,
+                         seed: int = 4, remove_rate: float = 0.2) -> List[BookDelta]:
+    """Level updates around `mid`; a fraction `remove_rate` clears a level"""
+    rng = random.Random(seed)
+    deltas = []
+    for _ in range(count):
+        side = 'BUY' if rng.random() < 0.5 else 'SELL'
+        offset = rng.randrange(levels) * TICK
+        price = round(mid - TICK - offset if side == 'BUY' else mid + offset, 2)
+        size = 0.0 if rng.random() < remove_rate else round(rng.uniform(5, 5000), 2)
+        deltas.append((side, price, size))
+    return deltas
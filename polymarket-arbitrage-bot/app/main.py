@@ -2,6 +2,7 @@
 ⚡ Polymarket Arbitrage Bot
 Real-time arbitrage detection and execution
 """
+import argparse
 import sys
 from pathlib import Path
 
@@ -9,14 +10,19 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 
-def check_dependencies():
-    """Check if required dependencies are installed"""
+def check_dependencies(gui: bool = True):
+    """Check if required dependencies are installed
+    
+    Args:
+        gui: Also require PyQt6 (not needed with --headless)
+    """
     missing = []
     
-    try:
-        import PyQt6
-    except ImportError:
-        missing.append("PyQt6")
+    if gui:
+        try:
+            import PyQt6
+        except ImportError:
+            missing.append("PyQt6")
     
     try:
         import aiohttp
@@ -28,6 +34,11 @@ def check_dependencies():
     except ImportError:
         missing.append("pyyaml")
     
+    try:
+        import numpy
+    except ImportError:
+        missing.append("numpy")
+    
     if missing:
         print("\n" + "=" * 60)
         print("❌ MISSING DEPENDENCIES")
@@ -38,20 +49,139 @@ def check_dependencies():
         print("\n📦 To install all dependencies, run:")
         print("\n  pip install -r requirements.txt")
         print("\nOr install individually:")
-        print("\n  pip install PyQt6 aiohttp pyyaml python-dotenv")
+        print("\n  pip install PyQt6 aiohttp pyyaml python-dotenv numpy")
         print("\n" + "=" * 60)
         print("\n💡 See INSTALL.md for detailed installation guide")
         print("=" * 60 + "\n")
         sys.exit(1)
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Polymarket arbitrage bot")
+    parser.add_argument("--headless", action="store_true",
+                        help="Scan without the GUI, sharded across worker processes")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Scan worker processes (default: sharding.workers)")
+    parser.add_argument("--markets", type=int, default=None,
+                        help="Markets to scan (default: sharding.markets)")
+    parser.add_argument("--duration", type=float, default=None,
+                        help="Stop after this many seconds (default: run until Ctrl+C)")
+    parser.add_argument("--api", default=None,
+                        help="Serve both gamma and CLOB calls from this URL (e.g. the simulator)")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Ignore the saved checkpoint and start from scratch")
+    parser.add_argument("--loop", choices=("auto", "asyncio", "uvloop"), default=None,
+                        help="Event loop implementation (default: runtime.event_loop)")
+    return parser.parse_args(argv)
+
+
+def run_headless(args, logger):
+    """Sharded scanning without the GUI; opportunities are executed in demo mode"""
+    import os
+    import threading
+    from src.core import checkpoint
+    from src.core.demo_mode import DemoMode
+    from src.core.market import PolymarketAPI
+    from src.core.sharding import ShardCoordinator
+    from src.utils import event_loop
+    from src.utils.config import config
+    
+    workers = args.workers or config.get('sharding.workers', 0) or os.cpu_count() or 1
+    limit = args.markets or config.get('sharding.markets', 1000)
+    endpoints = (args.api, args.api) if args.api else None
+    
+    async def load_markets():
+        api = PolymarketAPI()
+        api.apply_snapshot(config.snapshot)
+        if endpoints:
+            api.set_endpoints(*endpoints)
+        try:
+            return await api.fetch_markets(limit=limit)
+        finally:
+            await api.close()
+    
+    # Warm restart: ledger, markets and cooldowns from the last checkpoint;
+    # restored prices are stale until the workers poll them again
+    enabled = config.get('checkpoint.enabled', True)
+    path = config.get('checkpoint.path', 'state/checkpoint.bin')
+    saved = checkpoint.load(path) if enabled and not args.fresh else None
+    demo_mode = DemoMode(initial_balance=config.demo_balance,
+                         trade_history=config.get('demo.trade_history', 1000),
+                         batch_size=config.get('settlement.batch_size', 20),
+                         max_age=config.get('settlement.max_age', 60.0))
+    cooldowns = None
+    markets = []
+    if saved:
+        saved.restore_demo(demo_mode)
+        cooldowns = saved.cooldowns
+        if saved.age <= config.get('checkpoint.max_age', 3600):
+            markets = saved.markets[:limit]
+    
+    if not markets:
+        markets = event_loop.run(load_markets(), args.loop)
+    if not markets:
+        logger.error("No markets fetched, nothing to scan")
+        return
+    
+    config.watch()
+    writer = (checkpoint.CheckpointWriter(path, config.get('checkpoint.interval', 5.0)).start()
+              if enabled else None)
+    coordinator = ShardCoordinator(
+        workers,
+        demo_mode=demo_mode,
+        endpoints=endpoints,
+        rebalance_interval=config.get('sharding.rebalance_interval', 30.0),
+        checkpoint=writer,
+        loop_backend=args.loop
+    )
+    coordinator.start(markets, cooldowns)
+    
+    # Catalog refreshes move markets between watchlist tiers as their
+    # liquidity, volume and spread change; workers get only the deltas
+    refresh_interval = config.get('tiers.refresh_interval', 300)
+    stopped = threading.Event()
+    
+    def refresh_catalog():
+        while not stopped.wait(refresh_interval):
+            try:
+                catalog = event_loop.run(load_markets(), args.loop)
+            except Exception as e:
+                logger.warning("Catalog refresh failed: %s", e)
+                continue
+            if catalog:
+                coordinator.submit_catalog(catalog)
+    
+    if refresh_interval > 0:
+        threading.Thread(target=refresh_catalog, name="catalog-refresh", daemon=True).start()
+    try:
+        coordinator.run(args.duration)
+    finally:
+        stopped.set()
+        coordinator.stop()
+        config.stop_watching()
+        stats = coordinator.demo_mode.get_stats()
+        budget = coordinator.request_budget()
+        logger.info("Watchlist: %s; requests/s allowed: hot %.1f, warm %.1f",
+                    coordinator.watchlist.summary(), budget['hot'], budget['warm'])
+        logger.info("Demo: %d trades (%d merged), profit $%.2f ($%.4f per merged pair), balance $%.2f",
+                    stats['num_trades'], stats['settled_pairs'], stats['total_profit'],
+                    stats['avg_profit'], stats['current_balance'])
+        logger.info("Settlement: %d merges of %.1f pairs (%.2f pairs/s), $%.2f gas, net edge $%.4f/pair; "
+                    "capital turned over %.2fx (%.1fx/h), $%.2f locked in %d pairs, %d trades refused",
+                    stats['settlements'], stats['pairs_per_settlement'], stats['settled_pairs_per_sec'],
+                    stats['gas_paid'], stats['net_edge'], stats['capital_turnover'],
+                    stats['turnover_per_hour'], stats['locked_capital'], stats['pending_pairs'],
+                    stats['rejected_trades'])
+
+
 def main():
     """Main entry point"""
+    args = parse_args()
+    
     # Check dependencies first
-    check_dependencies()
+    check_dependencies(gui=not args.headless)
     
     # Import after checking dependencies
-    from src.gui.main_window import run_gui
     from src.utils.logger import setup_logger
     
     logger = setup_logger("arbitrage")
@@ -64,12 +194,17 @@ def main():
     logger.info("=" * 60)
     
     try:
-        run_gui()
+        if args.headless:
+            run_headless(args, logger)
+        else:
+            # PyQt6 is only imported in GUI mode
+            from src.gui.main_window import run_gui
+            run_gui(args.loop)
     except KeyboardInterrupt:
         logger.info("\n\nShutdown requested by user")
         sys.exit(0)
     except Exception as e:
-        logger.error(f"Application error: {e}", exc_info=True)
+        logger.error("Application error: %s", e, exc_info=True)
         sys.exit(1)
 
 
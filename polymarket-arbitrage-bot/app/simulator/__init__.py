@@ -0,0 +1,4 @@
+"""Local Polymarket stand-in server for offline load and latency testing"""
+from .server import EndpointProfile, PolymarketSimulator, SimulatorConfig
+
+__all__ = ["EndpointProfile", "PolymarketSimulator", "SimulatorConfig"]
@@ -0,0 +1,97 @@
+"""
+Run the local Polymarket simulator
+    
+    python -m simulator --markets 10000 --port 8765 --rate-limit 100 \
+        --latency-ms 30 --error-rate 0.01 --arb-rate 0.05
+
+Then point config.yaml's polymarket.gamma_api / clob_api at
+http://127.0.0.1:8765 and ws_url at ws://127.0.0.1:8765/ws/market.
+"""
+import argparse
+import asyncio
+
+from .server import EndpointProfile, PolymarketSimulator, SimulatorConfig
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local Polymarket stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--markets", type=int, default=1000, help="Catalog size")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--tick-rate", type=float, default=500.0,
+                        help="Price updates per second across the catalog")
+    parser.add_argument("--arb-rate", type=float, default=0.02,
+                        help="Chance that a price update opens an arbitrage window")
+    parser.add_argument("--arb-duration", type=float, default=3.0,
+                        help="Mean arbitrage window length in seconds")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="Requests per second per client before HTTP 429 (0 = off)")
+    parser.add_argument("--rate-burst", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Median latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Lognormal shape")
+    parser.add_argument("--markets-latency-ms", type=float,
+                        help="Median latency of /markets (default: --latency-ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of HTTP 500s")
+    parser.add_argument("--timeout-rate", type=float, default=0.0,
+                        help="Fraction of requests that hang")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="Fraction of invalid JSON bodies")
+    parser.add_argument("--ws-drop-rate", type=float, default=0.0,
+                        help="Chance per pushed update to drop a WebSocket")
+    parser.add_argument("--max-bulk", type=int, default=500,
+                        help="Most tokens accepted by POST /prices and /books")
+    return parser.parse_args(argv)
+
+
+def build_config(args: argparse.Namespace) -> SimulatorConfig:
+    default = EndpointProfile(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        malformed_rate=args.malformed_rate,
+    )
+    endpoints = {'default': default}
+    if args.markets_latency_ms is not None:
+        endpoints['markets'] = EndpointProfile(
+            latency_ms=args.markets_latency_ms,
+            latency_sigma=args.latency_sigma,
+            error_rate=args.error_rate,
+            timeout_rate=args.timeout_rate,
+            malformed_rate=args.malformed_rate,
+        )
+    return SimulatorConfig(
+        markets=args.markets,
+        seed=args.seed,
+        tick_rate=args.tick_rate,
+        arb_rate=args.arb_rate,
+        arb_duration=args.arb_duration,
+        rate_limit=args.rate_limit,
+        rate_burst=args.rate_burst,
+        ws_drop_rate=args.ws_drop_rate,
+        max_bulk=args.max_bulk,
+        endpoints=endpoints,
+    )
+
+
+async def serve(args: argparse.Namespace):
+    sim = PolymarketSimulator(build_config(args))
+    url = await sim.start(args.host, args.port)
+    print(f"Simulating {len(sim.markets)} markets at {url} (Ctrl+C to stop)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await sim.stop()
+        print(f"Stats: {sim.stats}")
+
+
+def main(argv=None):
+    try:
+        asyncio.run(serve(parse_args(argv)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
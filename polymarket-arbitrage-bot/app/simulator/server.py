@@ -0,0 +1,361 @@
+"""aiohttp stand-in for the gamma and CLOB APIs"""
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from aiohttp import WSMsgType, web
+
+from benchmarks.synthetic import generate_catalog
+
+
+@dataclass
+class EndpointProfile:
+    """Latency and fault behaviour of one endpoint"""
+    latency_ms: float = 20.0      # Median latency
+    latency_sigma: float = 0.5    # Lognormal shape (0 = fixed latency)
+    error_rate: float = 0.0       # Fraction answered with HTTP 500
+    timeout_rate: float = 0.0     # Fraction that hang for `hang_seconds`
+    malformed_rate: float = 0.0   # Fraction answered with invalid JSON
+    hang_seconds: float = 30.0
+    
+    def sample_latency(self, rng: random.Random) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.latency_sigma <= 0:
+            return self.latency_ms / 1000
+        return rng.lognormvariate(0, self.latency_sigma) * self.latency_ms / 1000
+
+
+@dataclass
+class SimulatorConfig:
+    """Knobs for the local Polymarket simulator"""
+    markets: int = 1000
+    seed: int = 1
+    tick_rate: float = 500.0         # Price updates per second across the catalog
+    arb_rate: float = 0.02           # Chance that an update opens an arbitrage window
+    arb_duration: float = 3.0        # Mean window length in seconds
+    arb_edge: Tuple[float, float] = (0.03, 0.08)  # How far YES+NO dips below $1
+    rate_limit: float = 0.0          # Requests/s per client (0 = unlimited)
+    rate_burst: int = 50
+    ws_drop_rate: float = 0.0        # Chance per pushed update to drop a WS connection
+    max_bulk: int = 500              # Most entries accepted by POST /prices and /books
+    endpoints: Dict[str, EndpointProfile] = field(default_factory=dict)
+    
+    def profile(self, name: str) -> EndpointProfile:
+        return self.endpoints.get(name) or self.endpoints.get('default') or EndpointProfile()
+
+
+class _MarketState:
+    """Simulated top of book for one binary market"""
+    
+    __slots__ = ('index', 'condition_id', 'yes_token', 'no_token', 'mid', 'spread',
+                 'edge', 'arb_until', 'updated')
+    
+    def __init__(self, index: int, item: Dict):
+        self.index = index
+        self.condition_id = item['conditionId']
+        self.yes_token, self.no_token = json.loads(item['clobTokenIds'])
+        self.mid = float(json.loads(item['outcomePrices'])[0])
+        self.spread = float(item['spread'])
+        self.edge = 0.0
+        self.arb_until = 0.0
+        self.updated = time.time()
+    
+    def quote(self, outcome: int, now: float) -> Tuple[float, float, float]:
+        """(bid, ask, mid) for YES (0) or NO (1)"""
+        half = self.spread / 2
+        yes_mid = self.mid
+        no_mid = 1.0 - yes_mid
+        if outcome == 0:
+            mid = yes_mid
+        else:
+            # An open arbitrage window makes NO cheap enough for YES + NO < $1
+            mid = no_mid - self.edge if now < self.arb_until else no_mid
+        mid = min(0.99, max(0.01, mid))
+        return round(max(0.001, mid - half), 3), round(min(0.999, mid + half), 3), round(mid, 4)
+
+
+class _TokenBucket:
+    __slots__ = ('tokens', 'updated')
+    
+    def __init__(self, burst: float):
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+
+class PolymarketSimulator:
+    """
+    Serves /markets (gamma), /price, /book and the market WebSocket (CLOB)
+    
+    Usage:
+        sim = PolymarketSimulator(SimulatorConfig(markets=10_000))
+        await sim.start(port=8765)
+        ...
+        await sim.stop()
+    """
+    
+    def __init__(self, config: Optional[SimulatorConfig] = None):
+        self.config = config or SimulatorConfig()
+        self.rng = random.Random(self.config.seed)
+        self.catalog = generate_catalog(self.config.markets, self.config.seed)
+        self.markets = [_MarketState(i, item) for i, item in enumerate(self.catalog)]
+        self.tokens: Dict[str, Tuple[_MarketState, int]] = {}
+        for market in self.markets:
+            self.tokens[market.yes_token] = (market, 0)
+            self.tokens[market.no_token] = (market, 1)
+        
+        self.stats: Dict[str, int] = {}
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._ticker: Optional[asyncio.Task] = None
+        self.port: Optional[int] = None
+    
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get('/markets', self.handle_markets)
+        app.router.add_get('/price', self.handle_price)
+        app.router.add_get('/book', self.handle_book)
+        app.router.add_post('/prices', self.handle_prices)
+        app.router.add_post('/books', self.handle_books)
+        app.router.add_get('/ws/market', self.handle_ws)
+        return app
+    
+    async def start(self, host: str = '127.0.0.1', port: int = 8765) -> str:
+        """Start serving; returns the base URL (port 0 picks a free port)"""
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self._ticker = asyncio.create_task(self._tick_loop())
+        return f"http://{host}:{self.port}"
+    
+    async def stop(self):
+        if self._ticker:
+            self._ticker.cancel()
+            self._ticker = None
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+    
+    def _count(self, key: str):
+        self.stats[key] = self.stats.get(key, 0) + 1
+    
+    def _rate_limited(self, client: str) -> Optional[float]:
+        """Seconds until the client may retry, or None if allowed"""
+        rate = self.config.rate_limit
+        if rate <= 0:
+            return None
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = _TokenBucket(self.config.rate_burst)
+        now = time.monotonic()
+        bucket.tokens = min(self.config.rate_burst, bucket.tokens + (now - bucket.updated) * rate)
+        bucket.updated = now
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return None
+        return (1 - bucket.tokens) / rate
+    
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        name = request.path.strip('/').split('/')[0] or 'root'
+        if name == 'ws':
+            return await handler(request)
+        self._count(f'requests_{name}')
+        
+        retry_after = self._rate_limited(request.remote or 'local')
+        if retry_after is not None:
+            self._count('status_429')
+            return web.json_response({'error': 'rate limited'}, status=429,
+                                     headers={'Retry-After': f"{retry_after:.3f}"})
+        
+        profile = self.config.profile(name)
+        await asyncio.sleep(profile.sample_latency(self.rng))
+        
+        roll = self.rng.random()
+        if roll < profile.error_rate:
+            self._count('status_500')
+            return web.json_response({'error': 'injected failure'}, status=500)
+        roll -= profile.error_rate
+        if roll < profile.timeout_rate:
+            self._count('timeouts')
+            await asyncio.sleep(profile.hang_seconds)
+        roll -= profile.timeout_rate
+        if roll < profile.malformed_rate:
+            self._count('malformed')
+            return web.Response(text='{"truncated": ', content_type='application/json')
+        
+        self._count('status_200')
+        return await handler(request)
+    
+    async def handle_markets(self, request: web.Request) -> web.Response:
+        limit = int(request.query.get('limit', 100))
+        offset = int(request.query.get('offset', 0))
+        return web.json_response(self.catalog[offset:offset + limit])
+    
+    def _lookup(self, request: web.Request):
+        token_id = request.query.get('token_id', '')
+        entry = self.tokens.get(token_id)
+        if entry is None:
+            raise web.HTTPNotFound(text=json.dumps({'error': 'unknown token_id'}),
+                                   content_type='application/json')
+        return token_id, entry
+    
+    async def handle_price(self, request: web.Request) -> web.Response:
+        _, (market, outcome) = self._lookup(request)
+        bid, ask, mid = market.quote(outcome, time.time())
+        side = request.query.get('side', '').upper()
+        price = bid if side == 'SELL' else ask if side == 'BUY' else mid
+        return web.json_response({
+            'price': f"{price}", 'mid': f"{mid}", 'bid': f"{bid}", 'ask': f"{ask}"
+        })
+    
+    def _book(self, token_id: str, market: _MarketState, outcome: int, levels: int = 10) -> Dict:
+        bid, ask, _ = market.quote(outcome, time.time())
+        rng = random.Random(f"{token_id}:{bid}")
+        bids = [{'price': f"{bid - i * 0.01:.3f}", 'size': f"{rng.uniform(5, 2000):.2f}"}
+                for i in range(levels) if bid - i * 0.01 > 0]
+        asks = [{'price': f"{ask + i * 0.01:.3f}", 'size': f"{rng.uniform(5, 2000):.2f}"}
+                for i in range(levels) if ask + i * 0.01 < 1]
+        return {
+            'market': market.condition_id,
+            'asset_id': token_id,
+            'timestamp': str(int(time.time() * 1000)),
+            'bids': bids[::-1],
+            'asks': asks[::-1],
+        }
+    
+    async def handle_book(self, request: web.Request) -> web.Response:
+        token_id, (market, outcome) = self._lookup(request)
+        return web.json_response(self._book(token_id, market, outcome))
+    
+    async def _bulk_body(self, request: web.Request) -> List[Dict]:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text=json.dumps({'error': 'invalid json'}),
+                                     content_type='application/json')
+        if not isinstance(body, list) or len(body) > self.config.max_bulk:
+            raise web.HTTPBadRequest(
+                text=json.dumps({'error': f'expected a list of at most {self.config.max_bulk}'}),
+                content_type='application/json')
+        self.stats['bulk_entries'] = self.stats.get('bulk_entries', 0) + len(body)
+        return body
+    
+    async def handle_prices(self, request: web.Request) -> web.Response:
+        """POST /prices [{token_id, side}] -> {token_id: {side: price}}; unknown tokens are omitted"""
+        now = time.time()
+        result: Dict[str, Dict[str, str]] = {}
+        for entry in await self._bulk_body(request):
+            token_id = str(entry.get('token_id', ''))
+            found = self.tokens.get(token_id)
+            if found is None:
+                continue
+            market, outcome = found
+            bid, ask, _ = market.quote(outcome, now)
+            side = str(entry.get('side', 'BUY')).upper()
+            result.setdefault(token_id, {})[side] = f"{bid if side == 'SELL' else ask}"
+        return web.json_response(result)
+    
+    async def handle_books(self, request: web.Request) -> web.Response:
+        """POST /books [{token_id}] -> [book, ...]; unknown tokens are omitted"""
+        books = []
+        for entry in await self._bulk_body(request):
+            token_id = str(entry.get('token_id', ''))
+            found = self.tokens.get(token_id)
+            if found is not None:
+                books.append(self._book(token_id, *found))
+        return web.json_response(books)
+    
+    async def handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        """
+        Market channel: send {"assets_ids": [...], "type": "market"}, then
+        receive a "book" event per asset followed by "price_change" events.
+        """
+        ws = web.WebSocketResponse(heartbeat=10)
+        await ws.prepare(request)
+        self._count('ws_connections')
+        
+        queue: asyncio.Queue = asyncio.Queue(maxsize=10_000)
+        subscribed: List[str] = []
+        sender = asyncio.create_task(self._ws_sender(ws, queue))
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    payload = json.loads(msg.data)
+                except ValueError:
+                    continue
+                if not isinstance(payload, dict):
+                    continue
+                for token_id in payload.get('assets_ids', []):
+                    entry = self.tokens.get(token_id)
+                    if entry is None:
+                        continue
+                    subscribed.append(token_id)
+                    self._subscribers.setdefault(token_id, set()).add(queue)
+                    event = self._book(token_id, *entry)
+                    event['event_type'] = 'book'
+                    queue.put_nowait(event)
+        finally:
+            for token_id in subscribed:
+                self._subscribers.get(token_id, set()).discard(queue)
+            sender.cancel()
+        return ws
+    
+    async def _ws_sender(self, ws: web.WebSocketResponse, queue: asyncio.Queue):
+        while not ws.closed:
+            event = await queue.get()
+            if self.config.ws_drop_rate and self.rng.random() < self.config.ws_drop_rate:
+                self._count('ws_dropped')
+                await ws.close()
+                return
+            await ws.send_str(json.dumps([event]))
+    
+    def _publish(self, market: _MarketState, now: float):
+        for outcome, token_id in ((0, market.yes_token), (1, market.no_token)):
+            queues = self._subscribers.get(token_id)
+            if not queues:
+                continue
+            bid, ask, _ = market.quote(outcome, now)
+            event = {
+                'event_type': 'price_change',
+                'asset_id': token_id,
+                'market': market.condition_id,
+                'timestamp': str(int(now * 1000)),
+                'changes': [
+                    {'price': f"{bid}", 'side': 'BUY', 'size': f"{self.rng.uniform(5, 2000):.2f}"},
+                    {'price': f"{ask}", 'side': 'SELL', 'size': f"{self.rng.uniform(5, 2000):.2f}"},
+                ],
+            }
+            for queue in list(queues):
+                if not queue.full():
+                    queue.put_nowait(event)
+    
+    def step(self, market: _MarketState, now: float):
+        """Advance one market by one random-walk step"""
+        cfg = self.config
+        market.mid = min(0.97, max(0.03, market.mid + self.rng.gauss(0, 0.004)))
+        if now >= market.arb_until and self.rng.random() < cfg.arb_rate:
+            market.edge = self.rng.uniform(*cfg.arb_edge)
+            market.arb_until = now + self.rng.expovariate(1 / cfg.arb_duration)
+            self._count('arb_windows')
+        market.updated = now
+        self._publish(market, now)
+    
+    async def _tick_loop(self, interval: float = 0.02):
+        """Update `tick_rate` random markets per second"""
+        carry = 0.0
+        while True:
+            await asyncio.sleep(interval)
+            carry += self.config.tick_rate * interval
+            count, carry = int(carry), carry - int(carry)
+            now = time.time()
+            for _ in range(count):
+                self.step(self.rng.choice(self.markets), now)
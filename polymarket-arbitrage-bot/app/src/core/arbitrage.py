@@ -1,18 +1,70 @@
 """Arbitrage detection logic"""
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from .fixed_point import MICROS, apply_rate, from_micros, rate_to_ppm, to_micros
+from ..utils.metrics import DETECTOR_EVALUATIONS, DETECTOR_HITS
+
+# Pre-resolved metric children so checks only pay an integer add
+_evaluations = DETECTOR_EVALUATIONS.labels()
+_hits = DETECTOR_HITS.labels()
 
 
 @dataclass
 class ArbitrageOpportunity:
-    """Represents an arbitrage opportunity"""
+    """Represents an arbitrage opportunity (amounts in micro-dollars)"""
     market_id: str
     market_name: str
-    yes_price: float
-    no_price: float
-    total_cost: float
-    estimated_profit: float
-    profit_percentage: float
+    yes_micros: int
+    no_micros: int
+    cost_micros: int
+    profit_micros: int
+    
+    @property
+    def yes_price(self) -> float:
+        return from_micros(self.yes_micros)
+    
+    @property
+    def no_price(self) -> float:
+        return from_micros(self.no_micros)
+    
+    @property
+    def total_cost(self) -> float:
+        return from_micros(self.cost_micros)
+    
+    @property
+    def estimated_profit(self) -> float:
+        return from_micros(self.profit_micros)
+    
+    @property
+    def profit_percentage(self) -> float:
+        return self.profit_micros / self.cost_micros * 100
+
+
+class DetectorParams(NamedTuple):
+    """Detector thresholds, swapped as one unit on config reload"""
+    min_profit: float
+    trading_fee: float
+    gas_cost: float
+    min_profit_micros: int
+    fee_ppm: int
+    gas_micros: int
+    max_total: int  # largest YES + NO (micro-dollars) that is still profitable
+    
+    @classmethod
+    def build(cls, min_profit: float, trading_fee: float, gas_cost: float) -> "DetectorParams":
+        min_micros, fee_ppm, gas_micros = to_micros(min_profit), rate_to_ppm(trading_fee), to_micros(gas_cost)
+        
+        def profitable(total: int) -> bool:
+            return MICROS - total - apply_rate(total, fee_ppm) - gas_micros > min_micros
+        
+        # Profit falls as the sum rises, so one exact integer bound decides
+        # every quote; start from the closed form and settle rounding
+        total = (MICROS - gas_micros - min_micros) * MICROS // (MICROS + fee_ppm)
+        while profitable(total + 1):
+            total += 1
+        while total >= 0 and not profitable(total):
+            total -= 1
+        return cls(min_profit, trading_fee, gas_cost, min_micros, fee_ppm, gas_micros, total)
 
 
 class ArbitrageDetector:
@@ -25,16 +77,43 @@ class ArbitrageDetector:
             trading_fee: Trading fee percentage (e.g., 0.02 for 2%)
             gas_cost: Estimated gas cost in USD
         """
-        self.min_profit = min_profit
-        self.trading_fee = trading_fee
-        self.gas_cost = gas_cost
+        self._params = DetectorParams.build(min_profit, trading_fee, gas_cost)
     
-    def check_arbitrage(
-        self, 
+    @property
+    def min_profit(self) -> float:
+        return self._params.min_profit
+    
+    @property
+    def trading_fee(self) -> float:
+        return self._params.trading_fee
+    
+    @property
+    def gas_cost(self) -> float:
+        return self._params.gas_cost
+    
+    @property
+    def params(self) -> DetectorParams:
+        return self._params
+    
+    @property
+    def sum_cutoff(self) -> float:
+        """YES + NO below which a quote can be profitable"""
+        return from_micros(self._params.max_total + 1)
+    
+    def configure(self, min_profit: float, trading_fee: float, gas_cost: float):
+        """Replace all thresholds at once; safe to call from another thread"""
+        self._params = DetectorParams.build(min_profit, trading_fee, gas_cost)
+    
+    def apply_snapshot(self, snapshot):
+        """Pick up thresholds from a ConfigSnapshot"""
+        self.configure(snapshot.min_profit, snapshot.trading_fee, snapshot.gas_estimate)
+    
+    def check_micros(
+        self,
         market_id: str,
         market_name: str,
-        yes_price: float, 
-        no_price: float
+        yes_micros: int,
+        no_micros: int
     ) -> Optional[ArbitrageOpportunity]:
         """
         Check if there's an arbitrage opportunity
@@ -42,45 +121,122 @@ class ArbitrageDetector:
         Args:
             market_id: Unique market identifier
             market_name: Human-readable market name
-            yes_price: Price of YES share
-            no_price: Price of NO share
-            
+            yes_micros: Price of YES share in micro-dollars
+            no_micros: Price of NO share in micro-dollars
+        
         Returns:
             ArbitrageOpportunity if profitable, None otherwise
         """
+        _evaluations.inc()
+        params = self._params
+        
         # Calculate total cost
-        total_share_cost = yes_price + no_price
+        total_share_cost = yes_micros + no_micros
+        if total_share_cost > params.max_total:
+            return None
         
-        # Calculate fees
-        fee_amount = total_share_cost * self.trading_fee
+        # Fees (rounded up) and gas; merging always pays out $1.00
+        total_cost = total_share_cost + apply_rate(total_share_cost, params.fee_ppm) + params.gas_micros
+        _hits.inc()
         
-        # Total cost including fees and gas
-        total_cost = total_share_cost + fee_amount + self.gas_cost
+        return ArbitrageOpportunity(
+            market_id=market_id,
+            market_name=market_name,
+            yes_micros=yes_micros,
+            no_micros=no_micros,
+            cost_micros=total_cost,
+            profit_micros=MICROS - total_cost
+        )
+    
+    def check_arbitrage(
+        self,
+        market_id: str,
+        market_name: str,
+        yes_price: float,
+        no_price: float
+    ) -> Optional[ArbitrageOpportunity]:
+        """check_micros() for dollar prices (floats or decimal strings)"""
+        return self.check_micros(market_id, market_name, to_micros(yes_price), to_micros(no_price))
+    
+    def check_batch(
+        self,
+        quotes: Iterable[Tuple[str, str, int, int]]
+    ) -> List[ArbitrageOpportunity]:
+        """
+        Check many markets in one pass
+        
+        Profit only depends on YES + NO, so the thresholds are folded into a
+        single integer bound on the sum up front and most quotes are
+        rejected with one addition and one comparison.
         
-        # Revenue from merging (always $1.00)
-        revenue = 1.0
+        Args:
+            quotes: (market_id, market_name, yes_micros, no_micros) tuples
         
-        # Calculate profit
-        profit = revenue - total_cost
+        Returns:
+            ArbitrageOpportunity for every profitable quote, in input order
+        """
+        params = self._params
+        max_total, fee_ppm, gas = params.max_total, params.fee_ppm, params.gas_micros
         
-        # Check if profitable
-        if profit > self.min_profit:
-            profit_percentage = (profit / total_cost) * 100
+        opportunities = []
+        count = 0
+        for market_id, market_name, yes_micros, no_micros in quotes:
+            count += 1
+            total_share_cost = yes_micros + no_micros
+            if total_share_cost > max_total:
+                continue
             
-            return ArbitrageOpportunity(
+            total_cost = total_share_cost + apply_rate(total_share_cost, fee_ppm) + gas
+            opportunities.append(ArbitrageOpportunity(
                 market_id=market_id,
                 market_name=market_name,
-                yes_price=yes_price,
-                no_price=no_price,
-                total_cost=total_cost,
-                estimated_profit=profit,
-                profit_percentage=profit_percentage
-            )
+                yes_micros=yes_micros,
+                no_micros=no_micros,
+                cost_micros=total_cost,
+                profit_micros=MICROS - total_cost
+            ))
         
-        return None
+        _evaluations.inc(count)
+        _hits.inc(len(opportunities))
+        return opportunities
+    
+    def check_board(self, board, names: Optional[Dict[str, str]] = None) -> List[ArbitrageOpportunity]:
+        """
+        Check every market on a shared PriceBoard
+        
+        The integer bound is compared against the board's mid-price columns
+        in one vectorized pass without copying them; only rows that pass are
+        read consistently and run through check_micros.
+        
+        Args:
+            board: PriceBoard to scan
+            names: Optional market ID -> question for the opportunities
+        
+        Returns:
+            ArbitrageOpportunity for every profitable market, in row order
+        """
+        candidates = board.cheap_rows(self._params.max_total)
+        _evaluations.inc(board.rows_used - len(candidates))
+        
+        opportunities = []
+        for row in candidates:
+            quote = board.read(row)
+            if quote is None:
+                continue
+            market_id = board.market_id(row)
+            opp = self.check_micros(
+                market_id, (names or {}).get(market_id, market_id), quote.yes_mid, quote.no_mid
+            )
+            if opp:
+                opportunities.append(opp)
+        return opportunities
+    
+    def profit_micros(self, yes_micros: int, no_micros: int) -> int:
+        """Profit in micro-dollars for given prices (negative if none)"""
+        params = self._params
+        total = yes_micros + no_micros
+        return MICROS - total - apply_rate(total, params.fee_ppm) - params.gas_micros
     
     def calculate_profit(self, yes_price: float, no_price: float) -> float:
         """Calculate profit for given prices"""
-        total_cost = yes_price + no_price
-        fee = total_cost * self.trading_fee
-        return 1.0 - total_cost - fee - self.gas_cost
+        return from_micros(self.profit_micros(to_micros(yes_price), to_micros(no_price)))
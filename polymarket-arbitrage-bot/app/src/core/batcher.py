@@ -0,0 +1,73 @@
+"""Coalesces per-key requests into bulk calls"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, List, Optional, TypeVar
+
+from ..utils.metrics import registry
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+BATCH_SIZE = registry.histogram(
+    "batch_size", "Keys per bulk request", ("endpoint",),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500))
+
+
+class MicroBatcher(Generic[K, V]):
+    """
+    Collects single-key lookups for up to `window` seconds (or until
+    `max_batch` distinct keys are waiting) and resolves them with one call
+    to `fetch(keys) -> {key: value}`.
+    
+    Concurrent lookups of the same key share one slot. Keys missing from
+    the bulk result resolve to None; if the bulk call raises, every waiter
+    of that batch gets the exception. Must be used from a single event loop.
+    """
+    
+    def __init__(self, fetch: Callable[[List[K]], Awaitable[Dict[K, V]]],
+                 max_batch: int = 100, window: float = 0.005, name: str = "batch"):
+        self.fetch = fetch
+        self.max_batch = max_batch
+        self.window = window
+        self._pending: Dict[K, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self._sizes = BATCH_SIZE.labels(name)
+        self.mean_size = 1.0  # moving average of keys per bulk call
+    
+    async def get(self, key: K) -> Optional[V]:
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            if len(self._pending) >= self.max_batch:
+                self.flush()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+        # Shielded so one cancelled caller does not cancel the shared result
+        return await asyncio.shield(future)
+    
+    def flush(self):
+        """Send everything waiting now"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        self._sizes.observe(len(batch))
+        self.mean_size += 0.05 * (len(batch) - self.mean_size)
+        task = asyncio.get_running_loop().create_task(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _send(self, batch: Dict[K, asyncio.Future]):
+        try:
+            results = await self.fetch(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(results.get(key))
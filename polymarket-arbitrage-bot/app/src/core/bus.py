@@ -0,0 +1,248 @@
+"""In-process market-data bus: bounded, conflating pub/sub between pipeline stages"""
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+from ..utils.logger import setup_logger
+from ..utils.metrics import registry
+
+logger = setup_logger(__name__)
+
+BUS_PUBLISHED = registry.counter("bus_published_total", "Messages published on the bus", ("topic",))
+BUS_QUEUE_DEPTH = registry.gauge(
+    "bus_queue_depth", "Messages waiting for each subscriber", ("topic", "subscriber"))
+BUS_DROPPED = registry.counter(
+    "bus_dropped_total",
+    "Messages a subscriber never saw: replaced by a newer one for the same key "
+    "(conflated) or pushed out of a full queue (overflow)",
+    ("topic", "subscriber", "reason"))
+
+# Topics; prices, books and opportunities are keyed by market (or token) ID
+PRICES = "prices"
+BOOKS = "books"
+OPPORTUNITIES = "opportunities"
+FILLS = "fills"
+TOPICS = (PRICES, BOOKS, OPPORTUNITIES, FILLS)
+
+# Only the latest value per key matters on these; every fill does
+CONFLATED_TOPICS = frozenset((PRICES, BOOKS, OPPORTUNITIES))
+
+
+class SubscriptionClosed(Exception):
+    """Raised by Subscription.get() once the subscription is closed"""
+
+
+class PriceUpdate(NamedTuple):
+    """A market's YES and NO mid in micro-dollars, as published on PRICES"""
+    market_id: str
+    yes_micros: int
+    no_micros: int
+    at: float  # wall-clock time of the quote
+
+
+class Subscription:
+    """
+    One consumer's bounded queue on one topic
+    
+    Conflating subscriptions hold at most one message per key: a newer
+    message replaces the waiting one in place, so a consumer that falls
+    behind catches up on the latest state of each key instead of working
+    through a backlog. Non-conflating ones keep every message. Either way,
+    when `maxsize` messages are waiting the oldest is dropped to make room;
+    publishers never block.
+    
+    Consume with `await get()` (or `async for`) on an event loop, or with
+    drain() from any thread. `on_ready`, if given, is called from the
+    publishing thread whenever the queue goes from empty to non-empty, so
+    at most one notification is ever outstanding.
+    """
+    
+    def __init__(self, topic: str, name: str, maxsize: int = 1024, conflate: bool = True,
+                 on_ready: Optional[Callable[[], None]] = None):
+        self.topic = topic
+        self.name = name
+        self.maxsize = max(1, maxsize)
+        self.conflate = conflate
+        self.on_ready = on_ready
+        self.closed = False
+        self._pending: Dict[Hashable, Any] = {}
+        self._fifo: deque = deque()
+        self._lock = threading.Lock()
+        self._waiter: Optional[asyncio.Future] = None
+        self._depth = BUS_QUEUE_DEPTH.labels(topic, name)
+        self._conflated = BUS_DROPPED.labels(topic, name, "conflated")
+        self._overflow = BUS_DROPPED.labels(topic, name, "overflow")
+    
+    def __len__(self) -> int:
+        return len(self._pending) if self.conflate else len(self._fifo)
+    
+    def offer(self, key: Hashable, message: Any):
+        """Queue a message (called by MarketDataBus.publish)"""
+        with self._lock:
+            if self.conflate:
+                pending = self._pending
+                if key in pending:
+                    pending[key] = message
+                    self._conflated.inc()
+                    return
+                was_empty = not pending
+                if len(pending) >= self.maxsize:
+                    del pending[next(iter(pending))]
+                    self._overflow.inc()
+                pending[key] = message
+                depth = len(pending)
+            else:
+                fifo = self._fifo
+                was_empty = not fifo
+                if len(fifo) >= self.maxsize:
+                    fifo.popleft()
+                    self._overflow.inc()
+                fifo.append((key, message))
+                depth = len(fifo)
+            self._depth.set(depth)
+            waiter = self._waiter
+        if was_empty:
+            if waiter is not None:
+                _wake(waiter)
+            if self.on_ready:
+                self.on_ready()
+    
+    def get_nowait(self) -> Optional[Tuple[Hashable, Any]]:
+        """Oldest waiting (key, message), or None if there is none"""
+        with self._lock:
+            if self.conflate:
+                if not self._pending:
+                    return None
+                key = next(iter(self._pending))
+                item = key, self._pending.pop(key)
+                self._depth.set(len(self._pending))
+            else:
+                if not self._fifo:
+                    return None
+                item = self._fifo.popleft()
+                self._depth.set(len(self._fifo))
+            return item
+    
+    def drain(self) -> List[Tuple[Hashable, Any]]:
+        """Take everything waiting, oldest first"""
+        with self._lock:
+            if self.conflate:
+                items, self._pending = list(self._pending.items()), {}
+            else:
+                items, self._fifo = list(self._fifo), deque()
+            self._depth.set(0)
+            return items
+    
+    async def get(self) -> Tuple[Hashable, Any]:
+        """Wait for the next (key, message); raises SubscriptionClosed once closed"""
+        while True:
+            item = self.get_nowait()
+            if item is not None:
+                return item
+            if self.closed:
+                raise SubscriptionClosed(f"{self.topic}/{self.name}")
+            with self._lock:
+                if len(self):
+                    continue
+                self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self) -> Tuple[Hashable, Any]:
+        try:
+            return await self.get()
+        except SubscriptionClosed:
+            raise StopAsyncIteration
+    
+    def close(self):
+        """Stop delivery and drop what is waiting; a consumer in get() is released"""
+        with self._lock:
+            self.closed = True
+            self._pending, self._fifo = {}, deque()
+            self._depth.set(0)
+            waiter = self._waiter
+        if waiter is not None:
+            _wake(waiter)
+
+
+def _wake(waiter: asyncio.Future):
+    loop = waiter.get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        if not waiter.done():
+            waiter.set_result(None)
+    else:
+        loop.call_soon_threadsafe(lambda: waiter.done() or waiter.set_result(None))
+
+
+class MarketDataBus:
+    """
+    Topic-based fan-out from producers (pollers, scanners, the executor) to
+    consumers (GUI, logging, analytics)
+    
+    publish() never blocks and never grows memory without bound: each
+    subscriber has its own bounded, by default conflating, queue (see
+    Subscription), so one slow consumer only loses intermediate updates of
+    its own and never holds up a producer or another consumer. Detection
+    and execution stay direct calls on the producing side; the bus carries
+    their inputs and results to everyone else.
+    """
+    
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._subscriptions: Dict[str, Tuple[Subscription, ...]] = {topic: () for topic in TOPICS}
+        self._published = {topic: BUS_PUBLISHED.labels(topic) for topic in TOPICS}
+        self._lock = threading.Lock()
+    
+    def subscribe(self, topic: str, name: str, maxsize: Optional[int] = None,
+                  conflate: Optional[bool] = None,
+                  on_ready: Optional[Callable[[], None]] = None) -> Subscription:
+        """
+        New subscription to `topic`
+        
+        Args:
+            name: Subscriber label for the depth and drop metrics
+            maxsize: Queue bound (default: the bus's)
+            conflate: Keep only the latest message per key (default: all
+                topics but fills)
+            on_ready: Called when the queue becomes non-empty
+        """
+        if topic not in self._subscriptions:
+            raise ValueError(f"Unknown topic {topic!r} (expected one of {', '.join(TOPICS)})")
+        subscription = Subscription(
+            topic, name,
+            maxsize=self.maxsize if maxsize is None else maxsize,
+            conflate=topic in CONFLATED_TOPICS if conflate is None else conflate,
+            on_ready=on_ready
+        )
+        with self._lock:
+            self._subscriptions[topic] += (subscription,)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions[subscription.topic] = tuple(
+                s for s in self._subscriptions[subscription.topic] if s is not subscription)
+        subscription.close()
+    
+    def publish(self, topic: str, key: Hashable, message: Any) -> int:
+        """Offer `message` under `key` to every subscriber; returns how many there are"""
+        subscriptions = self._subscriptions[topic]
+        self._published[topic].inc()
+        for subscription in subscriptions:
+            subscription.offer(key, message)
+        return len(subscriptions)
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Queue depth per subscriber, by topic"""
+        return {topic: {s.name: len(s) for s in subscriptions}
+                for topic, subscriptions in self._subscriptions.items() if subscriptions}
@@ -0,0 +1,355 @@
+"""Runtime checkpoints: periodic binary snapshots for a warm restart"""
+import math
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .demo_mode import DemoMode, DemoTrade
+from .market import Market
+from .settlement import PendingMerge
+from ..utils.logger import setup_logger
+from ..utils.metrics import registry
+
+logger = setup_logger(__name__)
+
+CHECKPOINT_WRITE_SECONDS = registry.histogram(
+    "checkpoint_write_seconds", "Time to encode and durably write one checkpoint",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+CHECKPOINT_BYTES = registry.gauge("checkpoint_bytes", "Size of the last checkpoint written")
+
+_MAGIC = b"PMCK"
+# 2 added the catalog figures of markets, 3 the pending merges; older files still load
+_VERSION = 3
+# Optional Market figures, stored as doubles with NaN for None
+_CATALOG_FIELDS = ('liquidity', 'volume', 'spread', 'end_date')
+_NAN = float('nan')
+# magic, version, reserved, written_at, raw payload length, crc32 of the compressed payload
+_HEADER = struct.Struct("<4sHHdII")
+
+
+@dataclass
+class Checkpoint:
+    """
+    Everything needed to resume without waiting on the network
+    
+    Amounts are micro-dollars as in DemoMode. Market prices come back with
+    `stale` set: they seed the display and the poll order, but nothing is
+    executed on them until a fresh quote arrives. Pairs still waiting to be
+    merged come back as they were, with their capital locked.
+    """
+    written_at: float
+    initial_micros: int
+    balance_micros: int
+    profit_micros: int
+    num_trades: int
+    trades: List[DemoTrade] = field(default_factory=list)
+    markets: List[Market] = field(default_factory=list)
+    cooldowns: Dict[str, float] = field(default_factory=dict)  # market ID -> wall-clock end
+    pending: List[PendingMerge] = field(default_factory=list)  # pairs not merged yet
+    
+    @classmethod
+    def capture(cls, demo_mode: DemoMode, markets: Iterable[Market],
+                cooldowns: Optional[Dict[str, float]] = None, max_trades: int = 1000) -> "Checkpoint":
+        """
+        Copy the state to save; cheap enough to call from the owning thread
+        
+        Only the last `max_trades` trades are kept. Markets are copied so
+        later price updates do not race the background encoder.
+        """
+        return cls(
+            written_at=time.time(),
+            initial_micros=demo_mode.initial_micros,
+            balance_micros=demo_mode.balance_micros,
+            profit_micros=demo_mode.profit_micros,
+            num_trades=demo_mode.num_trades,
+            trades=list(demo_mode.trades)[-max_trades:] if max_trades > 0 else [],
+            markets=[Market(m.id, m.question, m.condition_id, m.yes_token_id, m.no_token_id,
+                            m.yes_micros, m.no_micros, m.active, m.quoted_at,
+                            liquidity=m.liquidity, volume=m.volume, spread=m.spread,
+                            end_date=m.end_date)
+                     for m in markets],
+            cooldowns=dict(cooldowns or {}),
+            pending=demo_mode.settlement.pending()
+        )
+    
+    @property
+    def age(self) -> float:
+        return time.time() - self.written_at
+    
+    def restore_demo(self, demo_mode: DemoMode):
+        """Put the saved ledger back into a DemoMode"""
+        demo_mode.initial_micros = self.initial_micros
+        demo_mode.balance_micros = self.balance_micros
+        demo_mode.profit_micros = self.profit_micros
+        demo_mode.num_trades = self.num_trades
+        demo_mode.trades.clear()
+        demo_mode.trades.extend(self.trades)
+        demo_mode.settlement.restore(self.pending)
+
+
+# Encoding: fixed header, then a zlib-compressed payload of columns. Numbers
+# are little-endian arrays; strings are a uint32 length column plus one
+# UTF-8 blob, so thousands of markets encode without per-item objects.
+
+def _le(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class _Encoder:
+    def __init__(self):
+        self.parts: List[bytes] = []
+    
+    def ints(self, typecode: str, values: Iterable[int]):
+        self.parts.append(_le(array(typecode, values)))
+    
+    def floats(self, values: Iterable[float]):
+        self.parts.append(_le(array('d', values)))
+    
+    def strings(self, values: Iterable[str]):
+        encoded = [v.encode() for v in values]
+        self.ints('I', (len(b) for b in encoded))
+        self.parts.append(b"".join(encoded))
+    
+    def payload(self) -> bytes:
+        return b"".join(self.parts)
+
+
+class _Decoder:
+    def __init__(self, data: bytes):
+        self.view = memoryview(data)
+        self.offset = 0
+    
+    def _take(self, size: int) -> memoryview:
+        if self.offset + size > len(self.view):
+            raise ValueError("checkpoint payload is truncated")
+        chunk = self.view[self.offset:self.offset + size]
+        self.offset += size
+        return chunk
+    
+    def ints(self, typecode: str, count: int) -> array:
+        values = array(typecode)
+        values.frombytes(self._take(count * values.itemsize))
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+    
+    def floats(self, count: int) -> array:
+        return self.ints('d', count)
+    
+    def strings(self, count: int) -> List[str]:
+        lengths = self.ints('I', count)
+        blob = bytes(self._take(sum(lengths)))
+        values, start = [], 0
+        for length in lengths:
+            values.append(blob[start:start + length].decode())
+            start += length
+        return values
+
+
+def encode(checkpoint: Checkpoint) -> bytes:
+    out = _Encoder()
+    out.ints('q', (checkpoint.initial_micros, checkpoint.balance_micros,
+                   checkpoint.profit_micros, checkpoint.num_trades))
+    
+    trades = checkpoint.trades
+    out.ints('I', (len(trades),))
+    out.floats(t.timestamp.timestamp() for t in trades)
+    out.strings(t.market_name for t in trades)
+    for attr in ('yes_micros', 'no_micros', 'cost_micros', 'profit_micros'):
+        out.ints('q', (getattr(t, attr) for t in trades))
+    
+    markets = checkpoint.markets
+    out.ints('I', (len(markets),))
+    for attr in ('id', 'question', 'condition_id', 'yes_token_id', 'no_token_id'):
+        out.strings(getattr(m, attr) for m in markets)
+    out.ints('q', (m.yes_micros for m in markets))
+    out.ints('q', (m.no_micros for m in markets))
+    out.floats(m.quoted_at for m in markets)
+    out.ints('B', (m.active for m in markets))
+    for attr in _CATALOG_FIELDS:
+        out.floats(_NAN if getattr(m, attr) is None else getattr(m, attr) for m in markets)
+    
+    cooldowns = checkpoint.cooldowns
+    out.ints('I', (len(cooldowns),))
+    out.strings(cooldowns.keys())
+    out.floats(cooldowns.values())
+    
+    pending = checkpoint.pending
+    out.ints('I', (len(pending),))
+    out.strings(p.condition_id for p in pending)
+    out.ints('I', (p.pairs for p in pending))
+    out.ints('q', (p.cost_micros for p in pending))
+    out.ints('q', (p.gas_micros for p in pending))
+    out.floats(p.opened_at for p in pending)
+    
+    raw = out.payload()
+    body = zlib.compress(raw, 1)
+    return _HEADER.pack(_MAGIC, _VERSION, 0, checkpoint.written_at, len(raw), zlib.crc32(body)) + body
+
+
+def decode(data: bytes) -> Checkpoint:
+    """Parse encode() output; raises ValueError if it is damaged or from another version"""
+    if len(data) < _HEADER.size:
+        raise ValueError("checkpoint is truncated")
+    magic, version, _, written_at, raw_size, crc = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError("not a checkpoint file")
+    if not 1 <= version <= _VERSION:
+        raise ValueError(f"unsupported checkpoint version {version}")
+    body = data[_HEADER.size:]
+    if zlib.crc32(body) != crc:
+        raise ValueError("checkpoint checksum mismatch")
+    raw = zlib.decompress(body)
+    if len(raw) != raw_size:
+        raise ValueError("checkpoint payload size mismatch")
+    
+    inp = _Decoder(raw)
+    initial, balance, profit, num_trades = inp.ints('q', 4)
+    
+    (count,) = inp.ints('I', 1)
+    times = inp.floats(count)
+    names = inp.strings(count)
+    yes, no, cost, gain = (inp.ints('q', count) for _ in range(4))
+    trades = [
+        DemoTrade(datetime.fromtimestamp(times[i]), names[i], yes[i], no[i], cost[i], gain[i])
+        for i in range(count)
+    ]
+    
+    (count,) = inp.ints('I', 1)
+    ids, questions, conditions, yes_tokens, no_tokens = (inp.strings(count) for _ in range(5))
+    yes, no = inp.ints('q', count), inp.ints('q', count)
+    quoted_at = inp.floats(count)
+    active = inp.ints('B', count)
+    markets = [
+        Market(ids[i], questions[i], conditions[i], yes_tokens[i], no_tokens[i],
+               yes[i], no[i], bool(active[i]), quoted_at[i], stale=True)
+        for i in range(count)
+    ]
+    if version >= 2:
+        for attr in _CATALOG_FIELDS:
+            for market, value in zip(markets, inp.floats(count)):
+                setattr(market, attr, None if math.isnan(value) else value)
+    
+    (count,) = inp.ints('I', 1)
+    cooldowns = dict(zip(inp.strings(count), inp.floats(count)))
+    
+    pending = []
+    if version >= 3:
+        (count,) = inp.ints('I', 1)
+        conditions = inp.strings(count)
+        pairs, cost, gas = inp.ints('I', count), inp.ints('q', count), inp.ints('q', count)
+        opened_at = inp.floats(count)
+        pending = [PendingMerge(conditions[i], pairs[i], cost[i], gas[i], opened_at[i])
+                   for i in range(count)]
+    
+    return Checkpoint(written_at, initial, balance, profit, num_trades, trades, markets, cooldowns,
+                      pending)
+
+
+def save(path: Path, data: bytes):
+    """Replace `path` atomically: a crash leaves either the old file or the new one"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    if hasattr(os, "O_DIRECTORY"):
+        # Make the rename itself durable
+        fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def load(path: Path) -> Optional[Checkpoint]:
+    """Read a checkpoint; None if there is none or it cannot be used"""
+    try:
+        checkpoint = decode(Path(path).read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, zlib.error) as e:
+        logger.warning("Ignoring checkpoint %s: %s", path, e)
+        return None
+    logger.info("Restored checkpoint from %.1fs ago: %d markets, %d trades, balance $%.2f",
+                checkpoint.age, len(checkpoint.markets), checkpoint.num_trades,
+                checkpoint.balance_micros / 1_000_000)
+    return checkpoint
+
+
+class CheckpointWriter:
+    """
+    Writes checkpoints on a background thread
+    
+    The owner captures state on its own thread (Checkpoint.capture) and
+    submits it; encoding, compression and the fsync happen here. Only the
+    newest submission is kept, so a slow disk delays checkpoints but never
+    queues them up or blocks the caller.
+    """
+    
+    def __init__(self, path: Path, interval: float = 5.0):
+        self.path = Path(path)
+        self.interval = interval
+        self._pending: Optional[Checkpoint] = None
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._last_submit = 0.0
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> "CheckpointWriter":
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+        return self
+    
+    def due(self) -> bool:
+        """True once `interval` has passed since the last submission"""
+        return time.monotonic() - self._last_submit >= self.interval
+    
+    def submit(self, checkpoint: Checkpoint):
+        with self._cond:
+            self._pending = checkpoint
+            self._last_submit = time.monotonic()
+            self._cond.notify()
+    
+    def _write(self, checkpoint: Checkpoint):
+        start = time.perf_counter()
+        data = encode(checkpoint)
+        save(self.path, data)
+        CHECKPOINT_WRITE_SECONDS.observe(time.perf_counter() - start)
+        CHECKPOINT_BYTES.set(len(data))
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopping:
+                    self._cond.wait()
+                checkpoint, self._pending = self._pending, None
+                if checkpoint is None:
+                    return
+            try:
+                self._write(checkpoint)
+            except Exception as e:
+                logger.warning("Checkpoint write failed: %s", e)
+    
+    def stop(self, final: Optional[Checkpoint] = None, timeout: float = 5.0):
+        """Write `final` (or whatever is pending) and stop the thread"""
+        with self._cond:
+            if final is not None:
+                self._pending = final
+            self._stopping = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
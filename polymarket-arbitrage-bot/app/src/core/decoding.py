@@ -0,0 +1,157 @@
+"""Typed decoding of gamma and CLOB JSON payloads"""
+import asyncio
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .fixed_point import Quote, to_micros
+from .orderbook import OrderBook
+
+try:
+    import msgspec
+except ImportError:  # optional: the json module gives the same results, only slower
+    msgspec = None
+
+# Bodies at least this large are decoded on a worker thread so the event
+# loop keeps serving other requests meanwhile
+OFF_LOOP_BYTES = 256 * 1024
+
+Number = Union[str, float]
+
+if msgspec:
+    # Schemas name only the fields the bot uses; msgspec skips the rest of
+    # each object without building it
+    
+    class GammaToken(msgspec.Struct):
+        token_id: str = ""
+    
+    class GammaMarket(msgspec.Struct):
+        id: Union[str, int] = ""
+        question: str = "Unknown Market"
+        condition_id: str = ""
+        conditionId: str = ""
+        tokens: List[GammaToken] = []
+        clobTokenIds: Optional[str] = None  # JSON-encoded list inside the JSON
+        active: Optional[bool] = True
+        liquidity: Optional[Number] = None
+        liquidityNum: Optional[float] = None
+        volume: Optional[Number] = None
+        volumeNum: Optional[float] = None
+        spread: Optional[float] = None
+        endDate: Optional[str] = None
+    
+    class BookLevel(msgspec.Struct):
+        # Decimal strings, read as floats (strict=False); see _side()
+        price: float
+        size: float
+    
+    class Book(msgspec.Struct):
+        asset_id: str = ""
+        bids: List[BookLevel] = []
+        asks: List[BookLevel] = []
+    
+    class Price(msgspec.Struct):
+        price: Optional[Number] = None
+        mid: Optional[Number] = None
+        bid: Optional[Number] = None
+        ask: Optional[Number] = None
+    
+    loads: Callable[[bytes], Any] = msgspec.json.decode
+    _markets = msgspec.json.Decoder(List[GammaMarket])
+    _token_ids = msgspec.json.Decoder(List[str])
+    _book = msgspec.json.Decoder(Book, strict=False)
+    _books = msgspec.json.Decoder(List[Book], strict=False)
+    _price = msgspec.json.Decoder(Price)
+    _prices = msgspec.json.Decoder(Dict[str, Dict[str, Number]])
+else:
+    loads = json.loads
+
+
+async def decode(decoder: Callable[[bytes], Any], body: bytes) -> Any:
+    """Run `decoder(body)`, on the default executor if the body is large"""
+    if len(body) < OFF_LOOP_BYTES:
+        return decoder(body)
+    return await asyncio.get_running_loop().run_in_executor(None, decoder, body)
+
+
+def gamma_markets(body: bytes) -> Optional[list]:
+    """
+    Gamma /markets items as typed records (see GammaMarket)
+    
+    Returns None when msgspec is not installed or the payload does not
+    fit the schema; decode it generically then.
+    """
+    if msgspec is None:
+        return None
+    try:
+        return _markets.decode(body)
+    except msgspec.ValidationError:
+        return None
+
+
+def token_pair(item) -> Tuple[str, str]:
+    """YES and NO token IDs of a GammaMarket, from `tokens` or `clobTokenIds`"""
+    if item.tokens:
+        tokens = item.tokens
+        return tokens[0].token_id, tokens[1].token_id if len(tokens) > 1 else ""
+    ids = _token_ids.decode(item.clobTokenIds) if item.clobTokenIds else []
+    return (ids[0] if ids else "", ids[1] if len(ids) > 1 else "")
+
+
+def _quote(price, mid, bid, ask) -> Quote:
+    mid_micros = to_micros(mid if mid is not None else price if price is not None else '0')
+    return Quote(
+        bid=mid_micros if bid is None else to_micros(bid),
+        ask=mid_micros if ask is None else to_micros(ask),
+        mid=mid_micros
+    )
+
+
+def decode_quote(body: bytes) -> Quote:
+    """CLOB /price body to a Quote; bid and ask default to the mid"""
+    if msgspec:
+        data = _price.decode(body)
+        return _quote(data.price, data.mid, data.bid, data.ask)
+    data = json.loads(body)
+    return _quote(data.get('price'), data.get('mid'), data.get('bid'), data.get('ask'))
+
+
+def decode_prices(body: bytes) -> Dict[str, Quote]:
+    """
+    CLOB POST /prices body ({token: {side: price}}) to a Quote per token
+    
+    Buying pays the ask and selling gets the bid; they are taken by value
+    so either side naming convention reads the same.
+    """
+    data = _prices.decode(body) if msgspec else json.loads(body)
+    quotes = {}
+    for token_id, sides in data.items():
+        prices = [to_micros(p) for p in sides.values()]
+        if prices:
+            bid, ask = min(prices), max(prices)
+            quotes[token_id] = Quote(bid, ask, (bid + ask) // 2)
+    return quotes
+
+
+def _side(levels) -> Dict[int, int]:
+    # A double holds any price or size with up to six decimals closely
+    # enough that rounding recovers the exact micro value (see to_micros)
+    return {int(level.price * 1_000_000 + 0.5): int(level.size * 1_000_000 + 0.5)
+            for level in levels if level.size > 0}
+
+
+def decode_book(body: bytes, token_id: str = "") -> OrderBook:
+    """CLOB /book body straight into an OrderBook"""
+    if msgspec:
+        book = _book.decode(body)
+        return OrderBook.from_micros(book.asset_id or token_id, _side(book.bids), _side(book.asks))
+    data = json.loads(body)
+    return OrderBook.from_snapshot(data.get('asset_id') or token_id, data)
+
+
+def decode_books(body: bytes) -> Dict[str, OrderBook]:
+    """CLOB POST /books body to an OrderBook per asset ID"""
+    if msgspec:
+        return {book.asset_id: OrderBook.from_micros(book.asset_id, _side(book.bids), _side(book.asks))
+                for book in _books.decode(body)}
+    return {data.get('asset_id', ''): OrderBook.from_snapshot(data.get('asset_id', ''), data)
+            for data in json.loads(body)}
@@ -1,21 +1,42 @@
 """Demo mode - simulated trading with fake money"""
-from typing import List
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
 from dataclasses import dataclass
 from datetime import datetime
-from ..utils.logger import setup_logger
+from .fixed_point import MICROS, apply_rate, from_micros, rate_to_ppm, to_micros
+from .settlement import Settlement, SettlementQueue
+from ..utils.logger import setup_logger, log_event
 
 logger = setup_logger(__name__)
 
 
 @dataclass
 class DemoTrade:
-    """Represents a demo trade"""
+    """Represents a demo trade (amounts in micro-dollars)"""
     timestamp: datetime
     market_name: str
-    yes_price: float
-    no_price: float
-    total_cost: float
-    profit: float
+    yes_micros: int
+    no_micros: int
+    cost_micros: int
+    profit_micros: int
+    
+    @property
+    def yes_price(self) -> float:
+        return from_micros(self.yes_micros)
+    
+    @property
+    def no_price(self) -> float:
+        return from_micros(self.no_micros)
+    
+    @property
+    def total_cost(self) -> float:
+        return from_micros(self.cost_micros)
+    
+    @property
+    def profit(self) -> float:
+        return from_micros(self.profit_micros)
     
     def __str__(self):
         return (f"[DEMO] {self.timestamp.strftime('%H:%M:%S')} - {self.market_name}: "
@@ -24,14 +45,61 @@ class DemoTrade:
 
 
 class DemoMode:
-    """Demo trading mode with simulated money"""
+    """
+    Demo trading mode with simulated money
     
-    def __init__(self, initial_balance: float = 1000.0):
-        self.initial_balance = initial_balance
-        self.balance = initial_balance
-        self.total_profit = 0.0
-        self.trades: List[DemoTrade] = []
+    The ledger is kept in integer micro-dollars, so balance and profit stay
+    exact over any number of trades; the float attributes are for display.
+    Only the last `trade_history` trades are kept as records; the totals
+    cover every trade.
+    
+    Bought pairs are merged through a SettlementQueue: a trade pays for its
+    shares at once, and the $1.00 per pair (less gas, one fee per merge)
+    comes back when its condition's batch is merged. Until then the capital
+    is locked, and a trade the unlocked balance cannot pay for is refused.
+    `balance` is the unlocked balance; `total_profit` counts merged pairs.
+    With batch_size=1 every pair is merged right away. A trade record shows
+    its profit before gas until its batch is merged, then with its share of
+    that merge's gas (records restored from a checkpoint keep the former).
+    """
+    
+    def __init__(self, initial_balance: float = 1000.0, trade_history: int = 1000,
+                 batch_size: int = 1, max_age: float = 0.0):
+        self.initial_micros = to_micros(initial_balance)
+        self.balance_micros = self.initial_micros
+        self.profit_micros = 0
+        self.trades: Deque[DemoTrade] = deque(maxlen=max(1, trade_history))
         self.num_trades = 0
+        self.settlement = SettlementQueue(batch_size, max_age)
+        # Records of the pairs waiting in each condition's batch, to book their gas at the merge
+        self._unmerged: Dict[str, List[DemoTrade]] = {}
+        self._reset_settlement_stats()
+    
+    def _reset_settlement_stats(self):
+        self.started_at = time.time()
+        self.rejected_trades = 0
+        self.settlements = 0
+        self.settled_pairs = 0
+        self.settled_cost_micros = 0
+        self.gas_paid_micros = 0
+        self.settle_wait_total = 0.0
+    
+    @property
+    def initial_balance(self) -> float:
+        return from_micros(self.initial_micros)
+    
+    @property
+    def balance(self) -> float:
+        return from_micros(self.balance_micros)
+    
+    @property
+    def total_profit(self) -> float:
+        return from_micros(self.profit_micros)
+    
+    @property
+    def locked_micros(self) -> int:
+        """Paid for pairs that have not been merged yet"""
+        return self.settlement.locked_micros
     
     def execute_arbitrage(
         self,
@@ -39,8 +107,9 @@ class DemoMode:
         yes_price: float,
         no_price: float,
         trading_fee: float = 0.02,
-        gas_cost: float = 0.01
-    ) -> DemoTrade:
+        gas_cost: float = 0.01,
+        condition_id: str = ""
+    ) -> Optional[DemoTrade]:
         """
         Execute a simulated arbitrage trade
         
@@ -49,53 +118,125 @@ class DemoMode:
             yes_price: YES share price
             no_price: NO share price
             trading_fee: Trading fee percentage
-            gas_cost: Estimated gas cost
-            
+            gas_cost: Estimated gas cost of one merge
+            condition_id: Condition the pair is merged under (default: market_name)
+        
         Returns:
-            DemoTrade object with results
+            DemoTrade object with results, or None if the unlocked balance
+            cannot pay for the pair
         """
-        # Calculate costs
-        share_cost = yes_price + no_price
-        fee_amount = share_cost * trading_fee
-        total_cost = share_cost + fee_amount + gas_cost
-        
-        # Simulate buying
-        logger.info(f"[DEMO] Buying YES share @ ${yes_price:.2f}")
-        logger.info(f"[DEMO] Buying NO share @ ${no_price:.2f}")
-        
-        # Update balance
-        self.balance -= total_cost
+        return self.execute_micros(
+            market_name, to_micros(yes_price), to_micros(no_price),
+            rate_to_ppm(trading_fee), to_micros(gas_cost), condition_id
+        )
+    
+    def execute_micros(
+        self,
+        market_name: str,
+        yes_micros: int,
+        no_micros: int,
+        fee_ppm: int = 20_000,
+        gas_micros: int = 10_000,
+        condition_id: str = "",
+        now: Optional[float] = None
+    ) -> Optional[DemoTrade]:
+        """execute_arbitrage() with prices in micro-dollars and the fee in ppm"""
+        now = time.time() if now is None else now
+        # Merges that are due free their capital first
+        self.settle(now)
         
-        # Simulate merging (always receive $1.00)
-        logger.info(f"[DEMO] Merging positions...")
-        merge_payout = 1.0
-        self.balance += merge_payout
+        # Calculate costs (fees rounded up, as the detector does)
+        share_cost = yes_micros + no_micros
+        pair_cost = share_cost + apply_rate(share_cost, fee_ppm)
+        if pair_cost > self.balance_micros:
+            self.rejected_trades += 1
+            logger.debug("[DEMO] Skipped %s: $%.2f unlocked, $%.2f waiting on merges",
+                         market_name, self.balance, from_micros(self.locked_micros))
+            return None
         
-        # Calculate profit
-        profit = merge_payout - total_cost
-        self.total_profit += profit
+        # Pay for both sides now; the pair is merged (for $1.00) with its
+        # batch, and its share of the gas is booked then
+        self.balance_micros -= pair_cost
         self.num_trades += 1
+        total_cost = pair_cost
+        profit = MICROS - total_cost
         
         # Create trade record
         trade = DemoTrade(
-            timestamp=datetime.now(),
+            timestamp=datetime.fromtimestamp(now),
             market_name=market_name,
-            yes_price=yes_price,
-            no_price=no_price,
-            total_cost=total_cost,
-            profit=profit
+            yes_micros=yes_micros,
+            no_micros=no_micros,
+            cost_micros=total_cost,
+            profit_micros=profit
         )
         
         self.trades.append(trade)
+        condition_id = condition_id or market_name
+        self._unmerged.setdefault(condition_id, []).append(trade)
+        settlement = self.settlement.add(condition_id, pair_cost, gas_micros, now)
+        if settlement:
+            self._settle(settlement)
         
-        logger.info(f"[DEMO] Trade complete! Profit: ${profit:.4f}")
-        logger.info(f"[DEMO] New balance: ${self.balance:.2f}")
+        log_event(
+            logger, "demo_trade",
+            "[DEMO] Bought YES @ $%(yes_price).2f + NO @ $%(no_price).2f. "
+            "Profit: $%(profit).4f before gas, balance: $%(balance).2f",
+            market=market_name, yes_price=from_micros(yes_micros), no_price=from_micros(no_micros),
+            total_cost=from_micros(total_cost), profit=from_micros(profit), balance=self.balance
+        )
         
         return trade
     
-    def get_stats(self) -> dict:
-        """Get trading statistics"""
-        avg_profit = self.total_profit / self.num_trades if self.num_trades > 0 else 0
+    def settle(self, now: Optional[float] = None, flush: bool = False) -> List[Settlement]:
+        """Merge the batches that are due (all of them with `flush`) and credit the payouts"""
+        settlements = self.settlement.flush(now) if flush else self.settlement.due(now)
+        for settlement in settlements:
+            self._settle(settlement)
+        return settlements
+    
+    def _settle(self, settlement: Settlement):
+        self.balance_micros += settlement.payout_micros - settlement.gas_micros
+        self.profit_micros += settlement.profit_micros
+        self.settlements += 1
+        self.settled_pairs += settlement.pairs
+        self.settled_cost_micros += settlement.cost_micros
+        self.gas_paid_micros += settlement.gas_micros
+        self.settle_wait_total += settlement.wait
+        
+        # Each merged pair carries an equal share of this merge's gas; the
+        # first few take the remainder, so the shares add up exactly
+        trades = self._unmerged.pop(settlement.condition_id, ())
+        share, remainder = divmod(settlement.gas_micros, settlement.pairs)
+        for i, trade in enumerate(trades):
+            gas = share + 1 if i < remainder else share
+            trade.cost_micros += gas
+            trade.profit_micros -= gas
+        
+        log_event(
+            logger, "demo_merge",
+            "[DEMO] Merged %(pairs)d pairs of %(condition)s after %(wait).1fs. "
+            "Profit: $%(profit).4f after $%(gas).4f gas, balance: $%(balance).2f",
+            level=logging.INFO if settlement.pairs > 1 else logging.DEBUG,
+            condition=settlement.condition_id, pairs=settlement.pairs, wait=settlement.wait,
+            profit=from_micros(settlement.profit_micros), gas=from_micros(settlement.gas_micros),
+            balance=self.balance
+        )
+    
+    def get_stats(self, now: Optional[float] = None) -> dict:
+        """
+        Get trading statistics
+        
+        Profit covers merged pairs only, so avg_profit is per merged pair;
+        trades still waiting on a merge are in pending_pairs. Settlement
+        figures cover the time since the DemoMode was created or reset:
+        capital turnover is the cost of merged pairs over the initial
+        balance, and net edge the profit per merged pair after fees and gas.
+        """
+        avg_profit = self.total_profit / self.settled_pairs if self.settled_pairs else 0
+        elapsed = max((time.time() if now is None else now) - self.started_at, 1e-9)
+        turnover = self.settled_cost_micros / self.initial_micros if self.initial_micros else 0.0
+        settlements, pairs = self.settlements, self.settled_pairs
         
         return {
             'initial_balance': self.initial_balance,
@@ -103,13 +244,28 @@ class DemoMode:
             'total_profit': self.total_profit,
             'num_trades': self.num_trades,
             'avg_profit': avg_profit,
-            'win_rate': 100.0 if self.num_trades > 0 else 0  # Arbitrage always wins
+            'win_rate': 100.0 if self.num_trades > 0 else 0,  # Arbitrage always wins
+            'locked_capital': from_micros(self.locked_micros),
+            'pending_pairs': self.settlement.pending_pairs,
+            'rejected_trades': self.rejected_trades,
+            'settlements': settlements,
+            'settled_pairs': pairs,
+            'pairs_per_settlement': pairs / settlements if settlements else 0,
+            'mean_settle_seconds': self.settle_wait_total / settlements if settlements else 0,
+            'settled_pairs_per_sec': pairs / elapsed,
+            'gas_paid': from_micros(self.gas_paid_micros),
+            'capital_turnover': turnover,
+            'turnover_per_hour': turnover / elapsed * 3600,
+            'net_edge': from_micros(self.profit_micros) / pairs if pairs else 0
         }
     
     def reset(self):
         """Reset demo account to initial state"""
-        self.balance = self.initial_balance
-        self.total_profit = 0.0
-        self.trades = []
+        self.balance_micros = self.initial_micros
+        self.profit_micros = 0
+        self.trades.clear()
         self.num_trades = 0
-        logger.info(f"[DEMO] Account reset to ${self.initial_balance:.2f}")
+        self.settlement.clear()
+        self._unmerged.clear()
+        self._reset_settlement_stats()
+        logger.info("[DEMO] Account reset to $%.2f", self.initial_balance)
@@ -0,0 +1,90 @@
+"""Incremental min/max downsampling of price series for charts"""
+from array import array
+from typing import List
+
+
+class MinMaxSeries:
+    """
+    A growing multi-field series reduced to between `target` and 2x
+    `target` buckets
+    
+    Each bucket keeps the time of its first tick and, per field, the
+    lowest and highest value seen in it, so a brief dip or spike survives
+    any amount of reduction (an arbitrage edge is usually exactly that).
+    Appending updates the last bucket in O(1). When there are more than
+    2x `target` buckets, neighbours are merged pairwise and the bucket size
+    doubles, so the cost stays amortized O(1) per tick and memory stays
+    bounded however long the series runs. `version` changes whenever
+    existing buckets are rewritten, so a consumer can tell an append from
+    a rebuild.
+    """
+    
+    __slots__ = ('fields', 'target', 'times', 'lows', 'highs', 'bucket_size',
+                 'ticks', 'version', '_fill')
+    
+    def __init__(self, fields: int, target: int = 1024):
+        self.fields = fields
+        self.target = max(2, target)
+        self.times = array('d')
+        self.lows: List[array] = [array('d') for _ in range(fields)]
+        self.highs: List[array] = [array('d') for _ in range(fields)]
+        self.bucket_size = 1
+        self.ticks = 0
+        self.version = 0
+        self._fill = 0  # ticks in the last bucket
+    
+    def __len__(self) -> int:
+        return len(self.times)
+    
+    def append(self, t: float, *values: float) -> bool:
+        """
+        Add one tick (one value per field)
+        
+        Returns:
+            True if the tick started a new bucket, False if it updated the last one
+        """
+        self.ticks += 1
+        if self._fill and self._fill < self.bucket_size:
+            self._fill += 1
+            for lows, highs, value in zip(self.lows, self.highs, values):
+                if value < lows[-1]:
+                    lows[-1] = value
+                if value > highs[-1]:
+                    highs[-1] = value
+            return False
+        
+        self.times.append(t)
+        for lows, highs, value in zip(self.lows, self.highs, values):
+            lows.append(value)
+            highs.append(value)
+        self._fill = 1
+        if len(self.times) > 2 * self.target:
+            self._halve()
+        return True
+    
+    def _halve(self):
+        odd = len(self.times) % 2
+        self.times = self.times[::2]
+        self.lows = [_pairwise(min, lows, odd) for lows in self.lows]
+        self.highs = [_pairwise(max, highs, odd) for highs in self.highs]
+        if not odd:
+            # The last pair merged a full bucket with the partial one
+            self._fill += self.bucket_size
+        self.bucket_size *= 2
+        self.version += 1
+    
+    def clear(self):
+        self.times = array('d')
+        self.lows = [array('d') for _ in range(self.fields)]
+        self.highs = [array('d') for _ in range(self.fields)]
+        self.bucket_size = 1
+        self.ticks = 0
+        self._fill = 0
+        self.version += 1
+
+
+def _pairwise(pick, values: array, odd: int) -> array:
+    merged = array('d', map(pick, values[0::2], values[1::2]))
+    if odd:
+        merged.append(values[-1])
+    return merged
@@ -0,0 +1,70 @@
+"""Integer micro-dollar prices and amounts"""
+from typing import NamedTuple, Union
+
+# Prices are micro-dollars per share (0.52 -> 520_000); amounts are micro-dollars
+MICROS = 1_000_000
+# Rates such as the trading fee are parts per million (2% -> 20_000)
+PPM = 1_000_000
+# Price assumed for a side with no quote (an even market)
+EVEN = MICROS // 2
+
+Number = Union[str, int, float]
+
+
+def to_micros(value: Number) -> int:
+    """
+    Convert a price or amount to micro-dollars
+    
+    Decimal strings (as sent by the API) are exact: up to six decimals and
+    nine integer digits a double carries the value closely enough that
+    rounding recovers it, and anything longer is parsed digit by digit.
+    Floats and digits past the sixth decimal are rounded half away from
+    zero.
+    """
+    if value.__class__ is str:
+        dot = value.find('.')
+        if (dot < 0 and len(value) > 9) or dot > 9 or len(value) - dot > 7:
+            return _parse_decimal(value)
+        value = float(value)
+    elif isinstance(value, int):
+        return value * MICROS
+    scaled = value * MICROS
+    return int(scaled + 0.5) if scaled >= 0 else -int(0.5 - scaled)
+
+
+def _parse_decimal(text: str) -> int:
+    text = text.strip()
+    negative = text.startswith('-')
+    whole, _, frac = text.lstrip('+-').partition('.')
+    if not ((whole.isdigit() or (not whole and frac)) and (not frac or frac.isdigit())):
+        return to_micros(float(text))
+    micros = int(whole or 0) * MICROS + int(frac[:6].ljust(6, '0'))
+    if len(frac) > 6 and frac[6] >= '5':
+        micros += 1
+    return -micros if negative else micros
+
+
+def from_micros(micros: int) -> float:
+    """Micro-dollars as a float, for display and statistics only"""
+    return micros / MICROS
+
+
+def rate_to_ppm(rate: float) -> int:
+    """Fraction (0.02) to parts per million (20_000)"""
+    return int(rate * PPM + 0.5)
+
+
+def apply_rate(amount: int, rate_ppm: int) -> int:
+    """`amount * rate`, rounded up so fees are never underestimated"""
+    return -(-amount * rate_ppm // PPM)
+
+
+class Quote(NamedTuple):
+    """Top of book for one token, in micro-dollars"""
+    bid: int
+    ask: int
+    mid: int
+    
+    @property
+    def price(self) -> float:
+        return self.mid / MICROS
@@ -0,0 +1,133 @@
+"""Per-market price history in fixed ring buffers with rolling statistics"""
+import math
+from array import array
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+
+class HistoryStats(NamedTuple):
+    """Rolling statistics of one market, as of its last tick"""
+    count: int
+    last_time: float
+    yes_price: float
+    no_price: float
+    ewma_sum: float          # exponentially weighted YES + NO
+    sum_volatility: float    # weighted std-dev of YES + NO around ewma_sum
+    yes_volatility: float    # weighted RMS of tick-to-tick YES changes
+    last_below: float        # time YES + NO was last below the threshold (0 = never)
+    
+    @property
+    def ewma_spread(self) -> float:
+        """Weighted distance of YES + NO below $1.00 (positive = cheap)"""
+        return 1.0 - self.ewma_sum
+    
+    def seconds_since_below(self, now: float) -> Optional[float]:
+        return now - self.last_below if self.last_below else None
+
+
+class MarketHistory:
+    """
+    Last `capacity` ticks of one market plus incrementally updated stats
+    
+    Ticks go into three preallocated array('d') rings, so recording one
+    never allocates. The statistics are exponentially weighted by elapsed
+    time (weight halves every `halflife` seconds) and updated in O(1) per
+    tick; reading them is O(1) too.
+    """
+    
+    __slots__ = ('capacity', 'threshold', '_decay', '_t', '_yes', '_no', 'count',
+                 '_mean', '_var', '_yes_var', '_last_below')
+    
+    def __init__(self, capacity: int = 1024, halflife: float = 30.0, threshold: float = 1.0):
+        self.capacity = capacity
+        self.threshold = threshold
+        self._decay = math.log(2) / halflife
+        self._t = array('d', bytes(8 * capacity))
+        self._yes = array('d', bytes(8 * capacity))
+        self._no = array('d', bytes(8 * capacity))
+        self.count = 0
+        self._mean = 0.0
+        self._var = 0.0
+        self._yes_var = 0.0
+        self._last_below = 0.0
+    
+    def record(self, t: float, yes: float, no: float):
+        count = self.count
+        total = yes + no
+        if count:
+            last = (count - 1) % self.capacity
+            dt = t - self._t[last]
+            alpha = 1.0 - math.exp(-self._decay * dt) if dt > 0 else 0.0
+            diff = total - self._mean
+            incr = alpha * diff
+            self._mean += incr
+            self._var = (1.0 - alpha) * (self._var + diff * incr)
+            move = yes - self._yes[last]
+            self._yes_var = (1.0 - alpha) * self._yes_var + alpha * move * move
+        else:
+            self._mean = total
+        
+        if total < self.threshold:
+            self._last_below = t
+        
+        slot = count % self.capacity
+        self._t[slot] = t
+        self._yes[slot] = yes
+        self._no[slot] = no
+        self.count = count + 1
+    
+    def stats(self) -> HistoryStats:
+        if not self.count:
+            return HistoryStats(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        last = (self.count - 1) % self.capacity
+        return HistoryStats(
+            count=self.count,
+            last_time=self._t[last],
+            yes_price=self._yes[last],
+            no_price=self._no[last],
+            ewma_sum=self._mean,
+            sum_volatility=math.sqrt(self._var),
+            yes_volatility=math.sqrt(self._yes_var),
+            last_below=self._last_below
+        )
+    
+    def window(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Buffered ticks oldest first, as (t, yes, no) array copies"""
+        size = min(self.count, self.capacity)
+        start = self.count - size
+        order = (np.arange(start, self.count) % self.capacity) if size else np.arange(0)
+        return (
+            np.frombuffer(self._t, dtype=np.float64)[order],
+            np.frombuffer(self._yes, dtype=np.float64)[order],
+            np.frombuffer(self._no, dtype=np.float64)[order]
+        )
+
+
+class PriceHistory:
+    """MarketHistory per market ID, created on the first tick"""
+    
+    def __init__(self, capacity: int = 1024, halflife: float = 30.0, threshold: float = 1.0):
+        self.capacity = capacity
+        self.halflife = halflife
+        self.threshold = threshold
+        self.markets: Dict[str, MarketHistory] = {}
+    
+    def record(self, market_id: str, t: float, yes: float, no: float) -> MarketHistory:
+        history = self.markets.get(market_id)
+        if history is None:
+            history = self.markets[market_id] = MarketHistory(
+                self.capacity, self.halflife, self.threshold
+            )
+        history.record(t, yes, no)
+        return history
+    
+    def get(self, market_id: str) -> Optional[MarketHistory]:
+        return self.markets.get(market_id)
+    
+    def stats(self, market_id: str) -> Optional[HistoryStats]:
+        history = self.markets.get(market_id)
+        return history.stats() if history else None
+    
+    def discard(self, market_id: str):
+        self.markets.pop(market_id, None)
@@ -0,0 +1,219 @@
+"""Opportunity lifecycle: open/update/execute/cool down/close per market"""
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Deque, Dict, List, Optional
+
+from .arbitrage import ArbitrageDetector, ArbitrageOpportunity
+from .fixed_point import from_micros, to_micros
+from ..utils.logger import setup_logger
+from ..utils.metrics import registry
+
+logger = setup_logger(__name__)
+
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+OPPORTUNITY_EVENTS = registry.counter(
+    "opportunity_events_total", "Opportunity lifecycle transitions", ("event",))
+OPPORTUNITY_DURATION = registry.histogram(
+    "opportunity_duration_seconds", "Time from an opportunity opening to closing",
+    buckets=DURATION_BUCKETS)
+OPPORTUNITIES_OPEN = registry.gauge("opportunities_open", "Opportunities currently tracked")
+
+
+class OpportunityState(Enum):
+    OPEN = "open"
+    COOLING = "cooling"
+    CLOSED = "closed"
+
+
+@dataclass
+class TrackedOpportunity:
+    """One opportunity from the tick it opened until it closed"""
+    market_id: str
+    market_name: str
+    state: OpportunityState
+    opened_at: float
+    updated_at: float
+    latest: ArbitrageOpportunity
+    best_profit: int  # micro-dollars
+    executions: int = 0
+    executed_at: Optional[float] = None
+    cooldown_until: float = 0.0
+    closed_at: Optional[float] = None
+    
+    @property
+    def duration(self) -> float:
+        return (self.closed_at or self.updated_at) - self.opened_at
+
+
+@dataclass
+class LifecycleEvent:
+    """
+    A state change worth acting on
+    
+    kind is one of opened, updated, executed, cooling, closed. `actionable`
+    is set when the opportunity may be executed now: on opening, and again
+    once a cooldown has run out with the edge still there.
+    """
+    kind: str
+    opportunity: TrackedOpportunity
+    actionable: bool = False
+
+
+class OpportunityTracker:
+    """
+    Tracks arbitrage opportunities per market across ticks
+    
+    An opportunity opens when the detector reports one and stays open until
+    profit falls `hysteresis` below the detector's minimum, so a price
+    hovering at the threshold does not open and close it on every tick.
+    After an execution the market cools down for `cooldown` seconds; the
+    same edge is not offered for execution again before that, even if it
+    closes and reopens in between. Ticks that
+    change nothing return no event, and profit moves smaller than
+    `min_change` are not reported as updates. Settings are in dollars;
+    comparisons run on the detector's integer micro-dollar amounts.
+    """
+    
+    def __init__(self, detector: ArbitrageDetector, hysteresis: float = 0.005,
+                 cooldown: float = 30.0, min_change: float = 0.001, history: int = 500):
+        self.detector = detector
+        self.configure(hysteresis, cooldown, min_change)
+        self.active: Dict[str, TrackedOpportunity] = {}
+        self.closed: Deque[TrackedOpportunity] = deque(maxlen=history)
+        # market ID -> monotonic cooldown end; outlives the opportunity, so an
+        # edge that closes and reopens is still cooling
+        self._cooldown_until: Dict[str, float] = {}
+        self._events = {kind: OPPORTUNITY_EVENTS.labels(kind)
+                        for kind in ("opened", "updated", "executed", "cooling", "closed")}
+        self._open_gauge = OPPORTUNITIES_OPEN.labels()
+    
+    def configure(self, hysteresis: float, cooldown: float, min_change: float):
+        self.hysteresis = hysteresis
+        self.cooldown = cooldown
+        self.min_change = min_change
+        self._hysteresis_micros = to_micros(hysteresis)
+        self._min_change_micros = to_micros(min_change)
+    
+    def apply_snapshot(self, snapshot):
+        """Pick up lifecycle settings from a ConfigSnapshot"""
+        values = snapshot.values
+        self.configure(
+            values.get('opportunities.hysteresis', self.hysteresis),
+            values.get('opportunities.cooldown', self.cooldown),
+            values.get('opportunities.min_change', self.min_change)
+        )
+    
+    def _event(self, kind: str, tracked: TrackedOpportunity, actionable: bool = False) -> LifecycleEvent:
+        self._events[kind].inc()
+        return LifecycleEvent(kind, tracked, actionable)
+    
+    def observe(self, market_id: str, market_name: str, yes_micros: int, no_micros: int,
+                now: Optional[float] = None) -> Optional[LifecycleEvent]:
+        """
+        Feed one tick (prices in micro-dollars)
+        
+        Returns:
+            LifecycleEvent if the tick changed the market's state, else None
+        """
+        now = time.monotonic() if now is None else now
+        tracked = self.active.get(market_id)
+        detector = self.detector
+        opp = detector.check_micros(market_id, market_name, yes_micros, no_micros)
+        
+        if tracked is None:
+            if opp is None:
+                return None
+            tracked = TrackedOpportunity(
+                market_id=market_id, market_name=market_name, state=OpportunityState.OPEN,
+                opened_at=now, updated_at=now, latest=opp, best_profit=opp.profit_micros
+            )
+            self.active[market_id] = tracked
+            self._open_gauge.set(len(self.active))
+            cooldown_until = self._cooldown_until.pop(market_id, 0.0) if self._cooldown_until else 0.0
+            if now < cooldown_until:
+                # Executed shortly before it closed (or before a restart);
+                # wait out the rest of that cooldown
+                self._cooldown_until[market_id] = cooldown_until
+                tracked.state = OpportunityState.COOLING
+                tracked.cooldown_until = cooldown_until
+                return self._event("opened", tracked)
+            return self._event("opened", tracked, actionable=True)
+        
+        profit = opp.profit_micros if opp else detector.profit_micros(yes_micros, no_micros)
+        if profit <= detector.params.min_profit_micros - self._hysteresis_micros:
+            return self._close(tracked, now)
+        
+        tracked.updated_at = now
+        if opp is None:
+            # Inside the hysteresis band: still open, nothing to act on
+            return None
+        
+        previous = tracked.latest.profit_micros
+        tracked.latest = opp
+        tracked.best_profit = max(tracked.best_profit, opp.profit_micros)
+        
+        if tracked.state is OpportunityState.COOLING and now >= tracked.cooldown_until:
+            tracked.state = OpportunityState.OPEN
+            return self._event("updated", tracked, actionable=True)
+        if abs(opp.profit_micros - previous) >= self._min_change_micros:
+            return self._event("updated", tracked)
+        return None
+    
+    def mark_executed(self, market_id: str, now: Optional[float] = None) -> Optional[LifecycleEvent]:
+        """Record an execution and start the market's cooldown"""
+        tracked = self.active.get(market_id)
+        if tracked is None:
+            return None
+        now = time.monotonic() if now is None else now
+        tracked.executions += 1
+        tracked.executed_at = now
+        tracked.cooldown_until = self._cooldown_until[market_id] = now + self.cooldown
+        tracked.state = OpportunityState.COOLING
+        self._events["cooling"].inc()
+        return self._event("executed", tracked)
+    
+    def _close(self, tracked: TrackedOpportunity, now: float) -> LifecycleEvent:
+        tracked.state = OpportunityState.CLOSED
+        tracked.closed_at = now
+        del self.active[tracked.market_id]
+        if tracked.cooldown_until <= now:
+            self._cooldown_until.pop(tracked.market_id, None)
+        self.closed.append(tracked)
+        self._open_gauge.set(len(self.active))
+        OPPORTUNITY_DURATION.observe(tracked.duration)
+        logger.debug("Opportunity closed on %s after %.2fs (%d executions, best $%.4f)",
+                     tracked.market_id, tracked.duration, tracked.executions,
+                     from_micros(tracked.best_profit))
+        return self._event("closed", tracked)
+    
+    def cooldowns(self) -> Dict[str, float]:
+        """Wall-clock end of every cooldown still running, closed markets included, for checkpoints"""
+        now, wall = time.monotonic(), time.time()
+        # Drop the expired ones while here, so the map stays bounded
+        self._cooldown_until = {market_id: until for market_id, until in self._cooldown_until.items()
+                                if until > now}
+        return {market_id: wall + until - now for market_id, until in self._cooldown_until.items()}
+    
+    def restore_cooldowns(self, cooldowns: Dict[str, float]):
+        """Carry cooldowns (wall-clock ends, from cooldowns()) over a restart"""
+        now, wall = time.monotonic(), time.time()
+        self._cooldown_until = {market_id: now + end - wall
+                                for market_id, end in cooldowns.items() if end > wall}
+    
+    def is_open(self, market_id: str) -> bool:
+        return market_id in self.active
+    
+    def stats(self) -> dict:
+        """Durations of recently closed opportunities, for sizing latency budgets"""
+        durations: List[float] = sorted(t.duration for t in self.closed)
+        count = len(durations)
+        return {
+            'open': len(self.active),
+            'closed': count,
+            'median_duration': durations[count // 2] if count else 0.0,
+            'p10_duration': durations[count // 10] if count else 0.0,
+            'executed_share': (sum(1 for t in self.closed if t.executions) / count) if count else 0.0
+        }
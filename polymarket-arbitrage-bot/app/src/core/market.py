@@ -1,12 +1,34 @@
 """Market data fetching and real-time price monitoring"""
 import asyncio
+import json
+import logging
+import random
+import time
 import aiohttp
-from typing import List, Dict, Optional, Callable
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, List, Dict, Optional, Callable, Tuple
 from dataclasses import dataclass
-from ..utils.logger import setup_logger
+from urllib.parse import urlparse
+from ..utils.logger import setup_logger, log_event, EventSampler
+from ..utils.metrics import HTTP_REQUESTS, HTTP_LATENCY, HTTP_RETRIES
+from . import decoding
+from .batcher import MicroBatcher
+from .fixed_point import Quote, from_micros
+from .orderbook import OrderBook
+from .rate_limiter import RateLimiter
 
 logger = setup_logger(__name__)
 
+GAMMA_API = "https://gamma-api.polymarket.com"
+CLOB_API = "https://clob.polymarket.com"
+
+# Statuses worth retrying with backoff (rate limited or server-side failure)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Per-token request errors can fire on every tick; only log a sample of them
+_price_error_sampler = EventSampler(every=50)
+
 
 @dataclass
 class Market:
@@ -16,21 +38,223 @@ class Market:
     condition_id: str
     yes_token_id: str = ""
     no_token_id: str = ""
-    yes_price: float = 0.0
-    no_price: float = 0.0
+    yes_micros: int = 0
+    no_micros: int = 0
     active: bool = True
+    quoted_at: float = 0.0  # wall-clock time of the last quote (0 = never)
+    stale: bool = False     # prices restored from a checkpoint, not yet refreshed
+    # Catalog figures used for watchlist tiers (None when gamma did not send them)
+    liquidity: Optional[float] = None
+    volume: Optional[float] = None
+    spread: Optional[float] = None
+    end_date: Optional[float] = None  # epoch seconds
+    tier: str = "warm"                # see tiers.Watchlist
+    
+    @property
+    def yes_price(self) -> float:
+        return from_micros(self.yes_micros)
+    
+    @property
+    def no_price(self) -> float:
+        return from_micros(self.no_micros)
     
     def __str__(self):
         return f"{self.question} (YES: ${self.yes_price:.4f}, NO: ${self.no_price:.4f})"
 
 
+def _number(value: Any) -> Optional[float]:
+    """Gamma figure (number or numeric string) as a float; None if missing or invalid"""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _end_date(value: Optional[str]) -> Optional[float]:
+    """Gamma ISO-8601 endDate as epoch seconds"""
+    if not value:
+        return None
+    try:
+        end = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    return end.timestamp()
+
+
+def parse_markets(data: List[Dict], limit: Optional[int] = None) -> List[Market]:
+    """Build Market objects from a decoded gamma /markets payload"""
+    markets = []
+    
+    for item in data[:limit]:
+        try:
+            # Extract market data
+            market_id = item.get('id', '')
+            condition_id = item.get('condition_id', item.get('conditionId', ''))
+            question = item.get('question', 'Unknown Market')
+            
+            # Get token IDs from outcomes (gamma sends them as a JSON string)
+            tokens = item.get('tokens', [])
+            if tokens:
+                yes_token = tokens[0].get('token_id', '')
+                no_token = tokens[1].get('token_id', '') if len(tokens) > 1 else ''
+            else:
+                clob_ids = json.loads(item.get('clobTokenIds') or '[]')
+                yes_token = clob_ids[0] if len(clob_ids) > 0 else ''
+                no_token = clob_ids[1] if len(clob_ids) > 1 else ''
+            
+            market = Market(
+                id=market_id,
+                question=question,
+                condition_id=condition_id,
+                yes_token_id=yes_token,
+                no_token_id=no_token,
+                active=item.get('active', True),
+                liquidity=_number(item.get('liquidityNum', item.get('liquidity'))),
+                volume=_number(item.get('volumeNum', item.get('volume'))),
+                spread=_number(item.get('spread')),
+                end_date=_end_date(item.get('endDate'))
+            )
+            markets.append(market)
+        except Exception as e:
+            logger.warning("Error parsing market: %s", e)
+            continue
+    
+    return markets
+
+
+def decode_markets(body: bytes, limit: Optional[int] = None) -> List[Market]:
+    """Build Market objects straight from a raw gamma /markets body"""
+    items = decoding.gamma_markets(body)
+    if items is None:
+        return parse_markets(decoding.loads(body), limit)
+    
+    markets = []
+    token_pair = decoding.token_pair
+    for item in items[:limit]:
+        try:
+            yes_token, no_token = token_pair(item)
+            markets.append(Market(
+                id=str(item.id),
+                question=item.question,
+                condition_id=item.condition_id or item.conditionId,
+                yes_token_id=yes_token,
+                no_token_id=no_token,
+                active=item.active is not False,
+                liquidity=_number(item.liquidityNum if item.liquidityNum is not None else item.liquidity),
+                volume=_number(item.volumeNum if item.volumeNum is not None else item.volume),
+                spread=item.spread,
+                end_date=_end_date(item.endDate)
+            ))
+        except Exception as e:
+            logger.warning("Error parsing market: %s", e)
+    return markets
+
+
 class PolymarketAPI:
     """Real-time Polymarket API integration"""
     
-    def __init__(self):
-        self.gamma_api = "https://gamma-api.polymarket.com"
-        self.clob_api = "https://clob.polymarket.com"
+    def __init__(self, gamma_api: str = GAMMA_API, clob_api: str = CLOB_API):
         self.session: Optional[aiohttp.ClientSession] = None
+        self.limiter = RateLimiter()
+        self.max_retries = 3
+        self.retry_backoff = 0.5
+        # Per-token lookups are coalesced into bulk calls (max_batch <= 1 disables)
+        self.max_batch = 100
+        self.batch_window = 0.005
+        self._price_batcher = MicroBatcher(self._fetch_prices_bulk, name="prices")
+        self._book_batcher = MicroBatcher(self._fetch_books_bulk, name="books")
+        self.set_endpoints(gamma_api, clob_api)
+    
+    def set_endpoints(self, gamma_api: str, clob_api: str):
+        """Point the client at a gamma and a CLOB base URL (e.g. the local simulator)"""
+        self.gamma_api = gamma_api.rstrip('/')
+        self.clob_api = clob_api.rstrip('/')
+        
+        # Host labels for metrics, resolved once instead of per request
+        self._gamma_host = urlparse(self.gamma_api).netloc
+        self._clob_host = urlparse(self.clob_api).netloc
+    
+    async def _get(self, host: str, url: str, params: Dict,
+                   decode: Callable[[bytes], Any] = decoding.loads) -> Tuple[Any, Any]:
+        """GET a JSON endpoint; see _request"""
+        return await self._request('GET', host, url, params=params, decode=decode)
+    
+    async def _post(self, host: str, url: str, body: Any,
+                    decode: Callable[[bytes], Any] = decoding.loads) -> Tuple[Any, Any]:
+        """POST a JSON body; see _request"""
+        return await self._request('POST', host, url, body=body, decode=decode)
+    
+    async def _request(self, method: str, host: str, url: str,
+                       params: Optional[Dict] = None, body: Any = None,
+                       decode: Callable[[bytes], Any] = decoding.loads) -> Tuple[Any, Any]:
+        """Call a JSON endpoint, recording request count and latency per host
+        
+        Rate-limited (429) and 5xx responses are retried with exponential
+        backoff and jitter, never sooner than a Retry-After the server sends.
+        The raw body goes to `decode`, off the event loop when it is large.
+        
+        Returns (status, data); data is None unless the status is 200.
+        """
+        attempt = 0
+        while True:
+            await self.limiter.acquire()
+            status: Any = "error"
+            retry_after = None
+            start = time.perf_counter()
+            try:
+                async with self.session.request(method, url, params=params, json=body) as response:
+                    status = response.status
+                    if status == 200:
+                        raw = await response.read()
+                    retry_after = response.headers.get('Retry-After')
+            finally:
+                HTTP_LATENCY.labels(host).observe(time.perf_counter() - start)
+                HTTP_REQUESTS.labels(host, status).inc()
+            
+            if status == 200:
+                return status, await decoding.decode(decode, raw)
+            if status not in RETRY_STATUSES or attempt >= self.max_retries:
+                return status, None
+            
+            # Never retry sooner than the server asks, but keep backing off
+            # exponentially so concurrent callers spread out
+            delay = self.retry_backoff * (2 ** attempt)
+            try:
+                delay = max(delay, float(retry_after))
+            except (TypeError, ValueError):
+                pass
+            delay *= random.uniform(1.0, 1.5)
+            attempt += 1
+            HTTP_RETRIES.labels(host).inc()
+            await asyncio.sleep(delay)
+    
+    def apply_snapshot(self, snapshot):
+        """Pick up endpoints, request limits and retry policy from a ConfigSnapshot"""
+        if (snapshot.gamma_api, snapshot.clob_api) != (self.gamma_api, self.clob_api):
+            self.set_endpoints(snapshot.gamma_api, snapshot.clob_api)
+        self.limiter.configure(snapshot.requests_per_second, snapshot.request_burst)
+        self.max_retries = snapshot.max_retries
+        self.retry_backoff = snapshot.retry_backoff
+        self.configure_batching(snapshot.max_batch, snapshot.batch_window)
+    
+    @property
+    def requests_per_quote(self) -> float:
+        """HTTP requests one get_live_prices() costs on average"""
+        if self.max_batch > 1:
+            return 1.0 / max(1.0, self._price_batcher.mean_size)
+        return 1.0
+    
+    def configure_batching(self, max_batch: int, window: float):
+        """Bulk-call size and collection window for per-token lookups"""
+        self.max_batch = max_batch
+        self.batch_window = window
+        for batcher in (self._price_batcher, self._book_batcher):
+            batcher.max_batch = max(1, max_batch)
+            batcher.window = window
     
     async def _ensure_session(self):
         """Ensure aiohttp session exists"""
@@ -56,110 +280,101 @@ class PolymarketAPI:
                 "archived": "false"
             }
             
-            logger.info(f"Fetching {limit} markets from Polymarket...")
+            logger.info("Fetching %d markets from Polymarket...", limit)
+            
+            status, markets = await self._get(
+                self._gamma_host, url, params, partial(decode_markets, limit=limit)
+            )
+            if status != 200:
+                logger.error("Failed to fetch markets: HTTP %s", status)
+                return []
             
-            async with self.session.get(url, params=params) as response:
-                if response.status != 200:
-                    logger.error(f"Failed to fetch markets: HTTP {response.status}")
-                    return []
-                
-                data = await response.json()
-                markets = []
-                
-                for item in data[:limit]:
-                    try:
-                        # Extract market data
-                        market_id = item.get('id', '')
-                        condition_id = item.get('condition_id', item.get('conditionId', ''))
-                        question = item.get('question', 'Unknown Market')
-                        
-                        # Get token IDs from outcomes
-                        tokens = item.get('tokens', [])
-                        yes_token = tokens[0].get('token_id', '') if len(tokens) > 0 else ''
-                        no_token = tokens[1].get('token_id', '') if len(tokens) > 1 else ''
-                        
-                        market = Market(
-                            id=market_id,
-                            question=question,
-                            condition_id=condition_id,
-                            yes_token_id=yes_token,
-                            no_token_id=no_token,
-                            active=item.get('active', True)
-                        )
-                        markets.append(market)
-                    except Exception as e:
-                        logger.warning(f"Error parsing market: {e}")
-                        continue
-                
-                logger.info(f"✓ Fetched {len(markets)} markets")
-                return markets
-                
+            logger.info("✓ Fetched %d markets", len(markets))
+            return markets
+        
         except Exception as e:
-            logger.error(f"Error fetching markets: {e}")
+            logger.error("Error fetching markets: %s", e)
             return []
     
-    async def get_live_prices(self, token_id: str) -> Optional[Dict[str, float]]:
-        """Get real-time price for a specific token"""
+    async def get_live_prices(self, token_id: str) -> Optional[Quote]:
+        """Get real-time price for a specific token, in micro-dollars"""
         await self._ensure_session()
         
         try:
+            if self.max_batch > 1:
+                return await self._price_batcher.get(token_id)
+            
             url = f"{self.clob_api}/price"
             params = {"token_id": token_id}
             
-            async with self.session.get(url, params=params) as response:
-                if response.status != 200:
-                    return None
-                
-                data = await response.json()
-                
-                # Extract mid price (average of bid/ask)
-                mid_price = float(data.get('mid', data.get('price', 0)))
-                
-                return {
-                    'price': mid_price,
-                    'bid': float(data.get('bid', mid_price)),
-                    'ask': float(data.get('ask', mid_price))
-                }
-                
+            status, quote = await self._get(self._clob_host, url, params, decoding.decode_quote)
+            return quote if status == 200 else None
+        
         except Exception as e:
-            logger.debug(f"Error fetching price for {token_id}: {e}")
+            if logger.isEnabledFor(logging.DEBUG) and _price_error_sampler():
+                logger.debug("Error fetching price for %s: %s", token_id, e)
             return None
     
+    async def _fetch_prices_bulk(self, token_ids: List[str]) -> Dict[str, Quote]:
+        """One POST /prices for many tokens, both sides of each"""
+        url = f"{self.clob_api}/prices"
+        body = [{"token_id": t, "side": side} for t in token_ids for side in ("BUY", "SELL")]
+        status, quotes = await self._post(self._clob_host, url, body, decoding.decode_prices)
+        if status != 200:
+            raise RuntimeError(f"bulk prices failed: HTTP {status}")
+        return quotes
+    
+    async def get_market_quotes(
+        self, market: Market
+    ) -> Tuple[Optional[Quote], Optional[Quote]]:
+        """Get YES and NO quotes (micro-dollars) for a market; None for a side that failed"""
+        yes_data, no_data = await asyncio.gather(
+            self.get_live_prices(market.yes_token_id),
+            self.get_live_prices(market.no_token_id)
+        )
+        return yes_data, no_data
+    
     async def get_market_prices(self, market: Market) -> tuple[float, float]:
         """Get current YES and NO prices for a market"""
+        yes_data, no_data = await self.get_market_quotes(market)
         
-        # Fetch YES price
-        yes_data = await self.get_live_prices(market.yes_token_id)
-        yes_price = yes_data['price'] if yes_data else 0.50
-        
-        # Fetch NO price
-        no_data = await self.get_live_prices(market.no_token_id)
-        no_price = no_data['price'] if no_data else 0.50
+        # Fall back to an even market when a side is unavailable
+        yes_price = yes_data.price if yes_data else 0.50
+        no_price = no_data.price if no_data else 0.50
         
         return yes_price, no_price
     
-    async def get_orderbook(self, token_id: str) -> Optional[Dict]:
-        """Get full orderbook for a token"""
+    async def get_orderbook(self, token_id: str) -> Optional[OrderBook]:
+        """Get the full orderbook for a token, decoded straight into an OrderBook"""
         await self._ensure_session()
         
         try:
+            if self.max_batch > 1:
+                return await self._book_batcher.get(token_id)
+            
             url = f"{self.clob_api}/book"
             params = {"token_id": token_id}
             
-            async with self.session.get(url, params=params) as response:
-                if response.status != 200:
-                    return None
-                
-                data = await response.json()
-                return {
-                    'bids': data.get('bids', []),
-                    'asks': data.get('asks', [])
-                }
-                
+            status, book = await self._get(
+                self._clob_host, url, params, partial(decoding.decode_book, token_id=token_id)
+            )
+            return book if status == 200 else None
+        
         except Exception as e:
-            logger.debug(f"Error fetching orderbook: {e}")
+            if logger.isEnabledFor(logging.DEBUG) and _price_error_sampler():
+                logger.debug("Error fetching orderbook for %s: %s", token_id, e)
             return None
     
+    async def _fetch_books_bulk(self, token_ids: List[str]) -> Dict[str, OrderBook]:
+        """One POST /books for many tokens"""
+        url = f"{self.clob_api}/books"
+        status, books = await self._post(
+            self._clob_host, url, [{"token_id": t} for t in token_ids], decoding.decode_books
+        )
+        if status != 200:
+            raise RuntimeError(f"bulk books failed: HTTP {status}")
+        return books
+    
     async def place_order(
         self, 
         token_id: str, 
@@ -171,10 +386,12 @@ class PolymarketAPI:
         Simulate order placement (DEMO MODE)
         In production, this would use py-clob-client to place real orders
         """
-        logger.info(f"[DEMO] Placing {side.upper()} order:")
-        logger.info(f"[DEMO]   Token: {token_id}")
-        logger.info(f"[DEMO]   Amount: ${amount:.4f}")
-        logger.info(f"[DEMO]   Price: ${price:.4f}")
+        log_event(
+            logger, "demo_order",
+            "[DEMO] Placing %(side)s order: token %(token_id)s, "
+            "amount $%(amount).4f @ $%(price).4f",
+            token_id=token_id, side=side, amount=amount, price=price
+        )
         
         # Simulate order success
         return {
@@ -197,7 +414,8 @@ class PolymarketAPI:
         Execute arbitrage trade (DEMO MODE)
         Buys YES and NO shares, simulates merge
         """
-        logger.info(f"[DEMO] Executing arbitrage on: {market.question}")
+        log_event(logger, "demo_arbitrage", "[DEMO] Executing arbitrage on: %(market)s",
+                  market=market.question, yes_price=yes_price, no_price=no_price)
         
         # Buy YES share
         yes_order = await self.place_order(
@@ -216,8 +434,8 @@ class PolymarketAPI:
         )
         
         # Simulate merge (in real mode, this would be a blockchain transaction)
-        logger.info(f"[DEMO] Merging YES + NO positions...")
-        logger.info(f"[DEMO] Received: ${amount:.4f}")
+        log_event(logger, "demo_merge", "[DEMO] Merged YES + NO positions, received $%(amount).4f",
+                  market=market.question, amount=amount)
         
         return {
             'yes_order': yes_order,
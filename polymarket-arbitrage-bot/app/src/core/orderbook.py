@@ -0,0 +1,128 @@
+"""Local order book for a single outcome token"""
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .fixed_point import from_micros, to_micros
+
+_PRICE_CACHE_SIZE = 4096
+_price_cache: Dict[object, int] = {}
+
+
+class OrderBook:
+    """Price levels for one token, kept sorted for O(1) top-of-book
+    
+    Levels are stored as price -> size plus a sorted price list per side, so
+    a delta only touches the level it changes. Prices are integer
+    micro-dollars and sizes integer micro-shares, parsed straight from the
+    API's decimal strings, so level lookups never depend on float rounding.
+    """
+    
+    def __init__(self, token_id: str = ""):
+        self.token_id = token_id
+        self.bids: Dict[int, int] = {}
+        self.asks: Dict[int, int] = {}
+        self._bid_prices: List[int] = []
+        self._ask_prices: List[int] = []
+        self.timestamp: float = 0.0
+    
+    @classmethod
+    def from_snapshot(cls, token_id: str, data: Dict, timestamp: float = 0.0) -> "OrderBook":
+        """Build a book from a CLOB /book payload ({'bids': [...], 'asks': [...]})"""
+        book = cls(token_id)
+        book.apply_snapshot(data.get('bids', []), data.get('asks', []), timestamp)
+        return book
+    
+    @classmethod
+    def from_micros(cls, token_id: str, bids: Dict[int, int], asks: Dict[int, int],
+                    timestamp: float = 0.0) -> "OrderBook":
+        """Build a book from already parsed price -> size maps (micro-units, sizes > 0)"""
+        book = cls(token_id)
+        book.bids, book.asks = bids, asks
+        book._bid_prices = sorted(bids)
+        book._ask_prices = sorted(asks)
+        book.timestamp = timestamp
+        return book
+    
+    @staticmethod
+    def _levels(levels: Iterable) -> Dict[int, int]:
+        parsed = {}
+        prices = _price_cache
+        for level in levels:
+            if isinstance(level, dict):
+                price, size = level['price'], to_micros(level['size'])
+            else:
+                price, size = level[0], to_micros(level[1])
+            # Books quote on a fixed tick grid, so the same few price
+            # strings repeat across every snapshot
+            micros = prices.get(price)
+            if micros is None:
+                if len(prices) >= _PRICE_CACHE_SIZE:
+                    prices.clear()
+                micros = prices[price] = to_micros(price)
+            price = micros
+            if size > 0:
+                parsed[price] = size
+        return parsed
+    
+    def apply_snapshot(self, bids: Iterable, asks: Iterable, timestamp: float = 0.0):
+        """Replace both sides with a full snapshot"""
+        self.bids = self._levels(bids)
+        self.asks = self._levels(asks)
+        self._bid_prices = sorted(self.bids)
+        self._ask_prices = sorted(self.asks)
+        self.timestamp = timestamp
+    
+    def apply_delta(self, side: str, price: int, size: int, timestamp: float = 0.0):
+        """
+        Set the size at one price level
+        
+        Args:
+            side: 'BUY'/'bid' for the bid side, 'SELL'/'ask' for the ask side
+            price: Level price in micro-dollars
+            size: New total size at that price in micro-shares (0 removes the level)
+            timestamp: Time of the change
+        """
+        if side in ('BUY', 'buy', 'bid', 'bids'):
+            levels, prices = self.bids, self._bid_prices
+        else:
+            levels, prices = self.asks, self._ask_prices
+        
+        if size > 0:
+            if price not in levels:
+                insort(prices, price)
+            levels[price] = size
+        elif price in levels:
+            del levels[price]
+            del prices[bisect_left(prices, price)]
+        
+        self.timestamp = timestamp
+    
+    def best_bid(self) -> Optional[Tuple[int, int]]:
+        """Highest bid as (price, size)"""
+        if not self._bid_prices:
+            return None
+        price = self._bid_prices[-1]
+        return price, self.bids[price]
+    
+    def best_ask(self) -> Optional[Tuple[int, int]]:
+        """Lowest ask as (price, size)"""
+        if not self._ask_prices:
+            return None
+        price = self._ask_prices[0]
+        return price, self.asks[price]
+    
+    def mid(self) -> Optional[int]:
+        """Midpoint of the best bid and ask (rounded down to a micro-dollar)"""
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) // 2
+    
+    def to_dict(self) -> Dict:
+        """Bids (best first) and asks as {price, size} dicts with float values, for display"""
+        return {
+            'bids': [{'price': from_micros(p), 'size': from_micros(self.bids[p])}
+                     for p in reversed(self._bid_prices)],
+            'asks': [{'price': from_micros(p), 'size': from_micros(self.asks[p])}
+                     for p in self._ask_prices]
+        }
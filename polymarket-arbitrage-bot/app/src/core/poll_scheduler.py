@@ -0,0 +1,258 @@
+"""Adaptive polling: markets near an edge are polled more often than quiet ones"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .arbitrage import ArbitrageDetector, ArbitrageOpportunity
+from .bus import MarketDataBus
+from .history import HistoryStats, PriceHistory
+from .lifecycle import OpportunityTracker
+from .market import Market, PolymarketAPI
+from .price_board import PriceBoard
+from .scanner import Scanner, ScanStats
+from .tiers import HOT, WARM, WATCHLIST_REQUESTS, split_budget
+from ..utils.config import config
+from ..utils.logger import setup_logger
+from ..utils.metrics import TICKS, registry
+
+logger = setup_logger(__name__)
+
+# get_market_quotes looks up one price per outcome
+QUOTES_PER_POLL = 2
+
+POLL_STRETCH = registry.gauge(
+    "poll_budget_stretch", "Factor by which poll intervals are stretched to fit the request budget")
+POLL_LAG = registry.gauge("poll_schedule_lag_seconds", "Mean delay between a market falling due and its poll")
+
+
+def adaptive_interval(
+    stats: Optional[HistoryStats],
+    cutoff: float,
+    min_interval: float,
+    max_interval: float,
+    noise_floor: float = 0.002,
+    z_scale: float = 3.0
+) -> float:
+    """
+    Seconds until a market should be polled again
+    
+    The distance of YES + NO above the profitable cutoff is measured in
+    units of the market's own volatility: a market one typical move away
+    from an edge is polled at `min_interval`, one many moves away drifts
+    towards `max_interval`. Markets without history are polled soon.
+    
+    Args:
+        stats: Rolling stats of the market (None if never polled)
+        cutoff: YES + NO below which the detector can find profit
+        min_interval: Fastest allowed polling
+        max_interval: Slowest allowed polling
+        noise_floor: Smallest volatility assumed, so flat markets are not ignored forever
+        z_scale: Distance (in volatilities) at which the interval is ~63% of the way to max
+    """
+    if stats is None or stats.count < 2:
+        return min_interval
+    gap = max(0.0, stats.yes_price + stats.no_price - cutoff)
+    noise = max(stats.sum_volatility, stats.yes_volatility, noise_floor)
+    reach = 1.0 - math.exp(-(gap / noise) / z_scale)
+    return min_interval + (max_interval - min_interval) * reach
+
+
+class AdaptiveScanner(Scanner):
+    """
+    Polls each market when it falls due instead of in fixed passes
+    
+    Next-due times live in a heap. After every poll the market's interval
+    is recomputed from its rolling history (see adaptive_interval). The sum
+    of all wanted poll rates is kept up to date incrementally; when it would
+    exceed `budget` of the rate limiter's request rate, every interval is
+    stretched by the same factor, so the budget goes to the markets that
+    are closest to an opportunity.
+    
+    Markets in the hot watchlist tier (see tiers.Watchlist) are always
+    polled at `min_interval` and have `hot_share` of the budget to
+    themselves; warm markets share the rest as above.
+    """
+    
+    def __init__(
+        self,
+        api: PolymarketAPI,
+        detector: ArbitrageDetector,
+        markets: Optional[List[Market]] = None,
+        concurrency: int = 50,
+        on_opportunity: Optional[Callable[[ArbitrageOpportunity], None]] = None,
+        board: Optional[PriceBoard] = None,
+        tracker: Optional[OpportunityTracker] = None,
+        history: Optional[PriceHistory] = None,
+        min_interval: float = 0.5,
+        max_interval: float = 30.0,
+        budget: float = 0.8,
+        bus: Optional[MarketDataBus] = None,
+        hot_share: float = 0.5
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.budget = budget
+        self.hot_share = hot_share
+        self._hot: Set[str] = set()
+        self._hot_demand = 0.0
+        self._heap: List[Tuple[float, int, Market]] = []
+        self._order = itertools.count()
+        self._due: Dict[str, float] = {}
+        self._intervals: Dict[str, float] = {}
+        self._demand = 0.0  # polls per second wanted, before stretching
+        self._polls = self._found = 0
+        super().__init__(
+            api, detector, markets, concurrency, on_opportunity, board, tracker,
+            history or PriceHistory(capacity=64), bus
+        )
+    
+    def configure(self, min_interval: float, max_interval: float, budget: float,
+                  hot_share: Optional[float] = None):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.budget = budget
+        if hot_share is not None:
+            # Strictly between 0 and 1, so neither tier can be starved
+            self.hot_share = min(0.95, max(0.05, hot_share))
+    
+    def apply_snapshot(self, snapshot):
+        """Pick up interval bounds and budget share from a ConfigSnapshot"""
+        values = snapshot.values
+        self.configure(
+            values.get('scanner.min_interval', self.min_interval),
+            values.get('scanner.max_interval', self.max_interval),
+            values.get('scanner.budget', self.budget),
+            values.get('tiers.hot_budget', self.hot_share)
+        )
+    
+    def set_markets(self, markets: List[Market]):
+        """Replace the watched markets; kept markets keep their due times"""
+        super().set_markets(markets)
+        now = time.monotonic()
+        self._hot = {m.id for m in self.markets if m.tier == HOT}
+        intervals = {m.id: self.min_interval if m.id in self._hot
+                     else self._intervals.get(m.id, self.min_interval)
+                     for m in self.markets}
+        self._intervals = intervals
+        self._hot_demand = len(self._hot) / self.min_interval
+        self._demand = sum(1.0 / interval for market_id, interval in intervals.items()
+                           if market_id not in self._hot)
+        self._due = {m.id: self._due.get(m.id, now) for m in self.markets}
+        # New markets are all due now; ones restored from a checkpoint go
+        # in order of their last known distance from an edge
+        markets = sorted(self.markets, key=lambda m: (self._due[m.id], self._restored_gap(m)))
+        self._heap = [(self._due[m.id], next(self._order), m) for m in markets]
+    
+    def _restored_gap(self, market: Market) -> float:
+        if not market.stale:
+            return 0.0
+        return market.yes_price + market.no_price - self.detector.sum_cutoff
+    
+    def requests(self) -> Tuple[float, float]:
+        """Requests per second wanted and allowed for (hot, warm) markets"""
+        requests = QUOTES_PER_POLL * self.api.requests_per_quote
+        hot_wanted, warm_wanted = self._hot_demand * requests, self._demand * requests
+        return split_budget(self.api.limiter.rate * self.budget, self.hot_share, hot_wanted, warm_wanted)
+    
+    def _stretch(self, hot: bool) -> float:
+        if self.api.limiter.rate * self.budget <= 0:
+            return 1.0
+        wanted = QUOTES_PER_POLL * self.api.requests_per_quote * (self._hot_demand if hot else self._demand)
+        allowed = self.requests()[0 if hot else 1]
+        return wanted / allowed if wanted > allowed else 1.0
+    
+    @property
+    def stretch(self) -> float:
+        """Factor applied to every warm interval to stay within the request budget"""
+        return self._stretch(False)
+    
+    def _reschedule(self, market: Market, now: float) -> float:
+        previous = self._intervals.get(market.id)
+        if previous is None:
+            # Dropped by set_markets while the poll was in flight
+            return 0.0
+        hot = market.id in self._hot
+        if hot:
+            interval = self.min_interval
+            self._hot_demand += 1.0 / interval - 1.0 / previous
+        else:
+            interval = adaptive_interval(
+                self.history.stats(market.id), self.detector.sum_cutoff,
+                self.min_interval, self.max_interval
+            )
+            self._demand += 1.0 / interval - 1.0 / previous
+        self._intervals[market.id] = interval
+        due = now + interval * self._stretch(hot)
+        self._due[market.id] = due
+        heapq.heappush(self._heap, (due, next(self._order), market))
+        return interval
+    
+    async def _poll(self, market: Market, semaphore: asyncio.Semaphore, ticks):
+        try:
+            yes_data, no_data = await self.api.get_market_quotes(market)
+            self._found += self._process(market, yes_data, no_data, ticks)
+            self._polls += 1
+        except Exception as e:
+            logger.debug("Poll failed for %s: %s", market.id, e)
+        finally:
+            semaphore.release()
+            self._reschedule(market, time.monotonic())
+    
+    async def run(self, on_pass: Optional[Callable[[ScanStats], None]] = None):
+        """
+        Poll markets as they fall due until stopped
+        
+        on_pass gets a ScanStats for every poll-interval window: polls done,
+        opportunities acted on, and the mean lateness of the polls as `lag`.
+        """
+        self.running = True
+        semaphore = asyncio.Semaphore(self.concurrency)
+        ticks = TICKS.labels()
+        stretch_gauge, lag_gauge = POLL_STRETCH.labels(), POLL_LAG.labels()
+        hot_gauge, warm_gauge = WATCHLIST_REQUESTS.labels(HOT), WATCHLIST_REQUESTS.labels(WARM)
+        tasks = set()
+        self._polls = self._found = 0
+        late_total, late_count = 0.0, 0
+        window_start = time.monotonic()
+        
+        while self.running:
+            now = time.monotonic()
+            if now - window_start >= config.snapshot.poll_interval:
+                lag = late_total / late_count if late_count else 0.0
+                hot_rate, warm_rate = self.requests()
+                stretch_gauge.set(self.stretch)
+                lag_gauge.set(lag)
+                hot_gauge.set(hot_rate)
+                warm_gauge.set(warm_rate)
+                if on_pass:
+                    on_pass(ScanStats(len(self.markets), self._polls, self._found,
+                                      now - window_start, lag, {HOT: hot_rate, WARM: warm_rate}))
+                self._polls = self._found = 0
+                late_total, late_count = 0.0, 0
+                window_start = now
+            
+            if not self._heap:
+                await asyncio.sleep(self.min_interval)
+                continue
+            due, _, market = self._heap[0]
+            if due > now:
+                # Short naps so market changes and stop() are noticed
+                await asyncio.sleep(min(due - now, self.min_interval))
+                continue
+            
+            heapq.heappop(self._heap)
+            if self._due.get(market.id) != due:
+                continue  # superseded or no longer watched
+            late_total += now - due
+            late_count += 1
+            
+            await semaphore.acquire()
+            task = asyncio.create_task(self._poll(market, semaphore, ticks))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        
+        for task in tasks:
+            task.cancel()
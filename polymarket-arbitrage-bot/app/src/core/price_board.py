@@ -0,0 +1,269 @@
+"""Shared-memory board of latest prices, one row per market"""
+import platform
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .fixed_point import Quote
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+FIELDS = (
+    'yes_bid', 'yes_ask', 'yes_mid',
+    'no_bid', 'no_ask', 'no_mid',
+    'timestamp'
+)
+FIELD_INDEX = {name: i for i, name in enumerate(FIELDS)}
+
+_MAGIC = 0x50424F41524433  # "PBOARD3"
+_HEADER = 4                # int64: magic, capacity, rows used, reserved
+_KEY_BYTES = 80
+
+_EMPTY = Quote(0, 0, 0)
+
+# The seqlock needs the writer's stores to become visible in program order.
+# x86 guarantees that; ARM (Apple Silicon, Graviton) does not, and NumPy
+# offers no memory barriers, so the board is only available on x86.
+BOARD_SUPPORTED = platform.machine().lower() in ('x86_64', 'amd64', 'i386', 'i686', 'x86')
+
+
+class PriceRow(NamedTuple):
+    """Consistent copy of one board row (micro-dollars, timestamp in microseconds)"""
+    yes_bid: int
+    yes_ask: int
+    yes_mid: int
+    no_bid: int
+    no_ask: int
+    no_mid: int
+    timestamp: int
+
+
+class PriceBoard:
+    """
+    Latest prices for many markets in one shared-memory block
+    
+    Layout (fixed, so any process can map it by name):
+        header  int64[4]                magic, capacity, rows used
+        seq     uint64[capacity]        per-row sequence counter
+        data    int64[fields, capacity] one contiguous column per field
+        keys    S80[capacity]           market ID of each row
+    
+    One process writes; any number read. Each row is guarded by a seqlock:
+    the writer makes the counter odd, stores the fields, then makes it even
+    again. A reader copies the row between two reads of the counter and
+    retries if it was odd or changed. Readers never take a lock and never
+    block the writer. Columns are exposed as NumPy views of the shared
+    block, so a vectorized scan over every market copies nothing. Prices
+    are integer micro-dollars and the timestamp is integer microseconds
+    since the epoch, the same units the detector works in. There are no
+    size columns: the quotes the pollers fetch carry no sizes.
+    
+    Stores through NumPy are plain machine stores, which x86 keeps in
+    program order; that ordering is what the seqlock relies on. Elsewhere
+    create() and attach() raise RuntimeError (see BOARD_SUPPORTED), and
+    callers run without a board.
+    """
+    
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self.owner = owner
+        
+        header = np.ndarray((_HEADER,), dtype=np.int64, buffer=shm.buf)
+        if header[0] != _MAGIC:
+            raise ValueError(f"Shared memory block {shm.name} is not a price board")
+        self.capacity = int(header[1])
+        self._header = header
+        
+        offset = _HEADER * 8
+        self._seq = np.ndarray((self.capacity,), dtype=np.uint64, buffer=shm.buf, offset=offset)
+        offset += self.capacity * 8
+        self._data = np.ndarray((len(FIELDS), self.capacity), dtype=np.int64,
+                                buffer=shm.buf, offset=offset)
+        offset += len(FIELDS) * self.capacity * 8
+        self._keys = np.ndarray((self.capacity,), dtype=f"S{_KEY_BYTES}",
+                                buffer=shm.buf, offset=offset)
+        
+        self._rows: Dict[str, int] = {}
+        self._rows_seen = 0
+    
+    @staticmethod
+    def _size(capacity: int) -> int:
+        return _HEADER * 8 + capacity * (8 + len(FIELDS) * 8 + _KEY_BYTES)
+    
+    @staticmethod
+    def _check_platform():
+        if not BOARD_SUPPORTED:
+            raise RuntimeError(f"Price board needs an x86 CPU, not {platform.machine()}")
+    
+    @classmethod
+    def create(cls, capacity: int = 4096, name: Optional[str] = None) -> "PriceBoard":
+        """
+        Allocate a new board; the caller is its only writer
+        
+        A block already under `name` is taken to be left over from a writer
+        that did not shut down cleanly, and is replaced. Processes still
+        attached to it keep the old block.
+        """
+        cls._check_platform()
+        size = cls._size(capacity)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            logger.warning("Price board %s already exists; replacing the stale block", name)
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((_HEADER,), dtype=np.int64, buffer=shm.buf)
+        header[:] = (_MAGIC, capacity, 0, 0)
+        board = cls(shm, owner=True)
+        board._seq[:] = 0
+        board._data[:] = 0
+        logger.info("Price board %s created (%d rows, %d KB)",
+                    shm.name, capacity, shm.size // 1024)
+        return board
+    
+    @classmethod
+    def attach(cls, name: str) -> "PriceBoard":
+        """Map an existing board read-only by convention"""
+        cls._check_platform()
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            # Before 3.13 every process that maps a block registers it with
+            # the resource tracker, which then frees it when that process
+            # exits; only the creator should own it
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+        return cls(shm, owner=False)
+    
+    @property
+    def name(self) -> str:
+        return self._shm.name
+    
+    @property
+    def rows_used(self) -> int:
+        return int(self._header[2])
+    
+    # Writer side
+    
+    def register(self, market_id: str) -> int:
+        """Row for a market, assigning the next free one on first use"""
+        row = self._rows.get(market_id)
+        if row is not None:
+            return row
+        row = self.rows_used
+        if row >= self.capacity:
+            raise IndexError(f"Price board is full ({self.capacity} rows)")
+        self._keys[row] = market_id.encode()[:_KEY_BYTES]
+        # Publish the row only after its key is in place
+        self._header[2] = row + 1
+        self._rows[market_id] = row
+        self._rows_seen = row + 1
+        return row
+    
+    def write(self, row: int, yes_bid: int, yes_ask: int, yes_mid: int,
+              no_bid: int, no_ask: int, no_mid: int, timestamp: Optional[int] = None):
+        """Replace one row; readers see either the old or the new values"""
+        seq = self._seq
+        seq[row] += 1  # odd: write in progress
+        self._data[:, row] = (
+            yes_bid, yes_ask, yes_mid,
+            no_bid, no_ask, no_mid,
+            time.time_ns() // 1000 if timestamp is None else timestamp
+        )
+        seq[row] += 1
+    
+    def write_quotes(self, row: int, yes: Optional[Quote], no: Optional[Quote],
+                     timestamp: Optional[int] = None):
+        """Write PolymarketAPI.get_live_prices() results; a missing side is stored as zeros"""
+        yes = yes or _EMPTY
+        no = no or _EMPTY
+        self.write(row, yes.bid, yes.ask, yes.mid, no.bid, no.ask, no.mid, timestamp)
+    
+    # Reader side
+    
+    def row_of(self, market_id: str) -> Optional[int]:
+        """Row of a market, picking up rows the writer registered since the last call"""
+        used = self.rows_used
+        if used != self._rows_seen:
+            for row in range(self._rows_seen, used):
+                self._rows[self._keys[row].decode()] = row
+            self._rows_seen = used
+        return self._rows.get(market_id)
+    
+    def market_id(self, row: int) -> str:
+        return self._keys[row].decode()
+    
+    def market_ids(self) -> List[str]:
+        return [key.decode() for key in self._keys[:self.rows_used]]
+    
+    def column(self, field: str) -> np.ndarray:
+        """
+        Zero-copy view of one field for every used row
+        
+        Values can change underneath the view; use read() or snapshot()
+        where a torn row would matter.
+        """
+        return self._data[FIELD_INDEX[field], :self.rows_used]
+    
+    def read(self, row: int, max_spins: int = 1000) -> Optional[PriceRow]:
+        """Consistent copy of one row, or None if the writer kept it busy"""
+        seq = self._seq
+        data = self._data
+        for _ in range(max_spins):
+            before = int(seq[row])
+            if before & 1:
+                continue
+            values = data[:, row].tolist()
+            if int(seq[row]) == before:
+                return PriceRow(*values)
+        return None
+    
+    def snapshot(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Consistent copy of every used row
+        
+        Copies all columns in one go and re-reads only the rows that were
+        being written meanwhile.
+        
+        Returns:
+            (data, seq): data is int64[fields, rows]; seq holds the
+            counter each row was read at (0 = never written)
+        """
+        used = self.rows_used
+        before = self._seq[:used].copy()
+        data = self._data[:, :used].copy()
+        after = self._seq[:used].copy()
+        
+        for row in np.flatnonzero((before != after) | (before & 1).astype(bool)):
+            values = self.read(row)
+            if values is not None:
+                data[:, row] = values
+            after[row] = self._seq[row]
+        return data, after
+    
+    def cheap_rows(self, max_total: int) -> np.ndarray:
+        """Rows whose YES + NO mid is at most `max_total` micro-dollars (both sides priced)"""
+        yes = self.column('yes_mid')
+        no = self.column('no_mid')
+        return np.flatnonzero(((yes + no) <= max_total) & (yes > 0) & (no > 0))
+    
+    def close(self):
+        """Unmap the block; the owner also frees it"""
+        # Views must go before the buffer can be released
+        self._header = self._seq = self._data = self._keys = None
+        self._shm.close()
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
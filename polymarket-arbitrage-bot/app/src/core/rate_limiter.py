@@ -0,0 +1,71 @@
+"""Token-bucket rate limiting for Polymarket requests"""
+import asyncio
+import time
+from typing import NamedTuple
+
+
+class _BucketParams(NamedTuple):
+    rate: float
+    burst: float
+
+
+class RateLimiter:
+    """Async token bucket shared by all requests of one PolymarketAPI
+    
+    `rate` tokens are added per second up to `burst` (at least 1, so a
+    single request can always go through). The parameters are held in one
+    tuple so configure() can swap them from another thread.
+    """
+    
+    def __init__(self, rate: float = 10.0, burst: int = 20):
+        self._params = _BucketParams(float(rate), float(max(1, burst)))
+        self._tokens = self._params.burst
+        self._updated = time.monotonic()
+    
+    @property
+    def rate(self) -> float:
+        return self._params.rate
+    
+    @property
+    def burst(self) -> float:
+        return self._params.burst
+    
+    def configure(self, rate: float, burst: int):
+        """Change the rate and burst; takes effect on the next acquire()"""
+        self._params = _BucketParams(float(rate), float(max(1, burst)))
+    
+    def _refill(self, params: _BucketParams):
+        now = time.monotonic()
+        self._tokens = min(params.burst, self._tokens + (now - self._updated) * params.rate)
+        self._updated = now
+    
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available without waiting"""
+        params = self._params
+        if params.rate <= 0:
+            return True
+        self._refill(params)
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+    
+    async def acquire(self, tokens: float = 1.0):
+        """Wait until `tokens` are available and take them
+        
+        Raises:
+            ValueError: `tokens` is more than the bucket can hold, so the
+                wait would never end (checked again if burst is reloaded)
+        """
+        while True:
+            params = self._params
+            if params.rate <= 0:
+                # Rate of 0 disables limiting
+                return
+            if tokens > params.burst:
+                raise ValueError(f"cannot acquire {tokens} tokens with a burst of {params.burst:g}")
+            self._refill(params)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return
+            await asyncio.sleep((tokens - self._tokens) / params.rate)
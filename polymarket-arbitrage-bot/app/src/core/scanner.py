@@ -0,0 +1,148 @@
+"""Polls prices for a set of markets and runs detection on every tick"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from .arbitrage import ArbitrageDetector, ArbitrageOpportunity
+from .bus import OPPORTUNITIES, PRICES, MarketDataBus, PriceUpdate
+from .fixed_point import Quote, from_micros
+from .history import PriceHistory
+from .lifecycle import OpportunityTracker
+from .market import Market, PolymarketAPI
+from .price_board import PriceBoard
+from ..utils.config import config
+from ..utils.logger import setup_logger
+from ..utils.metrics import TICKS
+
+logger = setup_logger(__name__)
+
+
+@dataclass
+class ScanStats:
+    """Result of one pass over the watched markets"""
+    markets: int
+    ticks: int
+    opportunities: int
+    seconds: float
+    lag: float = 0.0  # how far behind the poll schedule the scanner is running
+    requests: Dict[str, float] = field(default_factory=dict)  # allowed requests/s per watchlist tier
+
+
+class Scanner:
+    """
+    Headless price scanner
+    
+    Each pass fetches YES/NO prices for every watched market (at most
+    `concurrency` requests in flight) and checks each market as soon as its
+    prices arrive, so detection never waits for the whole pass. With a
+    PriceBoard, every quote is also published there for other processes.
+    With an OpportunityTracker, on_opportunity is treated as the executor:
+    it fires once when an opportunity opens (and again after a cooldown),
+    not on every tick the edge persists. With a MarketDataBus, every quote
+    goes out on PRICES and every opportunity acted on on OPPORTUNITIES;
+    detection itself stays inline, so it always sees the quote just
+    fetched. A tick where either side's quote failed is counted but not
+    checked, recorded or published.
+    """
+    
+    def __init__(
+        self,
+        api: PolymarketAPI,
+        detector: ArbitrageDetector,
+        markets: Optional[List[Market]] = None,
+        concurrency: int = 50,
+        on_opportunity: Optional[Callable[[ArbitrageOpportunity], None]] = None,
+        board: Optional[PriceBoard] = None,
+        tracker: Optional[OpportunityTracker] = None,
+        history: Optional[PriceHistory] = None,
+        bus: Optional[MarketDataBus] = None
+    ):
+        self.api = api
+        self.detector = detector
+        self.board = board
+        self.tracker = tracker
+        self.history = history
+        self.bus = bus
+        self.set_markets(markets or [])
+        self.concurrency = concurrency
+        self.on_opportunity = on_opportunity
+        self.running = False
+    
+    def set_markets(self, markets: List[Market]):
+        """Replace the watched markets; takes effect on the next pass"""
+        self.markets = list(markets)
+        if self.board:
+            for market in self.markets:
+                self.board.register(market.id)
+    
+    async def _check(self, market: Market, semaphore: asyncio.Semaphore, ticks) -> bool:
+        async with semaphore:
+            yes_data, no_data = await self.api.get_market_quotes(market)
+        return self._process(market, yes_data, no_data, ticks)
+    
+    def _process(self, market: Market, yes_data: Optional[Quote],
+                 no_data: Optional[Quote], ticks) -> bool:
+        """Publish, record and check one market's fresh quotes; True if acted on"""
+        ticks.inc()
+        if self.board:
+            # A missing side is written as zeros, which cheap_rows() skips
+            self.board.write_quotes(self.board.register(market.id), yes_data, no_data)
+        if yes_data is None or no_data is None:
+            # A failed side is no price: nothing to record, publish or trade on
+            return False
+        yes_micros, no_micros = yes_data.mid, no_data.mid
+        now = time.time()
+        market.yes_micros, market.no_micros = yes_micros, no_micros
+        market.quoted_at, market.stale = now, False
+        if self.history:
+            self.history.record(market.id, now, from_micros(yes_micros), from_micros(no_micros))
+        if self.bus:
+            self.bus.publish(PRICES, market.id, PriceUpdate(market.id, yes_micros, no_micros, now))
+        if self.tracker:
+            event = self.tracker.observe(market.id, market.question, yes_micros, no_micros)
+            if event is None or not event.actionable:
+                return False
+            opp = event.opportunity.latest
+        else:
+            opp = self.detector.check_micros(market.id, market.question, yes_micros, no_micros)
+            if opp is None:
+                return False
+        if self.bus:
+            self.bus.publish(OPPORTUNITIES, market.id, opp)
+        if self.on_opportunity:
+            self.on_opportunity(opp)
+        if self.tracker:
+            self.tracker.mark_executed(market.id)
+        return True
+    
+    async def scan_once(self) -> ScanStats:
+        """Poll every watched market once"""
+        markets = self.markets
+        semaphore = asyncio.Semaphore(self.concurrency)
+        ticks = TICKS.labels()
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(self._check(m, semaphore, ticks) for m in markets), return_exceptions=True
+        )
+        found = sum(1 for r in results if r is True)
+        seconds = time.perf_counter() - start
+        return ScanStats(
+            markets=len(markets),
+            ticks=sum(1 for r in results if not isinstance(r, BaseException)),
+            opportunities=found,
+            seconds=seconds,
+            lag=max(0.0, seconds - config.snapshot.poll_interval)
+        )
+    
+    async def run(self, on_pass: Optional[Callable[[ScanStats], None]] = None):
+        """Scan repeatedly, at most once per configured poll interval"""
+        self.running = True
+        while self.running:
+            stats = await self.scan_once()
+            if on_pass:
+                on_pass(stats)
+            await asyncio.sleep(max(0.0, config.snapshot.poll_interval - stats.seconds))
+    
+    def stop(self):
+        self.running = False
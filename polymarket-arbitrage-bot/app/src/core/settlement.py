@@ -0,0 +1,148 @@
+"""Merge settlement: matched YES + NO pairs are merged in batches per condition"""
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from .fixed_point import MICROS
+from ..utils.logger import setup_logger
+from ..utils.metrics import registry
+
+logger = setup_logger(__name__)
+
+SETTLEMENT_BATCH_PAIRS = registry.histogram(
+    "settlement_batch_pairs", "YES + NO pairs redeemed by one merge",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500))
+SETTLEMENT_WAIT_SECONDS = registry.histogram(
+    "settlement_wait_seconds", "Time from the first pair of a batch to its merge",
+    buckets=(0.1, 1, 5, 15, 30, 60, 120, 300, 900))
+
+
+@dataclass
+class PendingMerge:
+    """Pairs bought on one condition that have not been merged yet (amounts in micro-dollars)"""
+    condition_id: str
+    pairs: int
+    cost_micros: int   # paid for the shares, fees included
+    gas_micros: int    # gas the merge is expected to cost
+    opened_at: float   # wall-clock time of the first pair
+
+
+@dataclass
+class Settlement:
+    """One merge transaction: `pairs` full sets redeemed for $1.00 each"""
+    condition_id: str
+    pairs: int
+    cost_micros: int
+    gas_micros: int
+    opened_at: float
+    settled_at: float
+    
+    @property
+    def payout_micros(self) -> int:
+        return self.pairs * MICROS
+    
+    @property
+    def profit_micros(self) -> int:
+        return self.payout_micros - self.cost_micros - self.gas_micros
+    
+    @property
+    def wait(self) -> float:
+        return self.settled_at - self.opened_at
+
+
+class SettlementQueue:
+    """
+    Matched pairs waiting to be merged, grouped by condition ID
+    
+    A condition's pairs are merged in one transaction once `batch_size` of
+    them are waiting or the first of them is `max_age` seconds old (0: no
+    age limit). A merge costs one gas fee however many pairs it redeems, so
+    batching spreads the gas; in exchange the capital paid for the pairs
+    stays tied up until the merge. batch_size=1 merges every pair right away.
+    
+    Times are wall-clock, so pending merges keep their age across a restart.
+    """
+    
+    def __init__(self, batch_size: int = 1, max_age: float = 0.0):
+        self.batch_size = max(1, batch_size)
+        self.max_age = max_age
+        # Insertion order is first-pair order, so the oldest batch is first
+        self._pending: Dict[str, PendingMerge] = {}
+        self.locked_micros = 0
+        self.pending_pairs = 0
+    
+    def configure(self, batch_size: int, max_age: float):
+        self.batch_size = max(1, batch_size)
+        self.max_age = max_age
+    
+    def apply_snapshot(self, snapshot):
+        """Pick up batch thresholds from a ConfigSnapshot"""
+        values = snapshot.values
+        self.configure(int(values.get('settlement.batch_size', self.batch_size)),
+                       float(values.get('settlement.max_age', self.max_age)))
+    
+    def __len__(self) -> int:
+        return len(self._pending)
+    
+    def add(self, condition_id: str, cost_micros: int, gas_micros: int,
+            now: Optional[float] = None) -> Optional[Settlement]:
+        """Queue one pair; returns the settlement if it fills the condition's batch"""
+        now = time.time() if now is None else now
+        batch = self._pending.get(condition_id)
+        if batch is None:
+            batch = self._pending[condition_id] = PendingMerge(condition_id, 0, 0, gas_micros, now)
+        batch.pairs += 1
+        batch.cost_micros += cost_micros
+        batch.gas_micros = gas_micros  # gas at the time of the merge
+        self.locked_micros += cost_micros
+        self.pending_pairs += 1
+        if batch.pairs >= self.batch_size:
+            return self._merge(condition_id, now)
+        return None
+    
+    def due(self, now: Optional[float] = None) -> List[Settlement]:
+        """Merge every batch whose first pair is at least `max_age` old"""
+        if self.max_age <= 0:
+            return []
+        now = time.time() if now is None else now
+        deadline = now - self.max_age
+        due = []
+        for condition_id, batch in self._pending.items():
+            if batch.opened_at > deadline:
+                break
+            due.append(condition_id)
+        return [self._merge(condition_id, now) for condition_id in due]
+    
+    def flush(self, now: Optional[float] = None) -> List[Settlement]:
+        """Merge everything that is waiting"""
+        now = time.time() if now is None else now
+        return [self._merge(condition_id, now) for condition_id in list(self._pending)]
+    
+    def _merge(self, condition_id: str, now: float) -> Settlement:
+        batch = self._pending.pop(condition_id)
+        self.locked_micros -= batch.cost_micros
+        self.pending_pairs -= batch.pairs
+        settlement = Settlement(condition_id, batch.pairs, batch.cost_micros, batch.gas_micros,
+                                batch.opened_at, now)
+        SETTLEMENT_BATCH_PAIRS.observe(batch.pairs)
+        SETTLEMENT_WAIT_SECONDS.observe(settlement.wait)
+        return settlement
+    
+    def pending(self) -> List[PendingMerge]:
+        """Copies of the waiting batches, oldest first (for checkpoints)"""
+        return [PendingMerge(b.condition_id, b.pairs, b.cost_micros, b.gas_micros, b.opened_at)
+                for b in self._pending.values()]
+    
+    def restore(self, pending: Iterable[PendingMerge]):
+        """Replace the waiting batches with saved ones"""
+        self.clear()
+        for batch in sorted(pending, key=lambda b: b.opened_at):
+            self._pending[batch.condition_id] = PendingMerge(
+                batch.condition_id, batch.pairs, batch.cost_micros, batch.gas_micros, batch.opened_at)
+            self.locked_micros += batch.cost_micros
+            self.pending_pairs += batch.pairs
+    
+    def clear(self):
+        self._pending.clear()
+        self.locked_micros = 0
+        self.pending_pairs = 0
@@ -0,0 +1,387 @@
+"""Multi-process sharded scanning with a single executing coordinator"""
+import asyncio
+import multiprocessing as mp
+import queue
+import statistics
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from .arbitrage import ArbitrageDetector, ArbitrageOpportunity, DetectorParams
+from .checkpoint import Checkpoint, CheckpointWriter
+from .demo_mode import DemoMode
+from .lifecycle import OpportunityTracker
+from .market import Market
+from .tiers import COLD, TIERS, WATCHLIST_REQUESTS, Watchlist
+from ..utils import event_loop
+from ..utils.config import config
+from ..utils.logger import setup_logger
+from ..utils.metrics import registry
+
+logger = setup_logger(__name__)
+
+SHARD_MARKETS = registry.gauge("shard_markets", "Markets assigned to each scan worker", ("shard",))
+SHARD_LAG_SECONDS = registry.gauge(
+    "shard_lag_seconds", "How far behind its poll schedule each worker is running", ("shard",))
+SHARD_OPPORTUNITIES = registry.counter(
+    "shard_opportunities_total", "Opportunities reported by each worker", ("shard",))
+
+
+def shard_for(token_id: str, num_shards: int) -> int:
+    """Stable shard index for a token ID (same in every process, unlike hash())"""
+    return zlib.crc32(token_id.encode()) % num_shards
+
+
+def _worker_main(shard_id: int, num_shards: int, markets: List[Market],
+                 endpoints: Optional[Tuple[str, str]], results: mp.Queue, control: mp.Queue,
+                 cooldowns: Optional[Dict[str, float]] = None, loop_backend: Optional[str] = None):
+    """Entry point of a scan worker process"""
+    event_loop.run(_worker_loop(shard_id, num_shards, markets, endpoints, results, control, cooldowns),
+                   loop_backend)
+
+
+async def _worker_loop(shard_id: int, num_shards: int, markets: List[Market],
+                       endpoints: Optional[Tuple[str, str]], results: mp.Queue, control: mp.Queue,
+                       cooldowns: Optional[Dict[str, float]] = None):
+    from .market import PolymarketAPI
+    from .poll_scheduler import AdaptiveScanner
+    from .scanner import Scanner
+    
+    # Own session, limiter and detector per worker; thresholds follow config.yaml
+    api = PolymarketAPI()
+    detector = ArbitrageDetector()
+    # The coordinator executes everything it is sent, so workers only send
+    # fresh openings and re-arms after a cooldown
+    tracker = OpportunityTracker(detector)
+    if cooldowns:
+        tracker.restore_cooldowns(cooldowns)
+    
+    def apply_snapshot(snapshot):
+        api.apply_snapshot(snapshot)
+        if endpoints:
+            api.set_endpoints(*endpoints)
+        # The request budget is per client, so the workers split it
+        api.limiter.configure(snapshot.requests_per_second / num_shards,
+                              max(1, snapshot.request_burst // num_shards))
+        detector.apply_snapshot(snapshot)
+        tracker.apply_snapshot(snapshot)
+    
+    apply_snapshot(config.snapshot)
+    config.subscribe(apply_snapshot)
+    config.watch()
+    
+    scanner_class = AdaptiveScanner if config.get('scanner.adaptive', True) else Scanner
+    scanner = scanner_class(
+        api, detector, markets,
+        concurrency=config.get('sharding.worker_concurrency', 50),
+        on_opportunity=lambda opp: results.put(('opportunity', shard_id, opp)),
+        tracker=tracker
+    )
+    if isinstance(scanner, AdaptiveScanner):
+        scanner.apply_snapshot(config.snapshot)
+        config.subscribe(scanner.apply_snapshot)
+    reported = 0.0
+    
+    def report(stats):
+        # Quotes fresh since the last window go back for the coordinator's checkpoint
+        nonlocal reported
+        since, reported = reported, time.time()
+        quotes = [(m.id, m.yes_micros, m.no_micros, m.quoted_at)
+                  for m in scanner.markets if m.quoted_at > since]
+        results.put(('stats', shard_id, stats))
+        if quotes:
+            results.put(('quotes', shard_id, quotes))
+    
+    loop = asyncio.get_running_loop()
+    task = asyncio.create_task(scanner.run(report))
+    
+    def read_control():
+        while True:
+            message = control.get()
+            if message[0] == 'assign':
+                loop.call_soon_threadsafe(scanner.set_markets, message[1])
+            elif message[0] == 'stop':
+                loop.call_soon_threadsafe(task.cancel)
+                return
+    
+    threading.Thread(target=read_control, name="shard-control", daemon=True).start()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    finally:
+        config.stop_watching()
+        await api.close()
+
+
+class ShardCoordinator:
+    """
+    Splits the catalog across worker processes and executes what they find
+    
+    Each market goes to shard crc32(yes_token_id) % N. Workers scan and
+    detect locally and send opportunities back over one result queue; the
+    coordinator owns DemoMode, so execution stays single-threaded. When a
+    worker runs well behind its poll schedule compared to the others, part
+    of its markets are moved to the worker with the least lag. Workers run
+    their scans on the `loop_backend` event loop (see event_loop.run). With a
+    CheckpointWriter the ledger, the market set with its latest quotes and
+    the execution cooldowns are saved in the background while running.
+    
+    Only hot and warm markets of the `watchlist` are handed to workers.
+    Catalog fetches passed to submit_catalog() are applied as deltas: just
+    the shards whose markets entered, left or changed tier are reassigned.
+    """
+    
+    def __init__(
+        self,
+        num_workers: int,
+        demo_mode: Optional[DemoMode] = None,
+        endpoints: Optional[Tuple[str, str]] = None,
+        rebalance_interval: float = 30.0,
+        imbalance_ratio: float = 1.5,
+        move_fraction: float = 0.1,
+        checkpoint: Optional[CheckpointWriter] = None,
+        loop_backend: Optional[str] = None,
+        watchlist: Optional[Watchlist] = None
+    ):
+        self.num_workers = max(1, num_workers)
+        self.demo_mode = demo_mode or DemoMode(
+            initial_balance=config.demo_balance,
+            trade_history=config.get('demo.trade_history', 1000),
+            batch_size=config.get('settlement.batch_size', 20),
+            max_age=config.get('settlement.max_age', 60.0)
+        )
+        self.endpoints = endpoints
+        self.rebalance_interval = rebalance_interval
+        self.imbalance_ratio = imbalance_ratio
+        self.move_fraction = move_fraction
+        self.loop_backend = loop_backend
+        
+        self._ctx = mp.get_context('spawn')
+        self.results: mp.Queue = self._ctx.Queue()
+        self.controls: List[mp.Queue] = []
+        self.processes: List[mp.Process] = []
+        self.assignments: Dict[int, List[Market]] = {}
+        self.lag: Dict[int, float] = {}
+        self._last_rebalance = time.monotonic()
+        self.checkpoint = checkpoint
+        self.markets: Dict[str, Market] = {}
+        self.executed_at: Dict[str, float] = {}
+        if watchlist is None:
+            watchlist = Watchlist()
+            watchlist.apply_snapshot(config.snapshot)
+        self.watchlist = watchlist
+        self.requests: Dict[int, Dict[str, float]] = {}  # allowed requests/s per tier, by shard
+        self._catalog: Optional[List[Market]] = None
+        self._catalog_lock = threading.Lock()
+    
+    def assign(self, markets: List[Market]) -> Dict[int, List[Market]]:
+        """Initial market -> shard assignment by token-ID hash"""
+        shards: Dict[int, List[Market]] = {i: [] for i in range(self.num_workers)}
+        for market in markets:
+            shards[shard_for(market.yes_token_id or market.id, self.num_workers)].append(market)
+        return shards
+    
+    def start(self, markets: List[Market], cooldowns: Optional[Dict[str, float]] = None):
+        """Spawn one worker per shard; `cooldowns` are restored execution cooldowns"""
+        self.markets = {m.id: m for m in markets}
+        self.watchlist.update(markets)
+        scanned = self.watchlist.scanned()
+        self.assignments = self.assign(scanned)
+        for shard_id in range(self.num_workers):
+            control = self._ctx.Queue()
+            shard_cooldowns = {m.id: cooldowns[m.id] for m in self.assignments[shard_id]
+                               if m.id in cooldowns} if cooldowns else None
+            process = self._ctx.Process(
+                target=_worker_main,
+                args=(shard_id, self.num_workers, self.assignments[shard_id], self.endpoints,
+                      self.results, control, shard_cooldowns, self.loop_backend),
+                name=f"scan-worker-{shard_id}",
+                daemon=True
+            )
+            process.start()
+            self.controls.append(control)
+            self.processes.append(process)
+            SHARD_MARKETS.labels(shard_id).set(len(self.assignments[shard_id]))
+        logger.info("Started %d scan workers for %d markets (%s event loop); watchlist: %s",
+                    self.num_workers, len(scanned), event_loop.resolve_backend(self.loop_backend),
+                    self.watchlist.summary())
+    
+    def execute(self, opp: ArbitrageOpportunity):
+        self.executed_at[opp.market_id] = time.time()
+        snapshot = config.snapshot
+        params = DetectorParams.build(snapshot.min_profit, snapshot.trading_fee, snapshot.gas_estimate)
+        market = self.markets.get(opp.market_id)
+        self.demo_mode.execute_micros(
+            market_name=opp.market_name,
+            yes_micros=opp.yes_micros,
+            no_micros=opp.no_micros,
+            fee_ppm=params.fee_ppm,
+            gas_micros=params.gas_micros,
+            condition_id=market.condition_id if market and market.condition_id else opp.market_id
+        )
+    
+    def poll(self, timeout: float = 0.5) -> int:
+        """Handle worker messages for up to `timeout` seconds; returns messages handled"""
+        handled = 0
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                kind, shard_id, payload = self.results.get(timeout=remaining)
+            except queue.Empty:
+                break
+            handled += 1
+            if kind == 'opportunity':
+                SHARD_OPPORTUNITIES.labels(shard_id).inc()
+                self.execute(payload)
+            elif kind == 'stats':
+                self.lag[shard_id] = payload.lag
+                SHARD_LAG_SECONDS.labels(shard_id).set(payload.lag)
+                if payload.requests:
+                    self._update_requests(shard_id, payload.requests)
+            elif kind == 'quotes':
+                self._update_quotes(payload)
+        
+        self.demo_mode.settle()
+        with self._catalog_lock:
+            catalog, self._catalog = self._catalog, None
+        if catalog is not None:
+            self.apply_catalog(catalog)
+        if time.monotonic() - self._last_rebalance >= self.rebalance_interval:
+            self.rebalance()
+        if self.checkpoint and self.checkpoint.due():
+            self.checkpoint.submit(self.capture())
+        return handled
+    
+    def _update_quotes(self, quotes):
+        markets = self.markets
+        for market_id, yes_micros, no_micros, quoted_at in quotes:
+            market = markets.get(market_id)
+            if market is not None:
+                market.yes_micros, market.no_micros = yes_micros, no_micros
+                market.quoted_at, market.stale = quoted_at, False
+    
+    def _update_requests(self, shard_id: int, requests: Dict[str, float]):
+        self.requests[shard_id] = requests
+        for tier, rate in self.request_budget().items():
+            WATCHLIST_REQUESTS.labels(tier).set(rate)
+    
+    def request_budget(self) -> Dict[str, float]:
+        """Requests per second the workers allow each tier, summed over shards"""
+        return {tier: sum(r.get(tier, 0.0) for r in self.requests.values()) for tier in TIERS}
+    
+    def submit_catalog(self, markets: List[Market]):
+        """Hand over a fresh catalog fetch from any thread; poll() applies the latest one"""
+        with self._catalog_lock:
+            self._catalog = markets
+    
+    def apply_catalog(self, markets: List[Market]) -> int:
+        """
+        Bring workers in line with a new catalog fetch; returns shards reassigned
+        
+        Known markets keep their last quotes and their shard (also after a
+        rebalance); new ones go to their hash shard.
+        """
+        for market in markets:
+            known = self.markets.get(market.id)
+            if known is not None and known.quoted_at > market.quoted_at:
+                market.yes_micros, market.no_micros = known.yes_micros, known.no_micros
+                market.quoted_at, market.stale = known.quoted_at, known.stale
+        self.markets = {m.id: m for m in markets}
+        changes = self.watchlist.update(markets)
+        if not changes:
+            return 0
+        
+        placed = {m.id: shard_id for shard_id, assigned in self.assignments.items() for m in assigned}
+        leaving = {c.market.id for c in changes if c.old not in (None, COLD)}
+        touched = set()
+        for shard_id, assigned in self.assignments.items():
+            kept = [m for m in assigned if m.id not in leaving]
+            if len(kept) != len(assigned):
+                self.assignments[shard_id] = kept
+                touched.add(shard_id)
+        for change in changes:
+            if change.new not in (None, COLD):
+                market = change.market
+                shard_id = placed.get(market.id)
+                if shard_id is None:
+                    shard_id = shard_for(market.yes_token_id or market.id, self.num_workers)
+                self.assignments[shard_id].append(market)
+                touched.add(shard_id)
+        
+        for shard_id in touched:
+            # Send the latest catalog figures with every market of the shard
+            assigned = [self.markets.get(m.id, m) for m in self.assignments[shard_id]]
+            self.assignments[shard_id] = assigned
+            if shard_id < len(self.controls):
+                self.controls[shard_id].put(('assign', assigned))
+            SHARD_MARKETS.labels(shard_id).set(len(assigned))
+        logger.info("Catalog update: %d markets changed tier, %d shards reassigned; watchlist: %s",
+                    len(changes), len(touched), self.watchlist.summary())
+        return len(touched)
+    
+    def cooldowns(self) -> Dict[str, float]:
+        """Wall-clock end of the execution cooldown of recently executed markets"""
+        now, cooldown = time.time(), config.get('opportunities.cooldown', 30.0)
+        self.executed_at = {market_id: at for market_id, at in self.executed_at.items()
+                            if at + cooldown > now}
+        return {market_id: at + cooldown for market_id, at in self.executed_at.items()}
+    
+    def capture(self) -> Checkpoint:
+        return Checkpoint.capture(self.demo_mode, self.markets.values(), self.cooldowns(),
+                                  config.get('checkpoint.max_trades', 1000))
+    
+    def rebalance(self) -> bool:
+        """Move markets from a worker that falls behind to the fastest one"""
+        self._last_rebalance = time.monotonic()
+        if len(self.lag) < 2:
+            return False
+        
+        slowest = max(self.lag, key=self.lag.get)
+        fastest = min(self.lag, key=self.lag.get)
+        median = statistics.median(self.lag.values())
+        # Small lags are scheduling noise, not a worker falling behind
+        behind = (self.lag[slowest] > 0.1 * config.snapshot.poll_interval
+                  and self.lag[slowest] > self.imbalance_ratio * median)
+        if not behind or slowest == fastest:
+            return False
+        
+        source = self.assignments[slowest]
+        count = max(1, int(len(source) * self.move_fraction))
+        if count >= len(source):
+            return False
+        moved, self.assignments[slowest] = source[-count:], source[:-count]
+        self.assignments[fastest] = self.assignments[fastest] + moved
+        
+        for shard_id in (slowest, fastest):
+            self.controls[shard_id].put(('assign', self.assignments[shard_id]))
+            SHARD_MARKETS.labels(shard_id).set(len(self.assignments[shard_id]))
+        # Wait for fresh timings before judging again
+        self.lag.pop(slowest, None)
+        self.lag.pop(fastest, None)
+        
+        logger.info("Rebalanced %d markets from shard %d to shard %d", count, slowest, fastest)
+        return True
+    
+    def run(self, duration: Optional[float] = None):
+        """Process worker messages until `duration` elapses (or forever)"""
+        deadline = time.monotonic() + duration if duration else None
+        while deadline is None or time.monotonic() < deadline:
+            self.poll()
+    
+    def stop(self, timeout: float = 5.0):
+        for control in self.controls:
+            control.put(('stop',))
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.processes.clear()
+        self.controls.clear()
+        logger.info("Scan workers stopped")
+        if self.checkpoint:
+            self.checkpoint.stop(final=self.capture())
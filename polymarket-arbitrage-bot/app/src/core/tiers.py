@@ -0,0 +1,186 @@
+"""Watchlist tiers: cheap prefiltering of the catalog on gamma's own figures"""
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .market import Market
+from ..utils.logger import setup_logger
+from ..utils.metrics import registry
+
+logger = setup_logger(__name__)
+
+WATCHLIST_MARKETS = registry.gauge("watchlist_markets", "Catalog markets in each watchlist tier", ("tier",))
+WATCHLIST_REQUESTS = registry.gauge(
+    "watchlist_request_budget", "Requests per second the pollers allow each watchlist tier", ("tier",))
+
+# Hot markets are polled as fast as allowed, warm ones adaptively, cold ones not at all
+HOT = "hot"
+WARM = "warm"
+COLD = "cold"
+TIERS = (HOT, WARM, COLD)
+
+
+@dataclass(frozen=True)
+class TierPolicy:
+    """
+    Thresholds that sort a market into a tier
+    
+    Amounts are dollars as gamma reports them. A figure gamma did not send
+    never makes a market cold or hot on its own, so an unknown market is
+    warm, which is how every market was polled before tiers.
+    """
+    hot_liquidity: float = 50_000.0
+    hot_volume: float = 250_000.0
+    min_liquidity: float = 1_000.0
+    max_spread: float = 0.10
+    min_hours_to_end: float = 1.0
+    
+    @classmethod
+    def from_values(cls, values: Dict) -> "TierPolicy":
+        """Policy from flattened config values (`tiers.*` keys)"""
+        defaults = cls()
+        return cls(**{name: float(values.get(f'tiers.{name}', getattr(defaults, name)))
+                      for name in cls.__dataclass_fields__})
+    
+    @property
+    def end_margin(self) -> float:
+        """Seconds before its end date at which a market turns cold"""
+        return self.min_hours_to_end * 3600
+    
+    def classify(self, market: Market, now: Optional[float] = None) -> str:
+        """
+        Tier of one market
+        
+        Cold: inactive, thinner than `min_liquidity`, wider than
+        `max_spread`, or closing within `min_hours_to_end`. Hot: at least
+        `hot_liquidity` deep and `hot_volume` traded. Warm otherwise.
+        """
+        if not market.active:
+            return COLD
+        if market.end_date is not None:
+            if market.end_date - (time.time() if now is None else now) < self.end_margin:
+                return COLD
+        liquidity = market.liquidity
+        if liquidity is not None and liquidity < self.min_liquidity:
+            return COLD
+        if market.spread is not None and market.spread > self.max_spread:
+            return COLD
+        if (liquidity is not None and liquidity >= self.hot_liquidity
+                and market.volume is not None and market.volume >= self.hot_volume):
+            return HOT
+        return WARM
+
+
+def split_budget(rate: float, hot_share: float, hot_wanted: float,
+                 warm_wanted: float) -> Tuple[float, float]:
+    """
+    Requests per second allowed for hot and warm markets out of `rate`
+    
+    Hot markets are guaranteed `hot_share` of the rate and warm ones the
+    rest; whatever one tier leaves unused goes to the other. With
+    0 < hot_share < 1 a tier that wants anything always gets some.
+    """
+    hot = min(hot_wanted, max(rate * hot_share, rate - warm_wanted))
+    warm = min(warm_wanted, rate - hot)
+    return hot, warm
+
+
+class TierChange(NamedTuple):
+    """A market that entered, left or moved between tiers"""
+    market: Market
+    old: Optional[str]  # None: new to the catalog
+    new: Optional[str]  # None: gone from the catalog
+
+
+class Watchlist:
+    """
+    The catalog sorted into hot, warm and cold tiers
+    
+    update() takes each catalog fetch and only classifies markets that are
+    new or whose liquidity, volume, spread or end date changed (plus any
+    whose end date has come within the cold margin); it returns just the
+    markets whose tier changed, so pollers can apply the delta instead of
+    reloading everything. Tier counts are published as metrics.
+    """
+    
+    def __init__(self, policy: Optional[TierPolicy] = None, enabled: bool = True):
+        self.policy = policy or TierPolicy()
+        self.enabled = enabled
+        self._markets: Dict[str, Market] = {}
+        self._tiers: Dict[str, str] = {}
+        self._signatures: Dict[str, Tuple] = {}
+        self._counts = dict.fromkeys(TIERS, 0)
+        self._gauges = {tier: WATCHLIST_MARKETS.labels(tier) for tier in TIERS}
+    
+    def apply_snapshot(self, snapshot):
+        """Pick up thresholds from a ConfigSnapshot; they apply from the next update()"""
+        values = snapshot.values
+        policy = TierPolicy.from_values(values)
+        enabled = bool(values.get('tiers.enabled', True))
+        if policy != self.policy or enabled != self.enabled:
+            self.policy, self.enabled = policy, enabled
+            self._signatures.clear()  # reclassify everything
+    
+    def __len__(self) -> int:
+        return len(self._markets)
+    
+    def classify(self, market: Market, now: float) -> str:
+        return self.policy.classify(market, now) if self.enabled else WARM
+    
+    def update(self, markets: Iterable[Market], complete: bool = True) -> List[TierChange]:
+        """
+        Apply a catalog fetch; returns the markets whose tier changed
+        
+        Sets `tier` on every market passed in. With `complete` the fetch is
+        the whole catalog and markets missing from it are dropped; pass
+        complete=False for a partial fetch.
+        """
+        now = time.time()
+        closing = now + self.policy.end_margin
+        tiers, signatures, counts = self._tiers, self._signatures, self._counts
+        changes = []
+        seen = set()
+        for market in markets:
+            market_id = market.id
+            seen.add(market_id)
+            signature = (market.active, market.liquidity, market.volume, market.spread, market.end_date)
+            old = tiers.get(market_id)
+            if (old is not None and signatures.get(market_id) == signature
+                    and (market.end_date is None or market.end_date > closing)):
+                market.tier = old
+            else:
+                market.tier = self.classify(market, now)
+                signatures[market_id] = signature
+            self._markets[market_id] = market
+            if market.tier != old:
+                if old is not None:
+                    counts[old] -= 1
+                counts[market.tier] += 1
+                tiers[market_id] = market.tier
+                changes.append(TierChange(market, old, market.tier))
+        
+        if complete:
+            for market_id in [m for m in tiers if m not in seen]:
+                old = tiers.pop(market_id)
+                signatures.pop(market_id, None)
+                counts[old] -= 1
+                changes.append(TierChange(self._markets.pop(market_id), old, None))
+        
+        for tier, gauge in self._gauges.items():
+            gauge.set(counts[tier])
+        return changes
+    
+    def counts(self) -> Dict[str, int]:
+        """Markets per tier"""
+        return dict(self._counts)
+    
+    def markets(self, tier: str) -> List[Market]:
+        return [m for m in self._markets.values() if m.tier == tier]
+    
+    def scanned(self) -> List[Market]:
+        """Hot and warm markets, in catalog order"""
+        return [m for m in self._markets.values() if m.tier != COLD]
+    
+    def summary(self) -> str:
+        counts = self._counts
+        return f"{counts[HOT]} hot, {counts[WARM]} warm, {counts[COLD]} cold"
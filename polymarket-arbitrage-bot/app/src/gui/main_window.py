@@ -1,7 +1,10 @@
 """Main GUI window with real-time Polymarket integration"""
 import sys
+import time
 import asyncio
-from typing import Optional, List
+from concurrent.futures import CancelledError, Future
+from functools import partial
+from typing import Callable, Optional, List
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QLineEdit, QTextEdit, QListWidget, 
@@ -12,77 +15,138 @@ from PyQt6.QtGui import QFont
 
 from ..core.market import Market, PolymarketAPI
 from ..core.arbitrage import ArbitrageDetector, ArbitrageOpportunity
+from ..core import checkpoint
+from ..core.bus import FILLS, OPPORTUNITIES, PRICES, MarketDataBus, PriceUpdate
 from ..core.demo_mode import DemoMode
+from ..core.fixed_point import from_micros, to_micros
+from ..core.history import PriceHistory
+from ..core.lifecycle import OpportunityTracker
+from ..core.poll_scheduler import adaptive_interval
+from ..core.price_board import BOARD_SUPPORTED, PriceBoard
+from ..core.tiers import COLD, HOT, TIERS, WARM, Watchlist
+from .price_chart import PriceChart
 from ..utils.config import config
+from ..utils.event_loop import BackgroundLoop
 from ..utils.logger import setup_logger
+from ..utils.loop_monitor import LoopMonitor, debug_routes
+from ..utils.metrics import MetricsServer, TICKS, track_demo_mode
+from ..utils.profiler import SamplingProfiler, install_signal_trigger
 
 logger = setup_logger(__name__)
 
+# Market list: hot markets first, cold ones (never polled headless) last
+TIER_ICONS = {HOT: "🔥", WARM: "📊", COLD: "🧊"}
+
 
 class MarketFetchThread(QThread):
     """Background thread for fetching markets"""
     markets_fetched = pyqtSignal(list)
     error_occurred = pyqtSignal(str)
     
-    def __init__(self, api: PolymarketAPI):
+    def __init__(self, api: PolymarketAPI, runtime: BackgroundLoop):
         super().__init__()
         self.api = api
+        self.runtime = runtime
     
     def run(self):
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            markets = loop.run_until_complete(self.api.fetch_markets(limit=50))
-            loop.close()
+            markets = self.runtime.run(self.api.fetch_markets(limit=50))
             self.markets_fetched.emit(markets)
         except Exception as e:
             self.error_occurred.emit(str(e))
 
 
 class PriceUpdateThread(QThread):
-    """Background thread for updating prices"""
-    prices_updated = pyqtSignal(float, float)
+    """Background thread for updating prices; each quote is published on the bus"""
     error_occurred = pyqtSignal(str)
     
-    def __init__(self, api: PolymarketAPI, market: Market):
+    def __init__(self, api: PolymarketAPI, market: Market, runtime: BackgroundLoop,
+                 bus: MarketDataBus, board: Optional[PriceBoard] = None,
+                 next_interval: Optional[Callable[[], float]] = None):
         super().__init__()
         self.api = api
         self.market = market
+        self.runtime = runtime
+        self.bus = bus
+        self.board = board
+        self.next_interval = next_interval
         self.running = False
+        self._future: Optional[Future] = None
+    
+    async def poll(self):
+        """Poll prices on the shared loop until stopped"""
+        ticks = TICKS.labels()
+        row = self.board.register(self.market.id) if self.board else None
+        failing = False
+        while self.running:
+            # Fetch real prices from Polymarket
+            yes_data, no_data = await self.api.get_market_quotes(self.market)
+            ticks.inc()
+            if self.board:
+                self.board.write_quotes(row, yes_data, no_data)
+            if yes_data is None or no_data is None:
+                # No price for a side: publish nothing rather than a made-up one,
+                # and report only the first failure of a run
+                logger.debug("Quote missing for %s (YES %s, NO %s)", self.market.id,
+                             yes_data is not None, no_data is not None)
+                if not failing:
+                    self.error_occurred.emit(f"no {'YES' if yes_data is None else 'NO'} quote, "
+                                             f"skipping updates until it returns")
+                failing = True
+            else:
+                failing = False
+                self.bus.publish(PRICES, self.market.id,
+                                 PriceUpdate(self.market.id, yes_data.mid, no_data.mid, time.time()))
+            
+            # Adaptive when a policy is given, else the live config interval
+            interval = self.next_interval() if self.next_interval else config.snapshot.poll_interval
+            await asyncio.sleep(interval)
     
     def run(self):
         self.running = True
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        self._future = self.runtime.submit(self.poll())
         
         try:
-            while self.running:
-                # Fetch real prices from Polymarket
-                yes_price, no_price = loop.run_until_complete(
-                    self.api.get_market_prices(self.market)
-                )
-                self.prices_updated.emit(yes_price, no_price)
-                
-                # Update every 2 seconds to avoid rate limiting
-                loop.run_until_complete(asyncio.sleep(2))
-                
+            self._future.result()
+        except CancelledError:
+            pass
         except Exception as e:
             self.error_occurred.emit(str(e))
-        finally:
-            loop.close()
     
     def stop(self):
         self.running = False
+        if self._future:
+            self._future.cancel()
 
 
 class MainWindow(QMainWindow):
     """Main application window"""
     
-    def __init__(self):
+    # Bus subscriptions became non-empty (emitted from the publishing thread)
+    prices_ready = pyqtSignal()
+    fills_ready = pyqtSignal()
+    
+    def __init__(self, loop_backend: Optional[str] = None):
         super().__init__()
         
+        # Shared event loop for all async work, with lag and slow-callback monitoring
+        self.runtime = BackgroundLoop(backend=loop_backend).start()
+        logger.info("Event loop: %s", self.runtime.backend)
+        self.loop_monitor = LoopMonitor(
+            slow_callback_ms=config.get('runtime.slow_callback_ms', 50),
+            lag_interval=config.get('runtime.lag_interval', 0.5)
+        )
+        self.runtime.run(self.loop_monitor.start(), timeout=5)
+        
+        # Sampling profiler, started by SIGUSR1 or GET /debug/profile
+        self.profiler = SamplingProfiler(
+            interval=config.get('runtime.profile_interval_ms', 5) / 1000
+        )
+        install_signal_trigger(self.profiler, config.get('runtime.profile_seconds', 10))
+        
         # Initialize Polymarket API
         self.api = PolymarketAPI()
+        self.api.apply_snapshot(config.snapshot)
         
         # Initialize components
         self.markets: List[Market] = []
@@ -92,18 +156,131 @@ class MainWindow(QMainWindow):
             trading_fee=config.trading_fee,
             gas_cost=config.gas_estimate
         )
-        self.demo_mode = DemoMode(initial_balance=config.demo_balance)
+        self.demo_mode = DemoMode(initial_balance=config.demo_balance,
+                                  trade_history=config.get('demo.trade_history', 1000),
+                                  batch_size=config.get('settlement.batch_size', 20),
+                                  max_age=config.get('settlement.max_age', 60.0))
+        self.opportunities = OpportunityTracker(self.detector)
+        self.opportunities.apply_snapshot(config.snapshot)
+        self.history = PriceHistory(
+            capacity=config.get('history.capacity', 1024),
+            halflife=config.get('history.halflife', 30.0),
+            threshold=config.get('history.below_threshold', 1.0)
+        )
+        
+        # Prices and fills reach the window over the bus: a slow repaint or
+        # log only conflates (prices) or bounds (fills) what is waiting,
+        # never holds up the poller or builds a backlog of Qt events
+        self.bus = MarketDataBus(maxsize=config.get('bus.maxsize', 1024))
+        self.price_feed = self.bus.subscribe(PRICES, "gui", on_ready=self.prices_ready.emit)
+        self.fill_feed = self.bus.subscribe(FILLS, "log", on_ready=self.fills_ready.emit)
+        self.prices_ready.connect(self.on_prices_ready, Qt.ConnectionType.QueuedConnection)
+        self.fills_ready.connect(self.on_fills_ready, Qt.ConnectionType.QueuedConnection)
+        
+        # Warm restart from the last checkpoint; markets come back stale and
+        # are replaced by the startup fetch
+        restored = self.restore_checkpoint()
+        
+        # Latest prices in shared memory for other processes (this window
+        # writes); x86 only, see PriceBoard
+        self.price_board: Optional[PriceBoard] = None
+        if BOARD_SUPPORTED:
+            self.price_board = PriceBoard.create(
+                capacity=config.get('price_board.capacity', 4096),
+                name=config.get('price_board.name') or None
+            )
+        
+        # Watchlist tiers for the market list
+        self.watchlist = Watchlist()
+        self.watchlist.apply_snapshot(config.snapshot)
+        
+        # Follow config.yaml edits without a restart
+        config.subscribe(self.on_config_reloaded)
+        config.watch()
+        
+        # Metrics endpoint
+        self.metrics_server: Optional[MetricsServer] = None
+        track_demo_mode(self.demo_mode)
+        if config.metrics_enabled:
+            self.start_metrics_server()
         
         # Monitoring state
         self.monitoring = False
         self.price_thread: Optional[PriceUpdateThread] = None
+        self.fetch_thread: Optional[MarketFetchThread] = None
         
         # Setup UI
         self.init_ui()
         
+        if restored:
+            self.markets = restored
+            if self.price_board:
+                for market in restored:
+                    self.price_board.register(market.id)
+            self.watchlist.update(restored)
+            self.update_market_list(restored)
+            self.update_status()
+            self.log(f"♻ Restored {len(restored)} markets and the demo ledger from the last checkpoint")
+        
+        # Periodic checkpoint, captured here and written in the background
+        self.checkpoint_writer: Optional[checkpoint.CheckpointWriter] = None
+        if config.get('checkpoint.enabled', True):
+            interval = config.get('checkpoint.interval', 5.0)
+            self.checkpoint_writer = checkpoint.CheckpointWriter(
+                config.get('checkpoint.path', 'state/checkpoint.bin'), interval
+            ).start()
+            self.checkpoint_timer = QTimer(self)
+            self.checkpoint_timer.timeout.connect(self.save_checkpoint)
+            self.checkpoint_timer.start(int(interval * 1000))
+        
+        # Merge batches of bought pairs that have waited long enough
+        self.settlement_timer = QTimer(self)
+        self.settlement_timer.timeout.connect(self.settle_merges)
+        self.settlement_timer.start(1000)
+        
         # Auto-fetch markets on startup
         QTimer.singleShot(500, self.fetch_markets)
     
+    def restore_checkpoint(self) -> List[Market]:
+        """Restore the ledger and cooldowns; returns the saved markets if still recent"""
+        if not config.get('checkpoint.enabled', True):
+            return []
+        saved = checkpoint.load(config.get('checkpoint.path', 'state/checkpoint.bin'))
+        if saved is None:
+            return []
+        saved.restore_demo(self.demo_mode)
+        self.opportunities.restore_cooldowns(saved.cooldowns)
+        return saved.markets if saved.age <= config.get('checkpoint.max_age', 3600) else []
+    
+    def capture_checkpoint(self) -> checkpoint.Checkpoint:
+        return checkpoint.Checkpoint.capture(
+            self.demo_mode, self.markets, self.opportunities.cooldowns(),
+            config.get('checkpoint.max_trades', 1000)
+        )
+    
+    def save_checkpoint(self):
+        if self.checkpoint_writer:
+            self.checkpoint_writer.submit(self.capture_checkpoint())
+    
+    def on_config_reloaded(self, snapshot):
+        """Push a new config snapshot to running components (watcher thread)"""
+        self.detector.apply_snapshot(snapshot)
+        self.opportunities.apply_snapshot(snapshot)
+        self.api.apply_snapshot(snapshot)
+        self.watchlist.apply_snapshot(snapshot)
+        self.demo_mode.settlement.apply_snapshot(snapshot)
+    
+    def start_metrics_server(self):
+        """Serve /metrics from the shared event loop"""
+        server = MetricsServer(host=config.metrics_host, port=config.metrics_port)
+        for route in debug_routes(self.loop_monitor, self.profiler):
+            server.add_route(*route)
+        try:
+            self.runtime.run(server.start(), timeout=5)
+            self.metrics_server = server
+        except Exception as e:
+            logger.warning("Metrics endpoint disabled: %s", e)
+    
     def init_ui(self):
         """Initialize the user interface"""
         self.setWindowTitle("Polymarket Arbitrage Tool")
@@ -211,6 +388,15 @@ class MainWindow(QMainWindow):
         price_layout.addWidget(self.total_label)
         layout.addLayout(price_layout)
         
+        # YES / NO / sum over the buffered history, downsampled to the width
+        self.price_chart = PriceChart(fps=config.get('ui.chart_fps', 30))
+        layout.addWidget(self.price_chart)
+        
+        # Rolling statistics from the price history
+        self.history_label = QLabel("")
+        self.history_label.setStyleSheet("font-size: 10pt; color: #555;")
+        layout.addWidget(self.history_label)
+        
         # Arbitrage alert
         self.arb_alert = QLabel("")
         layout.addWidget(self.arb_alert)
@@ -264,6 +450,8 @@ class MainWindow(QMainWindow):
         self.log_output.setReadOnly(True)
         self.log_output.setMaximumHeight(180)
         self.log_output.setStyleSheet("font-family: monospace; font-size: 10pt;")
+        # Bounded: the oldest lines go once the limit is reached
+        self.log_output.document().setMaximumBlockCount(config.get('ui.log_lines', 2000))
         
         layout.addWidget(self.log_output)
         group.setLayout(layout)
@@ -291,19 +479,39 @@ class MainWindow(QMainWindow):
     
     def fetch_markets(self):
         """Fetch markets from Polymarket"""
+        if self.fetch_thread is not None:
+            return  # a fetch is already in flight
         self.log("🔄 Fetching markets from Polymarket...")
         self.refresh_btn.setEnabled(False)
         
-        self.fetch_thread = MarketFetchThread(self.api)
+        self.fetch_thread = MarketFetchThread(self.api, self.runtime)
         self.fetch_thread.markets_fetched.connect(self.on_markets_fetched)
         self.fetch_thread.error_occurred.connect(self.on_fetch_error)
+        self.fetch_thread.finished.connect(self.on_fetch_finished)
         self.fetch_thread.start()
     
+    def on_fetch_finished(self):
+        """Release the finished fetch thread (one per refresh otherwise piles up)"""
+        thread, self.fetch_thread = self.fetch_thread, None
+        if thread is not None:
+            thread.deleteLater()
+    
     def on_markets_fetched(self, markets: List[Market]):
         """Handle markets fetched"""
+        # Keep the last known prices of markets restored from a checkpoint
+        known = {m.id: m for m in self.markets if m.quoted_at}
+        for market in markets:
+            old = known.get(market.id)
+            if old:
+                market.yes_micros, market.no_micros = old.yes_micros, old.no_micros
+                market.quoted_at, market.stale = old.quoted_at, old.stale
         self.markets = markets
+        if self.price_board:
+            for market in markets:
+                self.price_board.register(market.id)
+        self.watchlist.update(markets)
         self.update_market_list(markets)
-        self.log(f"✓ Loaded {len(markets)} active markets")
+        self.log(f"✓ Loaded {len(markets)} active markets ({self.watchlist.summary()})")
         self.refresh_btn.setEnabled(True)
     
     def on_fetch_error(self, error: str):
@@ -315,8 +523,8 @@ class MainWindow(QMainWindow):
     def update_market_list(self, markets: List[Market]):
         """Update market list widget"""
         self.market_list.clear()
-        for market in markets:
-            item = QListWidgetItem(f"📊 {market.question}")
+        for market in sorted(markets, key=lambda m: TIERS.index(m.tier)):
+            item = QListWidgetItem(f"{TIER_ICONS[market.tier]} {market.question}")
             item.setData(Qt.ItemDataRole.UserRole, market)
             self.market_list.addItem(item)
     
@@ -339,7 +547,10 @@ class MainWindow(QMainWindow):
         self.yes_price_label.setText("YES: --")
         self.no_price_label.setText("NO: --")
         self.total_label.setText("Total: --")
+        self.history_label.setText("")
         self.arb_alert.setText("")
+        self.price_chart.set_threshold(self.detector.sum_cutoff)
+        self.price_chart.set_history(self.history.get(self.selected_market.id))
     
     def start_monitoring(self):
         """Start real-time price monitoring"""
@@ -355,11 +566,23 @@ class MainWindow(QMainWindow):
         self.log("📡 Fetching real-time prices from Polymarket...")
         
         # Start price update thread
-        self.price_thread = PriceUpdateThread(self.api, self.selected_market)
-        self.price_thread.prices_updated.connect(self.on_prices_updated)
+        self.price_thread = PriceUpdateThread(
+            self.api, self.selected_market, self.runtime, self.bus, self.price_board,
+            next_interval=(partial(self.next_poll_interval, self.selected_market)
+                           if config.get('scanner.adaptive', True) else None)
+        )
         self.price_thread.error_occurred.connect(self.on_price_error)
         self.price_thread.start()
     
+    def next_poll_interval(self, market: Market) -> float:
+        """Poll a market faster the closer it sits to an edge"""
+        return adaptive_interval(
+            self.history.stats(market.id),
+            self.detector.sum_cutoff,
+            config.get('scanner.min_interval', 0.5),
+            config.get('scanner.max_interval', 30.0)
+        )
+    
     def stop_monitoring(self):
         """Stop monitoring"""
         self.monitoring = False
@@ -374,45 +597,76 @@ class MainWindow(QMainWindow):
         
         self.log("⏹ Stopped monitoring")
     
-    def on_prices_updated(self, yes_price: float, no_price: float):
+    def on_prices_ready(self):
+        """Handle the newest quote per market waiting on the bus"""
+        for market_id, update in self.price_feed.drain():
+            if self.selected_market and market_id == self.selected_market.id:
+                self.on_prices_updated(update)
+    
+    def on_prices_updated(self, update: PriceUpdate):
         """Handle real-time price updates"""
         if not self.monitoring:
             return
+        yes_micros, no_micros = update.yes_micros, update.no_micros
+        yes_price, no_price = from_micros(yes_micros), from_micros(no_micros)
+        if self.selected_market:
+            market = self.selected_market
+            market.yes_micros, market.no_micros = yes_micros, no_micros
+            market.quoted_at, market.stale = update.at, False
         
         # Update display
         self.yes_price_label.setText(f"YES: ${yes_price:.4f}")
         self.no_price_label.setText(f"NO: ${no_price:.4f}")
         
-        total = yes_price + no_price
+        total = from_micros(yes_micros + no_micros)
         self.total_label.setText(f"Total: ${total:.4f}")
         
-        # Check for arbitrage
         if self.selected_market:
-            opp = self.detector.check_arbitrage(
+            now = update.at
+            history = self.history.record(self.selected_market.id, now, yes_price, no_price)
+            self.price_chart.add_tick(now, yes_price, no_price)
+            stats = history.stats()
+            since = stats.seconds_since_below(now)
+            below = f"{since:.0f}s ago" if since is not None else "not seen"
+            self.history_label.setText(
+                f"〰 Avg total: ${stats.ewma_sum:.4f} · σ {stats.sum_volatility:.4f} · "
+                f"YES σ {stats.yes_volatility:.4f} · below ${history.threshold:.2f}: {below}"
+            )
+        
+        # Track the opportunity across ticks; only state changes need work
+        if self.selected_market:
+            event = self.opportunities.observe(
                 self.selected_market.id,
                 self.selected_market.question,
-                yes_price,
-                no_price
+                yes_micros,
+                no_micros
             )
+            if event is None:
+                return
             
-            if opp:
-                # Show arbitrage alert
-                alert_text = (
-                    f"🚨 ARBITRAGE OPPORTUNITY!\n"
-                    f"💰 Profit: ${opp.estimated_profit:.4f} ({opp.profit_percentage:.2f}%)"
-                )
-                self.arb_alert.setText(alert_text)
-                self.arb_alert.setStyleSheet(
-                    "font-size: 13pt; font-weight: bold; color: #1b5e20; "
-                    "background-color: #c8e6c9; padding: 15px; border-radius: 8px; "
-                    "border: 2px solid #4caf50;"
-                )
-                
-                # Auto-execute if enabled
-                if config.auto_execute:
-                    self.execute_arbitrage(opp)
-            else:
+            if event.kind == "closed":
                 self.arb_alert.setText("")
+                self.log(f"⏹ Opportunity closed after {event.opportunity.duration:.1f}s "
+                         f"({event.opportunity.executions} executed)")
+                return
+            
+            # Show arbitrage alert
+            opp = event.opportunity.latest
+            self.bus.publish(OPPORTUNITIES, opp.market_id, opp)
+            alert_text = (
+                f"🚨 ARBITRAGE OPPORTUNITY!\n"
+                f"💰 Profit: ${opp.estimated_profit:.4f} ({opp.profit_percentage:.2f}%)"
+            )
+            self.arb_alert.setText(alert_text)
+            self.arb_alert.setStyleSheet(
+                "font-size: 13pt; font-weight: bold; color: #1b5e20; "
+                "background-color: #c8e6c9; padding: 15px; border-radius: 8px; "
+                "border: 2px solid #4caf50;"
+            )
+            
+            # Auto-execute once per opening (and again only after the cooldown)
+            if event.actionable and config.auto_execute:
+                self.execute_arbitrage(opp)
     
     def on_price_error(self, error: str):
         """Handle price fetch error"""
@@ -432,18 +686,18 @@ class MainWindow(QMainWindow):
             return
         
         try:
-            yes_price = float(yes_text)
-            no_price = float(no_text)
+            yes_micros = to_micros(yes_text)
+            no_micros = to_micros(no_text)
         except:
             self.log("❌ Invalid prices")
             return
         
         # Check for arbitrage
-        opp = self.detector.check_arbitrage(
+        opp = self.detector.check_micros(
             self.selected_market.id,
             self.selected_market.question,
-            yes_price,
-            no_price
+            yes_micros,
+            no_micros
         )
         
         if opp:
@@ -454,32 +708,56 @@ class MainWindow(QMainWindow):
     def execute_arbitrage(self, opp: ArbitrageOpportunity):
         """Execute arbitrage trade in demo mode"""
         # Execute demo trade
-        trade = self.demo_mode.execute_arbitrage(
+        params = self.detector.params
+        market = self.selected_market
+        trade = self.demo_mode.execute_micros(
             market_name=opp.market_name,
-            yes_price=opp.yes_price,
-            no_price=opp.no_price,
-            trading_fee=self.detector.trading_fee,
-            gas_cost=self.detector.gas_cost
+            yes_micros=opp.yes_micros,
+            no_micros=opp.no_micros,
+            fee_ppm=params.fee_ppm,
+            gas_micros=params.gas_micros,
+            condition_id=(market.condition_id if market and market.id == opp.market_id
+                          and market.condition_id else opp.market_id)
         )
+        if trade is None:
+            self.log(f"⏳ Skipped: ${self.demo_mode.locked_micros / 1_000_000:.2f} "
+                     f"is waiting on merges")
+            return
         
-        # Log trade details
-        self.log("=" * 50)
-        self.log(f"⚡ ARBITRAGE EXECUTED")
-        self.log(f"   Market: {opp.market_name[:50]}...")
-        self.log(f"   YES: ${opp.yes_price:.4f} | NO: ${opp.no_price:.4f}")
-        self.log(f"   💰 Profit: ${trade.profit:.4f}")
-        self.log(f"   📊 Balance: ${self.demo_mode.balance:.2f}")
-        self.log("=" * 50)
-        
-        # Update status
-        self.update_status()
+        self.opportunities.mark_executed(opp.market_id)
+        self.bus.publish(FILLS, opp.market_id, trade)
         
         # Clear alert
         self.arb_alert.setText("")
     
+    def on_fills_ready(self):
+        """Log executed trades waiting on the bus and refresh the status bar"""
+        for _, trade in self.fill_feed.drain():
+            self.log("=" * 50)
+            self.log(f"⚡ ARBITRAGE EXECUTED")
+            self.log(f"   Market: {trade.market_name[:50]}...")
+            self.log(f"   YES: ${trade.yes_price:.4f} | NO: ${trade.no_price:.4f}")
+            self.log(f"   💰 Profit: ${trade.profit:.4f}")
+            self.log(f"   📊 Balance: ${self.demo_mode.balance:.2f}")
+            self.log("=" * 50)
+        self.update_status()
+    
+    def settle_merges(self):
+        """Merge the pair batches that are due and show the released capital"""
+        settlements = self.demo_mode.settle()
+        for settlement in settlements:
+            self.log(f"🔄 Merged {settlement.pairs} pairs: "
+                     f"profit ${settlement.profit_micros / 1_000_000:.4f} "
+                     f"after ${settlement.gas_micros / 1_000_000:.4f} gas")
+        if settlements:
+            self.update_status()
+    
     def update_status(self):
         """Update status bar"""
-        self.balance_label.setText(f"💵 Balance: ${self.demo_mode.balance:.2f}")
+        locked = self.demo_mode.locked_micros
+        self.balance_label.setText(
+            f"💵 Balance: ${self.demo_mode.balance:.2f}"
+            + (f" (🔒 ${locked / 1_000_000:.2f} awaiting merge)" if locked else ""))
         self.profit_label.setText(f"📈 Profit: ${self.demo_mode.total_profit:.2f}")
         self.trades_label.setText(f"🔄 Trades: {self.demo_mode.num_trades}")
     
@@ -492,21 +770,35 @@ class MainWindow(QMainWindow):
     
     def closeEvent(self, event):
         """Handle window close"""
+        config.unsubscribe(self.on_config_reloaded)
+        config.stop_watching()
+        
         if self.price_thread:
             self.price_thread.stop()
             self.price_thread.wait()
+        if self.fetch_thread:
+            self.fetch_thread.wait(5000)
         
-        # Close API session
-        loop = asyncio.new_event_loop()
-        loop.run_until_complete(self.api.close())
-        loop.close()
+        # Stop metrics endpoint and close API session
+        try:
+            if self.metrics_server:
+                self.runtime.run(self.metrics_server.stop(), timeout=5)
+            self.runtime.run(self.loop_monitor.stop(), timeout=5)
+            self.runtime.run(self.api.close(), timeout=5)
+        except Exception as e:
+            logger.warning("Error during shutdown: %s", e)
+        self.runtime.stop()
+        if self.price_board:
+            self.price_board.close()
+        if self.checkpoint_writer:
+            self.checkpoint_writer.stop(final=self.capture_checkpoint())
         
         event.accept()
 
 
-def run_gui():
-    """Run the GUI application"""
+def run_gui(loop_backend: Optional[str] = None):
+    """Run the GUI application; `loop_backend` overrides runtime.event_loop"""
     app = QApplication(sys.argv)
-    window = MainWindow()
+    window = MainWindow(loop_backend)
     window.show()
     sys.exit(app.exec())
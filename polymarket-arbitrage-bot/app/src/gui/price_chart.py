@@ -0,0 +1,162 @@
+"""Live YES / NO / sum chart for the selected market"""
+import time
+from typing import List, Optional
+
+from PyQt6.QtCore import QPointF, QRectF, Qt, QTimer
+from PyQt6.QtGui import QColor, QPainter, QPen, QPolygonF, QTransform
+from PyQt6.QtWidgets import QWidget
+
+from ..core.downsample import MinMaxSeries
+from ..core.history import MarketHistory
+
+# (label, color) per plotted series: YES, NO, YES + NO
+SERIES = (("YES", "#2e7d32"), ("NO", "#c62828"), ("YES+NO", "#1565c0"))
+MARGIN = 8
+LEGEND = 16
+
+
+class PriceChart(QWidget):
+    """
+    Draws YES, NO and their sum from a min/max-downsampled series
+    
+    Ticks are reduced as they arrive (see MinMaxSeries), so however long
+    it runs the chart holds `target` to 2x `target` buckets per line, about
+    the pixel width. Polylines are kept in data coordinates and mapped to
+    the widget with one transform when painting: a tick that lands in the
+    current bucket replaces two points, a new bucket appends two, and only
+    a merge of buckets rebuilds them. Repaints are coalesced to at most
+    `fps` per second.
+    """
+    
+    def __init__(self, parent: Optional[QWidget] = None, fps: float = 30.0, target: int = 512):
+        super().__init__(parent)
+        self.setMinimumHeight(160)
+        self.frame = 1.0 / max(1.0, fps)
+        self.target = target
+        self.series = MinMaxSeries(len(SERIES), target)
+        self.threshold: Optional[float] = None
+        self._polylines: List[QPolygonF] = [QPolygonF() for _ in SERIES]
+        self._pens = []
+        for _, color in SERIES:
+            pen = QPen(QColor(color))
+            pen.setCosmetic(True)
+            self._pens.append(pen)
+        self._version = self.series.version
+        self._low = self._high = None
+        self._last_paint = 0.0
+        self._pending = False
+    
+    def set_history(self, history: Optional[MarketHistory]):
+        """Start over from a market's buffered ticks (None clears the chart)"""
+        self.series = MinMaxSeries(len(SERIES), self.target)
+        if history is not None:
+            times, yes, no = history.window()
+            append = self.series.append
+            for t, y, n in zip(times.tolist(), yes.tolist(), no.tolist()):
+                append(t, y, n, y + n)
+        self._rebuild()
+        self._schedule()
+    
+    def set_threshold(self, threshold: Optional[float]):
+        """YES + NO level to mark (the detector's profitable cutoff)"""
+        self.threshold = threshold
+    
+    def add_tick(self, t: float, yes: float, no: float):
+        series = self.series
+        total = yes + no
+        new_bucket = series.append(t, yes, no, total)
+        if series.version != self._version:
+            self._rebuild()
+        else:
+            index = len(series) - 1
+            for field, polyline in enumerate(self._polylines):
+                low = QPointF(t if new_bucket else polyline.at(polyline.size() - 2).x(),
+                              series.lows[field][index])
+                high = QPointF(low.x(), series.highs[field][index])
+                if new_bucket:
+                    polyline.append(low)
+                    polyline.append(high)
+                else:
+                    polyline.replace(polyline.size() - 2, low)
+                    polyline.replace(polyline.size() - 1, high)
+            low, high = min(yes, no), total
+            self._low = low if self._low is None else min(self._low, low)
+            self._high = high if self._high is None else max(self._high, high)
+        self._schedule()
+    
+    def _rebuild(self):
+        series = self.series
+        times = series.times
+        self._polylines = []
+        for lows, highs in zip(series.lows, series.highs):
+            polyline = QPolygonF()
+            for t, low, high in zip(times, lows, highs):
+                polyline.append(QPointF(t, low))
+                polyline.append(QPointF(t, high))
+            self._polylines.append(polyline)
+        lows = [min(lows) for lows in series.lows if lows]
+        highs = [max(highs) for highs in series.highs if highs]
+        self._low = min(lows) if lows else None
+        self._high = max(highs) if highs else None
+        self._version = series.version
+    
+    def _schedule(self):
+        """Repaint at most once per frame"""
+        if self._pending:
+            return
+        self._pending = True
+        delay = max(0.0, self.frame - (time.monotonic() - self._last_paint))
+        QTimer.singleShot(int(delay * 1000), self._flush)
+    
+    def _flush(self):
+        self._pending = False
+        self.update()
+    
+    def paintEvent(self, event):
+        self._last_paint = time.monotonic()
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        area = QRectF(self.rect()).adjusted(MARGIN, MARGIN + LEGEND, -MARGIN, -MARGIN)
+        painter.fillRect(self.rect(), QColor("#fafafa"))
+        
+        times = self.series.times
+        if len(times) < 2 or times[-1] <= times[0] or self._low is None:
+            painter.setPen(QColor("#888"))
+            painter.drawText(area, Qt.AlignmentFlag.AlignCenter, "Waiting for prices...")
+            return
+        
+        low, high = self._low, self._high
+        if self.threshold is not None:
+            low, high = min(low, self.threshold), max(high, self.threshold)
+        pad = max(0.005, (high - low) * 0.05)
+        low, high = low - pad, high + pad
+        t0, t1 = times[0], times[-1]
+        
+        # Data -> pixels, y growing upwards
+        transform = QTransform()
+        transform.translate(area.left(), area.bottom())
+        transform.scale(area.width() / (t1 - t0), -area.height() / (high - low))
+        transform.translate(-t0, -low)
+        
+        painter.save()
+        painter.setTransform(transform)
+        if self.threshold is not None:
+            pen = QPen(QColor("#999"), 1, Qt.PenStyle.DashLine)
+            pen.setCosmetic(True)
+            painter.setPen(pen)
+            painter.drawLine(QPointF(t0, self.threshold), QPointF(t1, self.threshold))
+        for pen, polyline in zip(self._pens, self._polylines):
+            painter.setPen(pen)
+            painter.drawPolyline(polyline)
+        painter.restore()
+        
+        # Legend and span
+        x = area.left() + 4
+        for label, color in SERIES:
+            painter.setPen(QColor(color))
+            painter.drawText(QPointF(x, MARGIN + 10), label)
+            x += painter.fontMetrics().horizontalAdvance(label) + 12
+        painter.setPen(QColor("#888"))
+        span = t1 - t0
+        painter.drawText(QPointF(x, MARGIN + 10),
+                         f"last {span / 60:.0f} min" if span >= 120 else f"last {span:.0f}s")
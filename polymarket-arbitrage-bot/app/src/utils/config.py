@@ -1,9 +1,83 @@
 """Configuration loader"""
 import yaml
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional
 from dotenv import load_dotenv
 import os
+import threading
+
+from .logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def _flatten(data: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """Map every dotted key path (leaves and sections) to its value"""
+    flat: Dict[str, Any] = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        flat[path] = value
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+    return flat
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Immutable, pre-resolved view of config.yaml
+    
+    A new snapshot is built on every (re)load and swapped in as a single
+    reference, so readers always see one consistent version.
+    """
+    version: int
+    min_profit: float
+    trading_fee: float
+    gas_estimate: float
+    demo_balance: float
+    auto_execute: bool
+    poll_interval: float
+    gamma_api: str
+    clob_api: str
+    ws_url: str
+    requests_per_second: float
+    request_burst: int
+    max_retries: int
+    retry_backoff: float
+    batch_window: float
+    max_batch: int
+    metrics_enabled: bool
+    metrics_host: str
+    metrics_port: int
+    values: Mapping[str, Any] = field(repr=False, compare=False)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], version: int = 0) -> "ConfigSnapshot":
+        values = _flatten(data or {})
+        get = values.get
+        return cls(
+            version=version,
+            min_profit=float(get('trading.min_profit_threshold', 0.01)),
+            trading_fee=float(get('trading.trading_fee', 0.02)),
+            gas_estimate=float(get('trading.gas_estimate', 0.01)),
+            demo_balance=float(get('demo.initial_balance', 1000.0)),
+            auto_execute=bool(get('ui.auto_execute', True)),
+            poll_interval=float(get('scanner.poll_interval', 2.0)),
+            gamma_api=str(get('polymarket.gamma_api', 'https://gamma-api.polymarket.com')),
+            clob_api=str(get('polymarket.clob_api', 'https://clob.polymarket.com')),
+            ws_url=str(get('polymarket.ws_url', 'wss://ws-subscriptions-clob.polymarket.com/ws/market')),
+            requests_per_second=float(get('polymarket.requests_per_second', 10.0)),
+            request_burst=int(get('polymarket.request_burst', 20)),
+            max_retries=int(get('polymarket.max_retries', 3)),
+            retry_backoff=float(get('polymarket.retry_backoff', 0.5)),
+            batch_window=float(get('polymarket.batch_window_ms', 5)) / 1000,
+            max_batch=int(get('polymarket.max_batch', 100)),
+            metrics_enabled=bool(get('metrics.enabled', True)),
+            metrics_host=str(get('metrics.host', '127.0.0.1')),
+            metrics_port=int(get('metrics.port', 9464)),
+            values=MappingProxyType(values),
+        )
 
 
 class Config:
@@ -12,31 +86,83 @@ class Config:
     def __init__(self, config_path: str = "config.yaml"):
         self.config_path = Path(config_path)
         self._config: Dict[str, Any] = {}
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._subscribers: List[Callable[[ConfigSnapshot], None]] = []
+        self._mtime: Optional[float] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
         self.load()
         
         # Load environment variables
         load_dotenv()
     
     def load(self):
-        """Load configuration from YAML file"""
+        """Load configuration from YAML file and publish a new snapshot"""
         if self.config_path.exists():
+            mtime = self.config_path.stat().st_mtime
             with open(self.config_path, 'r') as f:
-                self._config = yaml.safe_load(f)
+                data = yaml.safe_load(f) or {}
         else:
             raise FileNotFoundError(f"Config file not found: {self.config_path}")
+        
+        version = self._snapshot.version + 1 if self._snapshot else 0
+        snapshot = ConfigSnapshot.from_dict(data, version)
+        
+        self._config = data
+        self._mtime = mtime
+        self._snapshot = snapshot
+        
+        for callback in list(self._subscribers):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error("Config subscriber failed: %s", e, exc_info=True)
+    
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        """Current config snapshot; hold on to it for a consistent view"""
+        return self._snapshot
+    
+    def subscribe(self, callback: Callable[[ConfigSnapshot], None]):
+        """Call `callback(snapshot)` after every successful reload"""
+        self._subscribers.append(callback)
+    
+    def unsubscribe(self, callback: Callable[[ConfigSnapshot], None]):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+    
+    def watch(self, interval: float = 1.0):
+        """Reload the file in a background thread whenever it changes"""
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(
+            target=self._watch_loop, args=(interval,), name="config-watcher", daemon=True
+        )
+        self._watcher.start()
+    
+    def stop_watching(self):
+        self._stop_watching.set()
+    
+    def _watch_loop(self, interval: float):
+        while not self._stop_watching.wait(interval):
+            try:
+                mtime = self.config_path.stat().st_mtime
+            except OSError:
+                continue
+            if mtime == self._mtime:
+                continue
+            try:
+                self.load()
+                logger.info("Reloaded %s (version %d)", self.config_path, self._snapshot.version)
+            except Exception as e:
+                # Keep serving the last good snapshot
+                self._mtime = mtime
+                logger.error("Failed to reload %s: %s", self.config_path, e)
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value by dot-notation key"""
-        keys = key.split('.')
-        value = self._config
-        
-        for k in keys:
-            if isinstance(value, dict):
-                value = value.get(k, default)
-            else:
-                return default
-        
-        return value
+        return self._snapshot.values.get(key, default)
     
     @property
     def polymarket_api_url(self) -> str:
@@ -44,31 +170,47 @@ class Config:
     
     @property
     def polymarket_ws_url(self) -> str:
-        return self.get('polymarket.ws_url')
+        return self._snapshot.ws_url
     
     @property
     def gamma_api_url(self) -> str:
-        return self.get('polymarket.gamma_api')
+        return self._snapshot.gamma_api
+    
+    @property
+    def clob_api_url(self) -> str:
+        return self._snapshot.clob_api
     
     @property
     def min_profit(self) -> float:
-        return self.get('trading.min_profit_threshold', 0.01)
+        return self._snapshot.min_profit
     
     @property
     def trading_fee(self) -> float:
-        return self.get('trading.trading_fee', 0.02)
+        return self._snapshot.trading_fee
     
     @property
     def gas_estimate(self) -> float:
-        return self.get('trading.gas_estimate', 0.01)
+        return self._snapshot.gas_estimate
     
     @property
     def demo_balance(self) -> float:
-        return self.get('demo.initial_balance', 1000.0)
+        return self._snapshot.demo_balance
     
     @property
     def auto_execute(self) -> bool:
-        return self.get('ui.auto_execute', True)
+        return self._snapshot.auto_execute
+    
+    @property
+    def metrics_enabled(self) -> bool:
+        return self._snapshot.metrics_enabled
+    
+    @property
+    def metrics_host(self) -> str:
+        return self._snapshot.metrics_host
+    
+    @property
+    def metrics_port(self) -> int:
+        return self._snapshot.metrics_port
     
     # Real mode credentials from environment
     @property
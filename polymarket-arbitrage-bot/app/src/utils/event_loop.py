@@ -0,0 +1,126 @@
+"""Event loop backend selection and the shared background loop"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Coroutine, Optional
+
+from .config import config
+from .logger import setup_logger
+
+try:
+    import uvloop
+except ImportError:  # optional: the stdlib loop is used instead
+    uvloop = None
+
+logger = setup_logger(__name__)
+
+# Loop implementations runtime.event_loop (or --loop) can name; "auto"
+# picks uvloop when it is installed
+BACKENDS = ("asyncio", "uvloop")
+_warned = set()
+
+
+def available_backends() -> list:
+    """Backends that can actually be used in this environment"""
+    return [b for b in BACKENDS if b != "uvloop" or uvloop is not None]
+
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    """
+    The loop implementation to use for `name` (default: runtime.event_loop)
+    
+    Asking for uvloop where it is not installed falls back to the stdlib
+    loop with a warning instead of failing.
+    """
+    name = (name or config.get('runtime.event_loop', 'asyncio') or 'asyncio').lower()
+    if name == "auto":
+        return "uvloop" if uvloop is not None else "asyncio"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown event loop backend {name!r} (expected auto, {', '.join(BACKENDS)})")
+    if name == "uvloop" and uvloop is None:
+        if name not in _warned:
+            _warned.add(name)
+            logger.warning("uvloop is not installed (pip install uvloop); using the asyncio loop")
+        return "asyncio"
+    return name
+
+
+def loop_factory(backend: Optional[str] = None) -> Callable[[], asyncio.AbstractEventLoop]:
+    """Callable creating a new loop of the resolved backend"""
+    if resolve_backend(backend) == "uvloop":
+        return uvloop.new_event_loop
+    return asyncio.new_event_loop
+
+
+def run(coro: Coroutine, backend: Optional[str] = None) -> Any:
+    """asyncio.run() on the selected loop implementation"""
+    with asyncio.Runner(loop_factory=loop_factory(backend)) as runner:
+        return runner.run(coro)
+
+
+class BackgroundLoop:
+    """Runs one asyncio event loop forever on a daemon thread
+    
+    All async work of the bot (API requests, price polling, the metrics
+    endpoint) is scheduled onto this single loop, so the aiohttp session
+    and any background tasks always live on the same loop. `backend`
+    picks the loop implementation (see resolve_backend).
+    """
+    
+    def __init__(self, name: str = "arbitrage-loop", backend: Optional[str] = None):
+        self.name = name
+        self.backend = resolve_backend(backend)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+    
+    def start(self) -> "BackgroundLoop":
+        """Start the loop thread (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return self
+        
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+    
+    def _run(self):
+        self.loop = loop_factory(self.backend)()
+        asyncio.set_event_loop(self.loop)
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+    
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine on the loop from any thread"""
+        if self.loop is None:
+            raise RuntimeError("Background loop is not running")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+    
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and block the calling thread for its result"""
+        return self.submit(coro).result(timeout)
+    
+    def stop(self, timeout: float = 5.0):
+        """Cancel pending tasks and stop the loop thread"""
+        if self.loop is None or not self._thread:
+            return
+        
+        async def _cancel_all():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        if self.loop.is_running():
+            try:
+                self.run(_cancel_all(), timeout)
+            except Exception:
+                pass
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+        self.loop = None
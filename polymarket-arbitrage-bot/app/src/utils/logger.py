@@ -1,41 +1,188 @@
-"""Logging utilities"""
+"""Logging utilities
+
+Every logger returned by setup_logger() shares one QueueHandler. Records
+are handed to a single QueueListener thread that owns the console handler
+and the one file handle for the daily log, so callers never format
+messages or touch the disk themselves.
+"""
+import atexit
+import itertools
+import json
 import logging
+import queue
 import sys
+import threading
+from collections.abc import Mapping
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from datetime import datetime
+from typing import Optional, Set
 
+_lock = threading.Lock()
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+_fallback_handler: Optional[logging.Handler] = None  # direct console output after shutdown
+_loggers: Set[str] = set()  # names given to setup_logger()
 
-def setup_logger(name: str = "arbitrage", level: str = "INFO", log_to_file: bool = True) -> logging.Logger:
-    """Set up logger with console and file handlers"""
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves message formatting to the writer thread
     
-    logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, level.upper()))
+    The stock handler merges msg and args on the calling thread. Records
+    stay in this process, so they can be queued as-is; log arguments should
+    be immutable values (numbers, strings) for the same reason.
+    """
     
-    # Clear existing handlers
-    logger.handlers = []
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line
+    
+    Structured fields passed to log_event() are emitted as top-level keys.
+    """
     
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.DEBUG)
-    console_format = logging.Formatter(
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        event = getattr(record, 'event', None)
+        if event:
+            payload['event'] = event
+        if isinstance(record.args, Mapping):
+            for key, value in record.args.items():
+                payload.setdefault(key, value)
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+def _console_handler() -> logging.Handler:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setLevel(logging.DEBUG)
+    handler.setFormatter(logging.Formatter(
         '%(asctime)s - %(levelname)s - %(message)s',
         datefmt='%H:%M:%S'
-    )
-    console_handler.setFormatter(console_format)
-    logger.addHandler(console_handler)
+    ))
+    return handler
+
+
+def _file_handler() -> logging.Handler:
+    """JSON lines to the daily log file (one shared handle)"""
+    log_dir = Path("logs")
+    log_dir.mkdir(exist_ok=True)
+    
+    log_file = log_dir / f"arbitrage_{datetime.now().strftime('%Y%m%d')}.log"
+    handler = logging.FileHandler(log_file, encoding='utf-8')
+    handler.setLevel(logging.DEBUG)
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def _start_listener(log_to_file: bool) -> QueueHandler:
+    """Create the shared queue, handlers and writer thread (once per process)"""
+    global _queue_handler, _listener
     
-    # File handler
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handlers = [_console_handler()]
     if log_to_file:
-        log_dir = Path("logs")
-        log_dir.mkdir(exist_ok=True)
-        
-        log_file = log_dir / f"arbitrage_{datetime.now().strftime('%Y%m%d')}.log"
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.DEBUG)
-        file_format = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        file_handler.setFormatter(file_format)
-        logger.addHandler(file_handler)
+        handlers.append(_file_handler())
+    
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    
+    _queue_handler = _DeferredQueueHandler(log_queue)
+    return _queue_handler
+
+
+def _add_file_handler():
+    """Start writing the log file after the writer thread was started without it"""
+    global _listener
+    handlers = _listener.handlers + (_file_handler(),)
+    _listener.stop()  # flushes what is queued so far
+    _listener = QueueListener(_listener.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """
+    Flush queued records and stop the writer thread
+    
+    Loggers are switched to a direct console handler, so records logged
+    afterwards (by atexit hooks, say) are still written.
+    """
+    global _listener, _fallback_handler
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        _fallback_handler = _console_handler()
+        for name in _loggers:
+            logger = logging.getLogger(name)
+            logger.removeHandler(_queue_handler)
+            logger.addHandler(_fallback_handler)
+
+
+def setup_logger(name: str = "arbitrage", level: str = "INFO", log_to_file: bool = True) -> logging.Logger:
+    """Get a logger that writes through the shared queue
+    
+    Safe to call repeatedly and from every module: the first call starts the
+    writer thread, later calls attach the shared queue handler. The log file
+    is shared by all loggers: it is opened by the first call that asks for
+    it and then kept for the process. After shutdown_logging() loggers get
+    the direct console handler instead.
+    """
+    with _lock:
+        if _queue_handler is None:
+            handler = _start_listener(log_to_file)
+        elif _listener is None:
+            handler = _fallback_handler
+        else:
+            handler = _queue_handler
+            if log_to_file and not any(isinstance(h, logging.FileHandler) for h in _listener.handlers):
+                _add_file_handler()
+        _loggers.add(name)
+    
+    logger = logging.getLogger(name)
+    logger.setLevel(getattr(logging, level.upper()))
+    if handler not in logger.handlers:
+        logger.addHandler(handler)
+    logger.propagate = False
     
     return logger
+
+
+def log_event(logger: logging.Logger, event: str, message: str = "",
+              level: int = logging.INFO, **fields):
+    """Log a structured event without formatting anything up front
+    
+    `message` is a %-style template over the fields, e.g.
+    ``log_event(logger, "fill", "Filled @ $%(price).2f", price=0.47)``; it is
+    rendered on the writer thread, and the fields go to the log file as JSON.
+    """
+    if logger.isEnabledFor(level):
+        # LogRecord only unwraps a non-empty mapping into args, so pass none without fields
+        logger.log(level, message or event, *((fields,) if fields else ()), extra={'event': event})
+
+
+class EventSampler:
+    """Lets through one event in every `every` calls
+    
+    Use it to guard high-rate debug events:
+    ``if logger.isEnabledFor(logging.DEBUG) and sampler(): ...``
+    """
+    
+    def __init__(self, every: int = 100):
+        self.every = max(1, every)
+        self._counter = itertools.count()
+    
+    def __call__(self) -> bool:
+        return next(self._counter) % self.every == 0
@@ -0,0 +1,132 @@
+"""Event-loop health: lag probe and slow-callback detection"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from .logger import setup_logger, log_event
+from .metrics import LOOP_LAG, SLOW_CALLBACKS, monitor_loop_lag
+from .profiler import SamplingProfiler
+
+logger = setup_logger(__name__)
+
+_original_handle_run = asyncio.events.Handle._run
+
+
+def describe_callback(handle: asyncio.Handle) -> Dict[str, str]:
+    """Name the coroutine (or plain callback) behind a loop handle"""
+    callback = getattr(handle, "_callback", None)
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        name = getattr(coro, "__qualname__", repr(coro))
+        frame = getattr(coro, "cr_frame", None)
+        where = ""
+        if frame is not None:
+            where = f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno}"
+        return {"callback": name, "task": owner.get_name(), "where": where}
+    name = getattr(callback, "__qualname__", None) or repr(callback)
+    return {"callback": name, "task": "", "where": ""}
+
+
+class LoopMonitor:
+    """
+    Watches one event loop for lag and for callbacks that block it
+    
+    Slow-callback detection wraps asyncio's Handle._run so every callback is
+    timed with two perf_counter() calls; callbacks that run longer than
+    `slow_callback_ms` are counted per coroutine, logged and kept in a short
+    history. Only callbacks on the monitored loop's thread are timed.
+    Loops that do not run asyncio handles (uvloop) only get the lag probe.
+    """
+    
+    def __init__(self, slow_callback_ms: float = 50.0, lag_interval: float = 0.5,
+                 history: int = 100):
+        self.slow_callback = slow_callback_ms / 1000
+        self.lag_interval = lag_interval
+        self.recent: Deque[Dict] = deque(maxlen=history)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lag_task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Start monitoring the running loop"""
+        self._loop = asyncio.get_running_loop()
+        self._lag_task = asyncio.create_task(monitor_loop_lag(self.lag_interval))
+        if self.slow_callback > 0:
+            if isinstance(self._loop, asyncio.BaseEventLoop):
+                self._install()
+            else:
+                logger.info("Slow-callback detection is not available on %s; monitoring lag only",
+                            type(self._loop).__module__)
+    
+    async def stop(self):
+        self._uninstall()
+        if self._lag_task:
+            self._lag_task.cancel()
+            self._lag_task = None
+    
+    def _install(self):
+        monitor = self
+        threshold = self.slow_callback
+        
+        def _timed_run(handle):
+            start = time.perf_counter()
+            _original_handle_run(handle)
+            elapsed = time.perf_counter() - start
+            if elapsed >= threshold and handle._loop is monitor._loop:
+                monitor._record(handle, elapsed)
+        
+        asyncio.events.Handle._run = _timed_run
+    
+    def _uninstall(self):
+        asyncio.events.Handle._run = _original_handle_run
+    
+    def _record(self, handle: asyncio.Handle, elapsed: float):
+        info = describe_callback(handle)
+        info["seconds"] = round(elapsed, 4)
+        info["at"] = time.time()
+        self.recent.append(info)
+        SLOW_CALLBACKS.labels(info["callback"]).inc()
+        log_event(
+            logger, "slow_callback",
+            "Event loop blocked for %(seconds).3fs by %(callback)s %(where)s",
+            level=logging.WARNING, **info
+        )
+    
+    def report(self) -> List[Dict]:
+        """Most recent slow callbacks, newest first"""
+        return list(reversed(self.recent))
+
+
+def debug_routes(monitor: LoopMonitor, profiler: SamplingProfiler, max_seconds: float = 120.0):
+    """
+    Routes for MetricsServer.add_route():
+    
+    GET /debug/loop              current lag and recent slow callbacks
+    GET /debug/profile?seconds=N start a sampling-profiler window
+    """
+    from aiohttp import web
+    
+    async def handle_loop(request):
+        return web.json_response({
+            "lag_seconds": LOOP_LAG.labels().value,
+            "slow_callback_ms": monitor.slow_callback * 1000,
+            "slow_callbacks": monitor.report(),
+        })
+    
+    async def handle_profile(request):
+        try:
+            seconds = min(max_seconds, float(request.query.get("seconds", 10)))
+        except ValueError:
+            raise web.HTTPBadRequest(text="seconds must be a number")
+        path = profiler.start(seconds)
+        if path is None:
+            return web.json_response({"error": "a profile is already running"}, status=409)
+        return web.json_response({"output": str(path), "seconds": seconds})
+    
+    return [
+        ("GET", "/debug/loop", handle_loop),
+        ("GET", "/debug/profile", handle_profile),
+    ]
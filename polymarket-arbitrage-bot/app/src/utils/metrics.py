@@ -0,0 +1,418 @@
+"""Prometheus-style metrics and a local /metrics endpoint
+
+Hot-path updates are a dict lookup plus an integer add on a cell owned by
+the calling thread, so no locks are taken and no strings are built per
+event. Label values are only converted to text when the endpoint is
+scraped.
+"""
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Latency buckets in seconds, tuned for HTTP round trips to Polymarket
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _PerThread:
+    """Hands each writer thread its own cell; readers sum all cells"""
+    
+    def __init__(self, factory: Callable):
+        self._factory = factory
+        self._local = threading.local()
+        self._cells: List = []
+    
+    def cell(self):
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._factory()
+            self._local.cell = cell
+            self._cells.append(cell)
+            return cell
+    
+    def cells(self) -> List:
+        return list(self._cells)
+
+
+class _CounterCell:
+    __slots__ = ('value',)
+    
+    def __init__(self):
+        self.value = 0
+
+
+class CounterChild:
+    """One labelled counter series"""
+    
+    __slots__ = ('_shards',)
+    
+    def __init__(self):
+        self._shards = _PerThread(_CounterCell)
+    
+    def inc(self, amount: float = 1):
+        self._shards.cell().value += amount
+    
+    @property
+    def value(self) -> float:
+        return sum(c.value for c in self._shards.cells())
+
+
+class _HistogramCell:
+    __slots__ = ('counts', 'sum')
+    
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+
+
+class HistogramChild:
+    """One labelled histogram series"""
+    
+    __slots__ = ('_bounds', '_shards')
+    
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        size = len(bounds) + 1
+        self._shards = _PerThread(lambda: _HistogramCell(size))
+    
+    def observe(self, value: float):
+        cell = self._shards.cell()
+        cell.counts[bisect_left(self._bounds, value)] += 1
+        cell.sum += value
+    
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Return (per-bucket counts, sum) merged over all threads"""
+        counts = [0] * (len(self._bounds) + 1)
+        total = 0.0
+        for cell in self._shards.cells():
+            for i, c in enumerate(cell.counts):
+                counts[i] += c
+            total += cell.sum
+        return counts, total
+
+
+class GaugeChild:
+    """One labelled gauge series (plain assignment is atomic)"""
+    
+    __slots__ = ('value',)
+    
+    def __init__(self):
+        self.value = 0.0
+    
+    def set(self, value: float):
+        self.value = value
+
+
+class _Metric:
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple, object] = {}
+        self._lock = threading.Lock()
+    
+    def _init_default(self):
+        # Unlabelled metrics are exported from the start, even before any event
+        if not self.labelnames:
+            self.labels()
+    
+    def _new_child(self):
+        raise NotImplementedError
+    
+    def labels(self, *values):
+        """Get (or create) the child for these label values
+        
+        Callers on hot paths should keep the returned child around.
+        """
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child()
+                    self._children[values] = child
+        return child
+    
+    def _default(self):
+        return self.labels()
+    
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+    
+    def collect(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._init_default()
+    
+    def _new_child(self):
+        return CounterChild()
+    
+    def inc(self, amount: float = 1):
+        self._default().inc(amount)
+    
+    @property
+    def value(self) -> float:
+        return sum(child.value for child in list(self._children.values()))
+    
+    def collect(self) -> List[str]:
+        lines = self.header()
+        for values, child in list(self._children.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} "
+                         f"{_format_value(child.value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._init_default()
+    
+    def _new_child(self):
+        return GaugeChild()
+    
+    def set(self, value: float):
+        self._default().set(value)
+    
+    def collect(self) -> List[str]:
+        lines = self.header()
+        for values, child in list(self._children.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} "
+                         f"{_format_value(child.value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._init_default()
+    
+    def _new_child(self):
+        return HistogramChild(self.buckets)
+    
+    def observe(self, value: float):
+        self._default().observe(value)
+    
+    def collect(self) -> List[str]:
+        lines = self.header()
+        for values, child in list(self._children.items()):
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} "
+                             f"{cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Metric whose value is read from a callable at scrape time"""
+    
+    def __init__(self, name: str, documentation: str, func: Callable[[], float], kind: str = "gauge"):
+        super().__init__(name, documentation)
+        self.kind = kind
+        self.func = func
+    
+    def collect(self) -> List[str]:
+        try:
+            value = self.func()
+        except Exception as e:
+            logger.debug("Metric callback %s failed: %s", self.name, e)
+            return []
+        return self.header() + [f"{self.name} {_format_value(value)}"]
+
+
+class RateMetric(_Metric):
+    """Per-second rate of a counter, measured between scrapes"""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, counter: Counter):
+        super().__init__(name, documentation)
+        self.counter = counter
+        self._last: Optional[Tuple[float, float]] = None
+    
+    def collect(self) -> List[str]:
+        now = time.monotonic()
+        value = self.counter.value
+        rate = 0.0
+        if self._last is not None and now > self._last[0]:
+            rate = (value - self._last[1]) / (now - self._last[0])
+        self._last = (now, value)
+        return self.header() + [f"{self.name} {_format_value(rate)}"]
+
+
+class Registry:
+    """Collection of metrics rendered together in Prometheus text format"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+    
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def unregister(self, name: str):
+        self._metrics.pop(name, None)
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+    
+    def callback(self, name: str, documentation: str, func: Callable[[], float],
+                 kind: str = "gauge") -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, func, kind))
+    
+    def rate(self, name: str, documentation: str, counter: Counter) -> RateMetric:
+        return self.register(RateMetric(name, documentation, counter))
+    
+    def metrics(self) -> Iterable[_Metric]:
+        return list(self._metrics.values())
+    
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in self.metrics():
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry and the bot's built-in metrics
+registry = Registry()
+
+HTTP_REQUESTS = registry.counter(
+    "polymarket_http_requests_total", "HTTP requests to Polymarket by host and status",
+    ("host", "status"))
+HTTP_LATENCY = registry.histogram(
+    "polymarket_http_request_duration_seconds", "HTTP request latency by host", ("host",))
+HTTP_RETRIES = registry.counter(
+    "polymarket_http_retries_total", "Requests retried after a 429 or 5xx response", ("host",))
+TICKS = registry.counter("arbitrage_ticks_total", "Price ticks received")
+registry.rate("arbitrage_ticks_per_second", "Price ticks per second since the last scrape", TICKS)
+DETECTOR_EVALUATIONS = registry.counter(
+    "arbitrage_detector_evaluations_total", "Arbitrage checks performed")
+DETECTOR_HITS = registry.counter(
+    "arbitrage_detector_hits_total", "Arbitrage checks that found an opportunity")
+LOOP_LAG = registry.gauge("event_loop_lag_seconds", "Most recent event loop lag")
+LOOP_LAG_HISTOGRAM = registry.histogram(
+    "event_loop_lag_histogram_seconds", "Event loop lag distribution", buckets=LAG_BUCKETS)
+SLOW_CALLBACKS = registry.counter(
+    "event_loop_slow_callbacks_total", "Callbacks that blocked the event loop, by coroutine",
+    ("callback",))
+
+
+def track_demo_mode(demo_mode):
+    """Expose executions and P&L from DemoMode.get_stats() at scrape time"""
+    registry.callback("demo_executions_total", "Executed demo arbitrage trades",
+                      lambda: demo_mode.get_stats()['num_trades'], kind="counter")
+    registry.callback("demo_profit_total", "Cumulative demo profit in USD",
+                      lambda: demo_mode.get_stats()['total_profit'])
+    registry.callback("demo_balance", "Current demo balance in USD",
+                      lambda: demo_mode.get_stats()['current_balance'])
+    registry.callback("demo_avg_profit", "Average demo profit per merged pair in USD",
+                      lambda: demo_mode.get_stats()['avg_profit'])
+
+
+async def monitor_loop_lag(interval: float = 0.5):
+    """Measure how late the running loop wakes up from a fixed sleep"""
+    loop = asyncio.get_running_loop()
+    gauge = LOOP_LAG.labels()
+    histogram = LOOP_LAG_HISTOGRAM.labels()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - start - interval)
+        gauge.set(lag)
+        histogram.observe(lag)
+
+
+class MetricsServer:
+    """Serves the registry at /metrics from the bot's event loop"""
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 9464, metrics: Registry = registry):
+        self.host = host
+        self.port = port
+        self.registry = metrics
+        self._routes: List[Tuple[str, str, Callable]] = []
+        self._runner = None
+    
+    def add_route(self, method: str, path: str, handler: Callable):
+        """Serve an extra aiohttp handler next to /metrics (call before start())"""
+        self._routes.append((method, path, handler))
+    
+    def make_app(self):
+        from aiohttp import web
+        
+        async def handle_metrics(request):
+            return web.Response(text=self.registry.render(),
+                                content_type="text/plain", charset="utf-8")
+        
+        app = web.Application()
+        app.router.add_get("/metrics", handle_metrics)
+        for method, path, handler in self._routes:
+            app.router.add_route(method, path, handler)
+        return app
+    
+    async def start(self):
+        """Start serving on the current loop"""
+        from aiohttp import web
+        
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        logger.info("Metrics endpoint at http://%s:%s/metrics", self.host, self.port)
+    
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None